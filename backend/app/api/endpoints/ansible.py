@@ -3,13 +3,24 @@ Ansible Documentation API Endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Path, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Dict, List, Any
 import logging
+import time
 
+from app.core.config import settings
+from app.core.http_pool import http_pool
+from app.core.http_resilience import circuit_breakers
 from app.services.ansible_versions_service import ansible_versions_service
 from app.services.ansible_collections_service import ansible_collections_service
 from app.services.cache_scheduler_service import cache_scheduler
+from app.services.cache_snapshot_service import cache_snapshot
+from app.services.cache_service import cache
+from app.services.cache_metrics import cache_metrics
+from app.services.galaxy_index_service import galaxy_index
+from app.services.local_catalog_service import local_catalog
+from app.services.module_search_service import module_search
 # Note: Roles endpoints moved to /api/galaxy-roles/* (galaxy_roles.py)
 from app.services.sse_manager import sse_manager
 
@@ -17,6 +28,17 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ansible", tags=["ansible"])
 
+
+class ModuleSchemasRequest(BaseModel):
+    """Request for several module schemas"""
+    modules: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.MODULE_SCHEMAS_BATCH_MAX,
+        description="Module FQCNs (namespace.collection.module)"
+    )
+
+
 @router.get("/versions")
 async def get_ansible_versions(
     force_refresh: bool = Query(False, description="Force refresh from upstream")
@@ -227,6 +249,97 @@ async def get_module_schema(
             detail=f"Module documentation not available for {namespace}.{collection}.{module} in Ansible {version}"
         )
 
+@router.post("/{version}/modules/schemas")
+async def get_module_schemas(
+    request: ModuleSchemasRequest,
+    version: str = Path(..., description="Ansible version")
+) -> Dict[str, Any]:
+    """
+    Récupère les schémas de plusieurs modules en une requête
+
+    Les modules introuvables sont listés dans "errors" sans faire échouer
+    la requête.
+    """
+    try:
+        logger.info(f"Fetching {len(request.modules)} module schemas in Ansible {version}")
+
+        schemas, errors = await ansible_collections_service.get_module_schemas(version, request.modules)
+
+        return {
+            "ansible_version": version,
+            "schemas": schemas,
+            "errors": errors,
+            "total_requested": len(request.modules),
+            "total_found": len(schemas),
+            "source": "ansible_docs"
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching module schemas for Ansible {version}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch module schemas: {str(e)}")
+
+@router.get("/{version}/search")
+async def search_modules(
+    version: str = Path(..., description="Ansible version"),
+    q: str = Query(..., min_length=1, description="Search terms (module name, description, parameters)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    fuzzy: bool = Query(True, description="Tolerate one typo per term")
+) -> Dict[str, Any]:
+    """
+    Recherche des modules dans toutes les collections d'une version Ansible
+
+    Termes complets, préfixes ou approchés ; les modules doivent contenir
+    tous les termes.
+    """
+    try:
+        start = time.perf_counter()
+        results = ansible_collections_service.search_modules(version, q, limit, fuzzy)
+        took_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            "ansible_version": version,
+            "query": q,
+            "results": results,
+            "total": len(results),
+            "took_ms": round(took_ms, 3),
+            "source": "search_index"
+        }
+
+    except Exception as e:
+        logger.error(f"Error searching modules in Ansible {version}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to search modules: {str(e)}")
+
+@router.get("/{version}/namespaces/{namespace}/collections/{collection}/diff")
+async def diff_collection(
+    version: str = Path(..., description="Ansible version"),
+    namespace: str = Path(..., description="Namespace name"),
+    collection: str = Path(..., description="Collection name"),
+    against: str = Query(..., description="Ansible version to compare with")
+) -> Dict[str, Any]:
+    """
+    Compare les modules d'une collection entre deux versions Ansible
+
+    Modules ajoutés et supprimés dans `against`, modules dont le schéma a
+    changé (paramètres ajoutés, supprimés, modifiés).
+    """
+    try:
+        logger.info(f"Comparing {namespace}.{collection} between Ansible {version} and {against}")
+
+        diff = await ansible_collections_service.diff_collection(version, against, namespace, collection)
+
+        return {
+            "ansible_version": version,
+            "against": against,
+            "namespace": namespace,
+            "collection": collection,
+            **diff,
+            "source": "ansible_docs"
+        }
+
+    except Exception as e:
+        logger.error(f"Error comparing {namespace}.{collection} between {version} and {against}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to compare collection: {str(e)}")
+
 @router.get("/{version}/collections/stats")
 async def get_collections_stats(
     version: str = Path(..., description="Ansible version")
@@ -308,6 +421,12 @@ async def get_cache_status() -> Dict[str, Any]:
         return {
             "status": "ok",
             "scheduler": scheduler_status,
+            "snapshot": cache_snapshot.get_status(),
+            "local_catalog": local_catalog.get_status(),
+            "search_index": module_search.get_status(),
+            "galaxy_index": galaxy_index.get_status(),
+            "http_pool": http_pool.get_status(),
+            "circuit_breakers": circuit_breakers.get_status(),
             "sse": sse_status
         }
 
@@ -316,6 +435,17 @@ async def get_cache_status() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Failed to get cache status: {str(e)}")
 
 
+@router.get("/cache/metrics", response_class=PlainTextResponse)
+async def get_cache_metrics() -> PlainTextResponse:
+    """
+    Cache metrics per key family in Prometheus text format
+    """
+    return PlainTextResponse(
+        cache_metrics.render_prometheus(cache.get_stats()),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @router.post("/cache/sync")
 async def trigger_cache_sync() -> Dict[str, Any]:
     """
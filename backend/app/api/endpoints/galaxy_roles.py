@@ -5,9 +5,14 @@ Provides endpoints for fetching Ansible roles from Galaxy:
 - API v1: Standalone/legacy roles
 - API v3: Collection roles
 - Configuration: Galaxy source settings
+
+source=all queries every active Galaxy source at once (merged by priority).
 """
 
+import json
+
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Dict, List, Any, Optional
 from app.services.galaxy_roles_service import galaxy_roles_service
 
@@ -24,7 +29,7 @@ async def list_standalone_roles(
     namespace: str = Query("", description="Filter by author/namespace"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Results per page"),
-    source: str = Query("public", description="Galaxy source: public or private"),
+    source: str = Query("public", description="Galaxy source: public, private, a source ID or all (federated)"),
     order_by: str = Query("-download_count", description="Sort field")
 ) -> Dict[str, Any]:
     """
@@ -44,7 +49,7 @@ async def list_standalone_roles(
 
 @router.get("/standalone/namespaces")
 async def list_popular_namespaces(
-    source: str = Query("public", description="Galaxy source: public or private"),
+    source: str = Query("public", description="Galaxy source: public, private, a source ID or all (federated)"),
     limit: int = Query(20, ge=1, le=100, description="Number of namespaces to return")
 ) -> List[Dict[str, Any]]:
     """
@@ -62,7 +67,7 @@ async def list_popular_namespaces(
 async def get_standalone_role(
     namespace: str,
     name: str,
-    source: str = Query("public", description="Galaxy source: public or private")
+    source: str = Query("public", description="Galaxy source: public, private, a source ID or all (federated)")
 ) -> Dict[str, Any]:
     """
     Get details for a specific standalone role
@@ -93,7 +98,7 @@ async def list_collection_roles(
     namespace: str,
     collection: str,
     version: str = Query("latest", description="Collection version or 'latest'"),
-    source: str = Query("public", description="Galaxy source: public or private")
+    source: str = Query("public", description="Galaxy source: public, private, a source ID or all (federated)")
 ) -> List[Dict[str, Any]]:
     """
     List roles in a collection via Galaxy v3 API
@@ -113,7 +118,7 @@ async def list_collection_roles(
 @router.get("/collections/search")
 async def search_collection_roles(
     query: str = Query(..., min_length=2, description="Search query"),
-    source: str = Query("public", description="Galaxy source: public or private"),
+    source: str = Query("public", description="Galaxy source: public, private, a source ID or all (federated)"),
     limit: int = Query(50, ge=1, le=100, description="Maximum results")
 ) -> List[Dict[str, Any]]:
     """
@@ -128,6 +133,27 @@ async def search_collection_roles(
     )
 
 
+@router.get("/collections/search/stream")
+async def stream_collection_roles(
+    query: str = Query(..., min_length=2, description="Search query"),
+    source: str = Query("public", description="Galaxy source: public, private, a source ID or all (federated)"),
+    limit: int = Query(50, ge=1, le=100, description="Maximum collections searched")
+) -> StreamingResponse:
+    """
+    Search for roles across collections, streamed as NDJSON
+
+    One line per collection as soon as its roles are known:
+    {"rank", "namespace", "collection", "source", "roles"}, source being
+    the Galaxy source the collection was found on (with source=all, the
+    highest-priority one)
+    """
+    async def lines():
+        async for batch in galaxy_roles_service.iter_collection_roles(query, source, limit):
+            yield json.dumps(batch) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 # ========================================
 # Configuration
 # ========================================
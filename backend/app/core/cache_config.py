@@ -32,3 +32,50 @@ class CacheTTL:
     MODULES = LONG  # 1 hour - module listings
     MODULE_SCHEMA = EXTENDED  # 24 hours - module parameter schemas
     VERSIONS = EXTENDED  # 24 hours - Ansible version list
+    COLLECTION_VERSION_CONTENTS = 30 * EXTENDED  # 30 days - docs-blob of a published collection version (immutable, left to eviction)
+    LATEST_VERSION = SHORT  # 5 minutes - latest version pointer of a collection (revalidated conditionally)
+
+    # Stale-while-revalidate windows per key family (first segment of the key).
+    # The TTL given to cache.set() is the soft TTL; the entry stays usable for
+    # this many extra seconds (hard TTL = soft TTL + window). Between the soft
+    # and hard TTL readers get the stale value while it is refreshed in the
+    # background. Families not listed expire at their soft TTL.
+    STALE_WINDOWS = {
+        "ansible_collections": EXTENDED,
+        "ansible_ns_collections": EXTENDED,
+        "ansible_modules": EXTENDED,
+        "ansible_schema": 7 * EXTENDED,
+        # No refresher: kept past their TTL only to be served while the
+        # upstream fails (see EnhancedCache.get_stale()). Search pages and
+        # per-version role lists are too many to be worth keeping.
+        # Latest-version pointers also keep their validators (ETag) so an
+        # expired pointer is revalidated with a conditional request.
+        "ansible_versions": EXTENDED,
+        "galaxy_standalone_role": EXTENDED,
+        "galaxy_popular_namespaces": EXTENDED,
+        "galaxy_collection_latest": EXTENDED,
+    }
+
+    # Refresh-ahead: hot entries (at least REFRESH_AHEAD_MIN_HITS reads) are
+    # refreshed in the background during the last REFRESH_AHEAD_RATIO of their
+    # soft TTL, so they never go stale
+    REFRESH_AHEAD_RATIO = 0.1
+    REFRESH_AHEAD_MIN_HITS = 5
+
+    # Delay before retrying a failed background refresh (stale value kept)
+    REFRESH_RETRY = 60  # 1 minute
+
+    # Negative caching of failed upstream lookups: missing pages (404/410)
+    # are remembered longer than transient upstream errors (5xx, 429...)
+    NEGATIVE_NOT_FOUND = SHORT  # 5 minutes
+    NEGATIVE_ERROR = 30  # 30 seconds
+
+    @classmethod
+    def negative_ttl(cls, status: int) -> int:
+        """Negative cache TTL for an upstream HTTP status"""
+        return cls.NEGATIVE_NOT_FOUND if status in (404, 410) else cls.NEGATIVE_ERROR
+
+    @classmethod
+    def stale_window(cls, key: str) -> int:
+        """Stale-while-revalidate window for a cache key"""
+        return cls.STALE_WINDOWS.get(key.split(":", 1)[0], 0)
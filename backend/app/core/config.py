@@ -33,6 +33,94 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # In-memory cache limits (0 = unlimited)
+    CACHE_MAX_ENTRIES: int = 50000
+    CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Approximate memory budget
+    CACHE_EVICTION_POLICY: str = "lru"  # lru | lfu | ttl
+    CACHE_REAPER_INTERVAL_SECONDS: int = 30  # Background removal of expired keys
+    CACHE_REAPER_BATCH_SIZE: int = 500  # Keys removed per slice before yielding
+    # Key families whose payloads are stored once per content hash (identical
+    # schemas and module lists across Ansible versions share one copy)
+    CACHE_CONTENT_ADDRESSED_FAMILIES: str = "ansible_schema,ansible_modules"
+
+    @property
+    def cache_content_addressed_families_list(self) -> List[str]:
+        """Parse CACHE_CONTENT_ADDRESSED_FAMILIES string into a list"""
+        return [f.strip() for f in self.CACHE_CONTENT_ADDRESSED_FAMILIES.split(",") if f.strip()]
+
+    # Shared Redis cache tier (L2), uses REDIS_URL
+    CACHE_REDIS_ENABLED: bool = False
+    CACHE_REDIS_KEY_PREFIX: str = "af:cache:"
+    CACHE_REDIS_SOCKET_TIMEOUT: float = 0.25  # seconds, keeps L2 lookups bounded
+
+    # On-disk cache snapshot (restored at startup for instant warm start)
+    CACHE_SNAPSHOT_ENABLED: bool = True
+    CACHE_SNAPSHOT_PATH: str = "/tmp/automation_factory_cache.db"
+    CACHE_SNAPSHOT_INTERVAL_SECONDS: int = 900  # 15 minutes
+    CACHE_SNAPSHOT_PREFIXES: str = "ansible_,galaxy_"  # Comma-separated key prefixes
+
+    @property
+    def cache_snapshot_prefixes_list(self) -> List[str]:
+        """Parse CACHE_SNAPSHOT_PREFIXES string into a list"""
+        return [p.strip() for p in self.CACHE_SNAPSHOT_PREFIXES.split(",") if p.strip()]
+
+    # Shared outbound HTTP connection pool (see app/core/http_pool.py)
+    HTTP_POOL_LIMIT: int = 100  # Connections across all hosts
+    HTTP_POOL_LIMIT_PER_HOST: int = 16
+    HTTP_KEEPALIVE_SECONDS: float = 30  # Idle connections kept open
+    HTTP_DNS_CACHE_TTL_SECONDS: int = 300  # 0 disables the DNS cache
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 10
+    HTTP_READ_TIMEOUT_SECONDS: float = 30  # Between two reads of a response
+    HTTP_HTTP2_ENABLED: bool = False  # httpx clients only, needs the h2 package
+
+    # Upstream resilience (see app/core/http_resilience.py): retries of
+    # idempotent GETs and one circuit breaker per upstream host
+    HTTP_RETRY_ATTEMPTS: int = 3  # Attempts per request, 1 = no retry
+    HTTP_RETRY_BASE_DELAY_SECONDS: float = 0.25  # Backoff base (full jitter)
+    HTTP_RETRY_MAX_DELAY_SECONDS: float = 4.0
+    HTTP_ATTEMPT_TIMEOUT_SECONDS: float = 15.0  # Per attempt, within the service total timeout
+    HTTP_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures opening the circuit
+    HTTP_CIRCUIT_RESET_SECONDS: float = 30.0  # Open duration before a probe request
+
+    # Catalog crawler (cache scheduler): warms collections, module lists and
+    # schemas of the most recent Ansible versions after each sync
+    CACHE_CRAWL_ENABLED: bool = True
+    CACHE_CRAWL_VERSIONS: int = 2  # Keep schemas of all crawled versions within CACHE_MAX_ENTRIES
+    CACHE_CRAWL_CONCURRENCY: int = 8  # Concurrent crawl jobs
+    CACHE_CRAWL_RATE_PER_HOST: float = 5.0  # Max requests per second per upstream host
+    CACHE_CRAWL_SCHEMAS: bool = True  # Crawl down to module schemas
+
+    # Documentation HTML parsing (see app/services/docs_parser.py)
+    DOCS_PARSER_BACKEND: str = "auto"  # auto | lxml | html.parser
+    DOCS_PARSER_POOL: str = "thread"  # thread | process | inline
+    DOCS_PARSER_WORKERS: int = 2
+
+    # Structured module schema sources tried before the HTML documentation
+    # page (see app/services/module_docs_service.py), empty = HTML only
+    MODULE_SCHEMA_SOURCES: str = "ansible-doc,docs-blob"  # Comma-separated, in order
+    ANSIBLE_DOC_COMMAND: str = "ansible-doc"
+    ANSIBLE_DOC_TIMEOUT_SECONDS: int = 30
+
+    @property
+    def module_schema_sources_list(self) -> List[str]:
+        """Parse MODULE_SCHEMA_SOURCES string into a list"""
+        return [s.strip() for s in self.MODULE_SCHEMA_SOURCES.split(",") if s.strip()]
+
+    # Bulk module schema endpoint
+    MODULE_SCHEMAS_BATCH_MAX: int = 200  # FQCNs per request
+    MODULE_SCHEMAS_BATCH_CONCURRENCY: int = 8  # Concurrent fetches of uncached schemas
+
+    # Module search index, saved at shutdown and reloaded at startup
+    SEARCH_INDEX_PERSIST: bool = True
+    SEARCH_INDEX_PATH: str = "/tmp/automation_factory_search.json.gz"
+
+    # Offline catalog of the installed Ansible release, built with ansible-doc
+    # (see app/services/local_catalog_service.py)
+    LOCAL_CATALOG_ENABLED: bool = True
+    LOCAL_CATALOG_PATH: str = "/tmp/automation_factory_catalog.db"
+    LOCAL_CATALOG_BUILD_CONCURRENCY: int = 2  # Concurrent ansible-doc processes
+    LOCAL_CATALOG_BATCH_SIZE: int = 100  # Modules per ansible-doc call
+
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
@@ -45,6 +133,26 @@ class Settings(BaseSettings):
     GALAXY_PRIVATE_TOKEN: str = ""  # Token for private Galaxy authentication
     GALAXY_PREFERRED_SOURCE: str = "public"  # public | private | both
 
+    # Collection role search: collections looked up concurrently per query
+    GALAXY_ROLE_SEARCH_COLLECTIONS: int = 10  # Matching collections inspected
+    GALAXY_ROLE_SEARCH_CONCURRENCY: int = 5  # Concurrent docs-blob lookups
+    GALAXY_ROLE_SEARCH_DEADLINE_SECONDS: float = 10.0  # Partial results after this delay
+
+    # Federated queries (source=all): every active source queried concurrently
+    GALAXY_FEDERATED_DEADLINE_SECONDS: float = 10.0  # Sources slower than this are left out
+    GALAXY_FEDERATED_GRACE_SECONDS: float = 1.0  # Wait for the others once the top-priority sources answered
+
+    # Local index of Galaxy role/collection metadata, synced in the background
+    GALAXY_INDEX_ENABLED: bool = True
+    GALAXY_INDEX_PATH: str = "/tmp/automation_factory_galaxy.db"
+    GALAXY_INDEX_SYNC_INTERVAL_MINUTES: float = 60  # Incremental sync (newest-modified first)
+    GALAXY_INDEX_FULL_SYNC_HOURS: float = 168  # Full crawl, drops items deleted upstream
+    GALAXY_INDEX_PAGE_SIZE: int = 100
+    GALAXY_INDEX_MAX_PAGES: int = 1000  # Per source and item kind
+    GALAXY_INDEX_RATE_PER_HOST: float = 5  # Requests per second during a sync
+    GALAXY_INDEX_POPULAR_PAGES: int = 10  # Most downloaded role pages re-crawled per sync (0 = off)
+    GALAXY_POPULAR_NAMESPACES_PAGES: int = 10  # Role pages aggregated when the index is not ready
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,220 @@
+"""
+HTTP Pool - Shared outbound connection pool for all HTTP services
+
+Every BaseHTTPService session is created on one shared aiohttp connector
+(connector_owner=False), so the collections, versions, docs and Galaxy
+services reuse the same keep-alive connections instead of each holding a
+default pool:
+
+- total and per-host connection limits
+- keep-alive of idle connections
+- TTL DNS cache
+- connect / socket read timeouts, split from each service's total timeout
+
+Code paths built on httpx (Galaxy source connection tests) share one
+httpx.AsyncClient with the same limits, over HTTP/2 when enabled and the
+h2 package is installed.
+
+Pool usage is counted with aiohttp trace hooks and httpx event hooks and
+reported by get_status().
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPPool:
+    """
+    Process-wide aiohttp connector and httpx client.
+
+    Both are created lazily on the running event loop and recreated if the
+    loop changes or after close().
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 16,
+        keepalive_seconds: float = 30,
+        dns_cache_ttl: int = 300,
+        connect_timeout: float = 10,
+        read_timeout: float = 30,
+        http2: bool = False
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_seconds = keepalive_seconds
+        self.dns_cache_ttl = dns_cache_ttl
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._connector_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._httpx_client: Optional[httpx.AsyncClient] = None
+        self._httpx_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {
+            "requests": 0,
+            "request_errors": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+            "httpx_requests": 0
+        }
+        self._trace_config = self._make_trace_config()
+
+    # ========================================
+    # aiohttp
+    # ========================================
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        """The shared connector (created on first use on the running loop)"""
+        loop = asyncio.get_running_loop()
+        if self._connector is None or self._connector.closed or self._connector_loop is not loop:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_seconds,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=self.dns_cache_ttl > 0,
+                enable_cleanup_closed=True
+            )
+            self._connector_loop = loop
+        return self._connector
+
+    def timeout(self, total: Optional[float]) -> aiohttp.ClientTimeout:
+        """Client timeout with the pool connect/read timeouts and a per-service total"""
+        return aiohttp.ClientTimeout(
+            total=total, connect=self.connect_timeout, sock_read=self.read_timeout
+        )
+
+    def create_session(self, total_timeout: Optional[float] = None, **kwargs: Any) -> aiohttp.ClientSession:
+        """
+        New ClientSession on the shared connector.
+
+        Closing the session leaves the connector (and its keep-alive
+        connections) open for the other services.
+        """
+        return aiohttp.ClientSession(
+            connector=self.connector,
+            connector_owner=False,
+            timeout=self.timeout(total_timeout),
+            trace_configs=[self._trace_config],
+            **kwargs
+        )
+
+    def _make_trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        def count(name: str):
+            async def hook(session, context, params) -> None:
+                self._stats[name] += 1
+            return hook
+
+        trace_config.on_request_end.append(count("requests"))
+        trace_config.on_request_exception.append(count("request_errors"))
+        trace_config.on_connection_create_end.append(count("connections_created"))
+        trace_config.on_connection_reuseconn.append(count("connections_reused"))
+        trace_config.on_dns_cache_hit.append(count("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(count("dns_cache_misses"))
+        return trace_config
+
+    # ========================================
+    # httpx
+    # ========================================
+
+    @property
+    def httpx_client(self) -> httpx.AsyncClient:
+        """The shared httpx client (created on first use on the running loop)"""
+        loop = asyncio.get_running_loop()
+        if self._httpx_client is None or self._httpx_client.is_closed or self._httpx_loop is not loop:
+            http2 = self.http2 and _http2_available()
+            if self.http2 and not http2:
+                logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+            self._httpx_client = httpx.AsyncClient(
+                http2=http2,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.limit,
+                    max_keepalive_connections=self.limit_per_host,
+                    keepalive_expiry=self.keepalive_seconds
+                ),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                event_hooks={"request": [self._count_httpx_request]}
+            )
+            self._httpx_loop = loop
+        return self._httpx_client
+
+    async def _count_httpx_request(self, request: httpx.Request) -> None:
+        self._stats["httpx_requests"] += 1
+
+    # ========================================
+    # Lifecycle and metrics
+    # ========================================
+
+    async def close(self) -> None:
+        """Close the shared connector and httpx client"""
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+        self._connector = None
+        if self._httpx_client is not None and not self._httpx_client.is_closed:
+            await self._httpx_client.aclose()
+        self._httpx_client = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Pool configuration, connection usage and request counters"""
+        connector = self._connector
+        idle = in_use = 0
+        in_use_per_host: Dict[str, int] = {}
+        if connector is not None and not connector.closed:
+            # aiohttp exposes no public pool introspection
+            idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+            in_use = len(getattr(connector, "_acquired", ()))
+            for key, conns in getattr(connector, "_acquired_per_host", {}).items():
+                if conns:
+                    in_use_per_host[f"{key.host}:{key.port}"] = len(conns)
+
+        reused, created = self._stats["connections_reused"], self._stats["connections_created"]
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_seconds": self.keepalive_seconds,
+            "dns_cache_ttl": self.dns_cache_ttl,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "http2": self.http2 and _http2_available(),
+            "connections_idle": idle,
+            "connections_in_use": in_use,
+            "connections_in_use_per_host": in_use_per_host,
+            "connection_reuse_rate": f"{(reused / (reused + created) * 100) if reused + created else 0:.1f}%",
+            **self._stats
+        }
+
+
+# Global instance
+http_pool = HTTPPool(
+    limit=settings.HTTP_POOL_LIMIT,
+    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+    keepalive_seconds=settings.HTTP_KEEPALIVE_SECONDS,
+    dns_cache_ttl=settings.HTTP_DNS_CACHE_TTL_SECONDS,
+    connect_timeout=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=settings.HTTP_READ_TIMEOUT_SECONDS,
+    http2=settings.HTTP_HTTP2_ENABLED
+)
@@ -0,0 +1,169 @@
+"""
+HTTP Resilience - Retries and circuit breakers for upstream hosts
+
+Used by BaseHTTPService.fetch() for idempotent GETs to docs.ansible.com
+and Galaxy:
+
+- retries of connection errors, timeouts and transient statuses (429,
+  5xx gateway errors) with exponential backoff and full jitter, honouring
+  Retry-After, within the service's total timeout
+- one circuit breaker per upstream host: after failure_threshold
+  consecutive failures the circuit opens and requests fail immediately
+  with CircuitOpenError (no network wait); after reset_timeout one probe
+  request is let through (half-open) and closes the circuit on success;
+  a probe cancelled before its outcome frees the slot for the next one
+
+CircuitOpenError is an UpstreamHTTPError (503), so services handle it like
+any upstream failure: stale cache entries are kept and served (see
+EnhancedCache.set_negative() and get_stale()).
+"""
+
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+# Statuses worth retrying: throttling and gateway/overload errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        attempt_timeout: float = 15.0
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number attempt (1-based)"""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Seconds of a Retry-After header (delta-seconds form only)"""
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value.strip())
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker of one upstream host.
+
+    States: closed (requests pass), open (requests rejected until
+    reset_timeout has elapsed), half_open (a single probe request passes).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.host = host
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (takes the probe slot when half-open)"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        """Free the half-open probe slot of a request that ended without an outcome (cancelled)"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected_requests": self.rejected,
+            "retry_in_seconds": round(self.retry_in(), 1)
+        }
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers by upstream host, shared by all services"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def reset(self) -> None:
+        """Forget all breakers (all circuits closed)"""
+        self._breakers.clear()
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        return {host: breaker.get_status() for host, breaker in sorted(self._breakers.items())}
+
+
+# Global instances
+retry_policy = RetryPolicy(
+    attempts=settings.HTTP_RETRY_ATTEMPTS,
+    base_delay=settings.HTTP_RETRY_BASE_DELAY_SECONDS,
+    max_delay=settings.HTTP_RETRY_MAX_DELAY_SECONDS,
+    attempt_timeout=settings.HTTP_ATTEMPT_TIMEOUT_SECONDS
+)
+circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=settings.HTTP_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.HTTP_CIRCUIT_RESET_SECONDS
+)
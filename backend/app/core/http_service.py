@@ -2,11 +2,69 @@
 Base HTTP Service - Provides shared HTTP session management for services
 
 This class provides a reusable base for services that need async HTTP sessions
-with consistent lifecycle management and configurable timeouts.
+with consistent lifecycle management and configurable timeouts. Sessions are
+created on the shared connection pool (see http_pool); GETs made with fetch()
+are retried and guarded by a circuit breaker per host (see http_resilience).
 """
 
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
 import aiohttp
-from typing import Optional
+
+from app.core.http_pool import http_pool
+from app.core.http_resilience import RETRY_STATUSES, circuit_breakers, parse_retry_after, retry_policy
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamHTTPError(Exception):
+    """Raised when an upstream service answers with a non-success HTTP status"""
+
+    def __init__(self, status: int, url: str, message: Optional[str] = None):
+        self.status = status
+        self.url = url
+        super().__init__(message or f"HTTP {status} from {url}")
+
+
+class CircuitOpenError(UpstreamHTTPError):
+    """Raised without any request when the circuit of an upstream host is open"""
+
+    def __init__(self, url: str, retry_in: float):
+        host = urlsplit(url).netloc
+        super().__init__(503, url, f"Circuit open for {host}, retry in {retry_in:.0f}s")
+
+
+class HostRateLimiter:
+    """
+    Per-host request rate limit: at most rate_per_second requests are
+    started per host, spaced evenly.
+    """
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, url: str) -> None:
+        """Wait for the next request slot of the URL's host"""
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# Rate limiter applied by BaseHTTPService.throttle() in the current context.
+# Background jobs (e.g. the catalog crawler) set it so that only their own
+# requests, and the tasks they start, are throttled.
+request_rate_limiter: ContextVar[Optional[HostRateLimiter]] = ContextVar("request_rate_limiter", default=None)
 
 
 class BaseHTTPService:
@@ -14,10 +72,13 @@ class BaseHTTPService:
     Base class for services that need HTTP session management.
 
     Provides:
-    - Lazy initialization of aiohttp.ClientSession
-    - Automatic session recreation if closed
-    - Configurable timeout
+    - Lazy initialization of aiohttp.ClientSession on the shared connector
+    - Automatic session recreation if closed (or if the pool was recreated)
+    - Configurable total timeout (connect/read timeouts come from the pool)
     - Clean session cleanup
+    - Optional per-host throttling (see request_rate_limiter)
+    - Resilient GET (fetch): retries with jittered backoff, circuit breaker per host
+    - Conditional GET with ETag/Last-Modified validators
 
     Usage:
         class MyService(BaseHTTPService):
@@ -25,9 +86,10 @@ class BaseHTTPService:
                 super().__init__(timeout=30)  # 30 second timeout
 
             async def fetch_data(self):
-                session = await self.get_session()
-                async with session.get(url) as response:
-                    return await response.json()
+                status, data, _ = await self.fetch(url, read="json")
+                if status != 200:
+                    raise UpstreamHTTPError(status, url)
+                return data
     """
 
     def __init__(self, timeout: int = 60):
@@ -35,7 +97,7 @@ class BaseHTTPService:
         Initialize the HTTP service.
 
         Args:
-            timeout: HTTP request timeout in seconds (default: 60)
+            timeout: Total HTTP request timeout in seconds (default: 60)
         """
         self.session: Optional[aiohttp.ClientSession] = None
         self.timeout = timeout
@@ -44,19 +106,162 @@ class BaseHTTPService:
         """
         Get or create HTTP session.
 
-        Returns a cached session if available and open, otherwise creates a new one.
+        Returns a cached session if available and open, otherwise creates a new one
+        on the shared connector (closing the session left on a previous one).
         """
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
-            )
+        if self.session is None or self.session.closed or self.session.connector is not http_pool.connector:
+            if self.session is not None and not self.session.closed:
+                try:
+                    await self.session.close()
+                except Exception:
+                    pass  # Session of a loop that is gone
+            self.session = http_pool.create_session(self.timeout)
         return self.session
 
+    async def throttle(self, url: str) -> None:
+        """Wait for the rate limiter of the current context, if any"""
+        limiter = request_rate_limiter.get()
+        if limiter is not None:
+            await limiter.acquire(url)
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        read: str = "text"
+    ) -> Tuple[int, Any, Any]:
+        """
+        GET a URL with retries, behind the circuit breaker of its host.
+
+        Connection errors, timeouts and transient statuses (429, 5xx) are
+        retried with jittered exponential backoff while the service's total
+        timeout allows; other statuses (404, 304...) are returned as is.
+
+        Args:
+            url: URL to fetch
+            headers: Request headers
+            params: Query parameters
+            read: "text" or "json", how the body of a 200 response is read
+
+        Returns:
+            (status, body, response headers): body is only read for HTTP 200
+
+        Raises:
+            CircuitOpenError: the host's circuit is open (no request sent)
+            aiohttp.ClientError, asyncio.TimeoutError: last network failure
+        """
+        breaker = circuit_breakers.for_url(url)
+        deadline = time.monotonic() + self.timeout
+        kwargs: Dict[str, Any] = {}
+        if headers is not None:
+            kwargs["headers"] = headers
+        if params is not None:
+            kwargs["params"] = params
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if not breaker.allow_request():
+                raise CircuitOpenError(url, breaker.retry_in())
+            try:
+                await self.throttle(url)
+                session = await self.get_session()
+                attempt_timeout = max(0.1, min(retry_policy.attempt_timeout, deadline - time.monotonic()))
+                error: Optional[Exception] = None
+                retry_after = None
+                try:
+                    async with asyncio.timeout(attempt_timeout):
+                        async with session.get(url, **kwargs) as response:
+                            status, response_headers = response.status, response.headers
+                            if status not in RETRY_STATUSES:
+                                body = None
+                                if status == 200:
+                                    body = await response.json() if read == "json" else await response.text()
+                                breaker.record_success()
+                                return status, body, response_headers
+                            retry_after = parse_retry_after(response_headers.get("Retry-After"))
+                except aiohttp.ContentTypeError:
+                    breaker.record_success()  # The host answered, the body is not JSON
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+            except BaseException:
+                # Cancelled (or unexpected error): no outcome for the
+                # breaker, but a half-open probe slot must not stay taken
+                breaker.release_probe()
+                raise
+
+            breaker.record_failure()
+            delay = retry_policy.backoff(attempt, retry_after)
+            if attempt >= retry_policy.attempts or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return status, None, response_headers
+            reason = repr(error) if error is not None else f"HTTP {status}"
+            logger.info(f"Retrying {url} in {delay:.2f}s after {reason} (attempt {attempt}/{retry_policy.attempts})")
+            await asyncio.sleep(delay)
+
+    async def get_text_conditional(
+        self,
+        url: str,
+        validators: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Optional[str], Dict[str, str]]:
+        """
+        GET a page as text, conditionally when validators are known.
+
+        Sends If-None-Match / If-Modified-Since from the validators of the
+        cached copy, so an unchanged page costs a 304 without a body.
+
+        Args:
+            url: Page URL
+            validators: {"etag": ..., "last_modified": ...} of the cached copy
+
+        Returns:
+            (status, text, validators): text is only set for HTTP 200, with
+            the validators of the new response
+        """
+        return await self.fetch_conditional(url, validators)
+
+    async def fetch_conditional(
+        self,
+        url: str,
+        validators: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        read: str = "text"
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """
+        Conditional fetch(): get_text_conditional() with extra request
+        headers and the body read as text or JSON.
+        """
+        headers = dict(headers or {})
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        status, body, response_headers = await self.fetch(url, headers=headers, read=read)
+        if status != 200:
+            return status, None, {}
+        return 200, body, self._response_validators(response_headers)
+
+    @staticmethod
+    def _response_validators(response_headers) -> Dict[str, str]:
+        """ETag/Last-Modified of response headers"""
+        validators = {}
+        for name, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+            value = response_headers.get(header)
+            if isinstance(value, str) and value:
+                validators[name] = value
+        return validators
+
     async def close_session(self):
         """
         Close HTTP session.
 
-        Safely closes the session if it exists and is open.
+        Safely closes the session if it exists and is open. The shared
+        connector stays open (see http_pool.close()).
         """
         if self.session and not self.session.closed:
             await self.session.close()
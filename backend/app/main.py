@@ -4,12 +4,20 @@ from contextlib import asynccontextmanager
 from sqlalchemy import select
 from app.core.config import settings
 from app.core.database import init_db, AsyncSessionLocal
+from app.core.http_pool import http_pool
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.api.router import api_router
 from app.api.endpoints.websocket import router as websocket_router
 from app.version import __version__
 from app.services.cache_scheduler_service import cache_scheduler
+from app.services.cache_service import cache
+from app.services.cache_redis_tier import RedisCacheTier
+from app.services.cache_snapshot_service import cache_snapshot
+from app.services.docs_parser import parser_pool
+from app.services.galaxy_index_service import galaxy_index
+from app.services.local_catalog_service import local_catalog
+from app.services.module_search_service import module_search
 from app.services.sse_manager import sse_manager
 from app.services.variable_type_service import ensure_default_types
 from app.services.galaxy_source_service import GalaxySourceService
@@ -84,6 +92,42 @@ async def lifespan(app: FastAPI):
             sources = GalaxySourceService.get_active_sources()
             print(f"Galaxy sources initialized: {len(sources)} active source(s)")
 
+        # Remove expired cache keys in the background
+        cache.start_reaper(settings.CACHE_REAPER_INTERVAL_SECONDS, settings.CACHE_REAPER_BATCH_SIZE)
+
+        # Attach shared Redis cache tier so all replicas reuse one warm catalog
+        if settings.CACHE_REDIS_ENABLED:
+            redis_tier = RedisCacheTier.from_url(
+                settings.REDIS_URL,
+                key_prefix=settings.CACHE_REDIS_KEY_PREFIX,
+                socket_timeout=settings.CACHE_REDIS_SOCKET_TIMEOUT
+            )
+            cache.attach_l2(redis_tier)
+            await redis_tier.start_listener(cache.apply_invalidation)
+            print(f"✅ Shared Redis cache tier enabled ({settings.REDIS_URL})")
+
+        # Restore the catalog cache snapshot so the first requests are warm
+        if settings.CACHE_SNAPSHOT_ENABLED:
+            restored = await cache_snapshot.restore()
+            print(f"✅ Cache snapshot restored: {restored} entries")
+            await cache_snapshot.start()
+
+        # Reload the module search index (the local catalog replaces its release)
+        if settings.SEARCH_INDEX_PERSIST:
+            indexed = await module_search.load()
+            print(f"✅ Module search index loaded: {indexed} modules")
+
+        # Serve the installed Ansible release from the local ansible-doc index
+        # (built in the background on first start)
+        if settings.LOCAL_CATALOG_ENABLED:
+            await local_catalog.start()
+            print(f"✅ Local catalog: {'loaded' if local_catalog.loaded else 'building in background'}")
+
+        # Mirror Galaxy role/collection metadata locally (synced in the background)
+        if settings.GALAXY_INDEX_ENABLED:
+            await galaxy_index.start()
+            print("✅ Galaxy index opened, background sync started")
+
         # Start Ansible cache scheduler
         print("Starting Ansible cache scheduler...")
 
@@ -103,6 +147,18 @@ async def lifespan(app: FastAPI):
     print("Shutting down Automation Factory API")
     await cache_scheduler.stop()
     print("✅ Cache scheduler stopped")
+    if settings.CACHE_SNAPSHOT_ENABLED:
+        await cache_snapshot.stop()
+        print("✅ Cache snapshot saved")
+    await cache.stop_reaper()
+    await local_catalog.stop()
+    await galaxy_index.stop()
+    if settings.SEARCH_INDEX_PERSIST:
+        await module_search.save()
+    parser_pool.shutdown()
+    await http_pool.close()
+    if cache.l2 is not None:
+        await cache.l2.stop_listener()
 
 app = FastAPI(
     title="Automation Factory API",
@@ -3,15 +3,23 @@ Ansible Collections Service - Web scraping from Ansible documentation
 """
 
 import re
+import asyncio
 import logging
-from typing import Dict, List, Any
-from bs4 import BeautifulSoup
-from app.core.http_service import BaseHTTPService
-from app.services.cache_service import cache
+from typing import Dict, List, Any, Optional, Tuple
+from app.core.config import settings
+from app.core.http_service import BaseHTTPService, UpstreamHTTPError
+from app.services.cache_service import cache, content_digest, single_flight, NegativeEntry, NOT_CACHED
+from app.services.docs_parser import extract_index_links, make_soup, parser_pool
+from app.services.local_catalog_service import local_catalog
 from app.services.ansible_versions_service import ansible_versions_service
+from app.services.module_docs_service import module_docs_service
+from app.services.module_search_service import module_search
 
 logger = logging.getLogger(__name__)
 
+# "Collection version 8.2.1" en tête de la page d'une collection
+COLLECTION_VERSION_RE = re.compile(r'Collection version\s+([0-9A-Za-z.+-]+)')
+
 
 class AnsibleCollectionsService(BaseHTTPService):
     """Service for scraping collections and modules from Ansible documentation"""
@@ -22,9 +30,81 @@ class AnsibleCollectionsService(BaseHTTPService):
     CACHE_TTL_MODULES = CacheTTL.MODULES
     CACHE_TTL_SCHEMA = CacheTTL.MODULE_SCHEMA
 
+    # Cache key families owned by this service (refreshed in background)
+    CACHE_FAMILIES = ("ansible_collections", "ansible_ns_collections", "ansible_modules", "ansible_schema")
+
     def __init__(self):
         super().__init__(timeout=60)
+
+    def register_cache_refreshers(self) -> None:
+        """Register this service as background refresher of its cache families"""
+        for family in self.CACHE_FAMILIES:
+            cache.register_refresher(family, self._refresh_cache_key)
+
+    async def _refresh_cache_key(self, cache_key: str) -> Any:
+        """
+        Re-fetch a catalog entry from its cache key (stale-while-revalidate).
+
+        Keys: ansible_collections:{version}, ansible_ns_collections:{version}:{ns},
+        ansible_modules:{version}:{ns}:{coll}, ansible_schema:{version}:{ns}:{coll}:{module}
+        """
+        family, *parts = cache_key.split(":")
+        if family == "ansible_collections":
+            return await self._fetch_collections(*parts, cache_key)
+        if family == "ansible_ns_collections":
+            return await self._fetch_namespace_collections(*parts, cache_key)
+        if family == "ansible_modules":
+            return await self._fetch_collection_modules(*parts, cache_key)
+        if family == "ansible_schema":
+            return await self._fetch_module_schema(*parts, cache_key)
+        raise ValueError(f"Unknown cache key family: {family}")
     
+    async def _fetch_page(
+        self,
+        url: str,
+        cache_key: str,
+        ttl: int,
+        error_message: Optional[str] = None
+    ) -> Tuple[Any, Optional[str], Dict[str, str]]:
+        """
+        Télécharge une page de documentation, conditionnellement (ETag /
+        Last-Modified) si une copie en cache a des validateurs.
+
+        Returns:
+            (not_modified, html, validators): not_modified est la valeur en
+            cache revalidée (HTTP 304, html None), sinon NOT_CACHED
+
+        Raises:
+            UpstreamHTTPError: Si la page n'est pas disponible
+        """
+        status, html_content, validators = await self.get_text_conditional(
+            url, cache.get_validators(cache_key)
+        )
+        if status == 304:
+            cached_value = cache.revalidate(cache_key, ttl)
+            if cached_value is not NOT_CACHED:
+                logger.info(f"Not modified since last fetch: {url}")
+                return cached_value, None, {}
+            # Cached copy evicted meanwhile: download the page again
+            status, html_content, validators = await self.get_text_conditional(url)
+
+        if status != 200:
+            logger.error(f"Failed to fetch {url}: HTTP {status}")
+            message = f"{error_message} (HTTP {status})" if error_message else None
+            raise UpstreamHTTPError(status, url, message)
+        return NOT_CACHED, html_content, validators
+
+    async def _parse(self, method_name: str, *args: Any) -> Any:
+        """
+        Exécute une méthode _parse_* dans le pool de parsing (hors event loop).
+
+        En mode process, la méthode est appelée sur l'instance globale du
+        worker via _parse_in_worker (seules les données sont sérialisées).
+        """
+        if parser_pool.uses_processes:
+            return await parser_pool.run(_parse_in_worker, method_name, *args)
+        return await parser_pool.run(getattr(self, method_name), *args)
+
     async def get_collections(self, version: str, force_refresh: bool = False) -> Dict[str, List[str]]:
         """
         Récupère les collections disponibles pour une version Ansible
@@ -36,64 +116,69 @@ class AnsibleCollectionsService(BaseHTTPService):
         Returns:
             Dictionnaire {namespace: [collections]}
         """
+        # Version installée localement : index ansible-doc, sans réseau
+        if local_catalog.covers(version):
+            return local_catalog.get_collections()
+
         cache_key = f"ansible_collections:{version}"
 
         # Check cache unless force_refresh is requested
         if not force_refresh:
-            cached_result = cache.get(cache_key)
-            if cached_result:
+            cached_result = await cache.lookup_async(cache_key)
+            if isinstance(cached_result, NegativeEntry):
+                logger.info(f"Returning cached failure for Ansible {version} collections ({cached_result.message})")
+                return {}
+            if cached_result is not NOT_CACHED:
                 logger.info(f"Returning cached collections for Ansible {version}")
                 return cached_result
         else:
-            logger.info(f"Force refresh requested - bypassing cache for Ansible {version}")
-            # Clear existing cache
-            cache.delete(cache_key)
+            # The cached copy is kept: its validators make the refresh a
+            # conditional request (HTTP 304 if the index did not change)
+            logger.info(f"Force refresh requested - revalidating cache for Ansible {version}")
 
         try:
-            logger.info(f"Fetching collections for Ansible version {version} from docs.ansible.com")
-            collections_url = ansible_versions_service.get_collections_url_for_version(version)
-
-            session = await self.get_session()
-            async with session.get(collections_url) as response:
-                if response.status == 200:
-                    html_content = await response.text()
-                    collections = self._parse_collections_from_html(html_content)
-
-                    # Cache le résultat
-                    cache.set(cache_key, collections, self.CACHE_TTL_COLLECTIONS)
-                    logger.info(f"Found {len(collections)} namespaces for Ansible {version}")
-                    return collections
-                else:
-                    logger.error(f"Failed to fetch collections for {version}: HTTP {response.status}")
-                    return {}
-
+            # Concurrent misses share a single download and parse
+            return await single_flight.do(
+                cache_key, lambda: self._fetch_collections(version, cache_key)
+            )
+        except UpstreamHTTPError as e:
+            logger.error(f"Error fetching collections for {version}: {str(e)}")
+            cache.set_negative(cache_key, e.status, str(e), e.url)
+            # Un force_refresh en échec sert la copie en cache, même expirée
+            stale = cache.get_stale(cache_key)
+            return stale if stale is not NOT_CACHED else {}
         except Exception as e:
             logger.error(f"Error fetching collections for {version}: {str(e)}")
             return {}
+
+    async def _fetch_collections(self, version: str, cache_key: str) -> Dict[str, List[str]]:
+        """Télécharge, parse et met en cache la page index des collections"""
+        logger.info(f"Fetching collections for Ansible version {version} from docs.ansible.com")
+        collections_url = ansible_versions_service.get_collections_url_for_version(version)
+
+        not_modified, html_content, validators = await self._fetch_page(
+            collections_url, cache_key, self.CACHE_TTL_COLLECTIONS
+        )
+        if not_modified is not NOT_CACHED:
+            return not_modified
+
+        collections = await self._parse("_parse_collections_from_html", html_content)
+
+        # Cache le résultat
+        cache.set(cache_key, collections, self.CACHE_TTL_COLLECTIONS, validators=validators)
+        logger.info(f"Found {len(collections)} namespaces for Ansible {version}")
+        return collections
     
     def _parse_collections_from_html(self, html: str) -> Dict[str, List[str]]:
         """
         Parse les namespaces depuis le HTML de la page index des collections
         La page principale liste les namespaces (amazon/index.html, ansible/index.html, etc.)
         """
-        collections = {}
-
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-
             # Sur la page index, les liens sont relatifs comme "amazon/index.html"
-            # Chercher tous les liens qui pointent vers namespace/index.html
-            namespace_links = soup.find_all('a', href=re.compile(r'^[a-z][a-z0-9_]+/index\.html$', re.IGNORECASE))
-
-            for link in namespace_links:
-                href = link.get('href', '')
-                # Extraire le namespace depuis le lien relatif
-                match = re.match(r'^([a-z][a-z0-9_]+)/index\.html$', href, re.IGNORECASE)
-                if match:
-                    namespace = match.group(1)
-                    # Ignorer les liens de navigation comme ../index.html
-                    if namespace not in collections and namespace not in ['index', 'genindex', 'search']:
-                        collections[namespace] = []  # Collections seront chargées à la demande
+            # (extraction en flux, sans construire d'arbre ; les liens de
+            # navigation comme index.html ou genindex.html sont ignorés)
+            collections = {namespace: [] for namespace in extract_index_links(html)}  # Collections chargées à la demande
 
             logger.info(f"Parsed {len(collections)} namespaces from collections index page")
             logger.debug(f"Namespaces found: {list(collections.keys())[:10]}...")
@@ -114,61 +199,64 @@ class AnsibleCollectionsService(BaseHTTPService):
         Returns:
             Liste des noms de collections
         """
+        if local_catalog.covers(version):
+            local_result = local_catalog.get_namespace_collections(namespace)
+            if local_result is not None:
+                return local_result
+
         cache_key = f"ansible_ns_collections:{version}:{namespace}"
-        cached_result = cache.get(cache_key)
+        cached_result = await cache.lookup_async(cache_key)
 
-        if cached_result:
+        if isinstance(cached_result, NegativeEntry):
+            logger.info(f"Returning cached failure for namespace {namespace} ({cached_result.message})")
+            return []
+        if cached_result is not NOT_CACHED:
             logger.info(f"Returning cached collections for namespace {namespace}")
             return cached_result
 
         try:
-            # Construire URL de la page namespace
-            if version == "latest":
-                namespace_url = f"https://docs.ansible.com/ansible/latest/collections/{namespace}/index.html"
-            else:
-                namespace_url = f"https://docs.ansible.com/projects/ansible/{version}/collections/{namespace}/index.html"
+            return await single_flight.do(
+                cache_key, lambda: self._fetch_namespace_collections(version, namespace, cache_key)
+            )
+        except UpstreamHTTPError as e:
+            logger.error(f"Error fetching collections for namespace {namespace}: {str(e)}")
+            cache.set_negative(cache_key, e.status, str(e), e.url)
+            return []
+        except Exception as e:
+            logger.error(f"Error fetching collections for namespace {namespace}: {str(e)}")
+            return []
 
-            logger.info(f"Fetching collections for namespace {namespace} from {namespace_url}")
+    async def _fetch_namespace_collections(self, version: str, namespace: str, cache_key: str) -> List[str]:
+        """Télécharge, parse et met en cache la page d'un namespace"""
+        # Construire URL de la page namespace
+        if version == "latest":
+            namespace_url = f"https://docs.ansible.com/ansible/latest/collections/{namespace}/index.html"
+        else:
+            namespace_url = f"https://docs.ansible.com/projects/ansible/{version}/collections/{namespace}/index.html"
 
-            session = await self.get_session()
-            async with session.get(namespace_url) as response:
-                if response.status == 200:
-                    html_content = await response.text()
-                    collections = self._parse_namespace_collections_from_html(html_content)
+        logger.info(f"Fetching collections for namespace {namespace} from {namespace_url}")
 
-                    # Cache le résultat
-                    cache.set(cache_key, collections, self.CACHE_TTL_COLLECTIONS)
-                    logger.info(f"Found {len(collections)} collections for namespace {namespace}")
-                    return collections
-                else:
-                    logger.error(f"Failed to fetch namespace {namespace}: HTTP {response.status}")
-                    return []
+        not_modified, html_content, validators = await self._fetch_page(
+            namespace_url, cache_key, self.CACHE_TTL_COLLECTIONS
+        )
+        if not_modified is not NOT_CACHED:
+            return not_modified
 
-        except Exception as e:
-            logger.error(f"Error fetching collections for namespace {namespace}: {str(e)}")
-            return []
+        collections = await self._parse("_parse_namespace_collections_from_html", html_content)
+
+        # Cache le résultat
+        cache.set(cache_key, collections, self.CACHE_TTL_COLLECTIONS, validators=validators)
+        logger.info(f"Found {len(collections)} collections for namespace {namespace}")
+        return collections
 
     def _parse_namespace_collections_from_html(self, html: str) -> List[str]:
         """
         Parse les collections depuis la page d'un namespace
         Les liens sont au format collection/index.html (ex: aws/index.html)
         """
-        collections = []
-
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Chercher les liens vers les collections (format: collection/index.html)
-            collection_links = soup.find_all('a', href=re.compile(r'^[a-z][a-z0-9_]+/index\.html$', re.IGNORECASE))
-
-            for link in collection_links:
-                href = link.get('href', '')
-                match = re.match(r'^([a-z][a-z0-9_]+)/index\.html$', href, re.IGNORECASE)
-                if match:
-                    collection = match.group(1)
-                    if collection not in collections and collection not in ['index', 'genindex', 'search']:
-                        collections.append(collection)
-
+            # Liens vers les collections (format: collection/index.html)
+            collections = extract_index_links(html)
             collections.sort()
             logger.debug(f"Parsed {len(collections)} collections from namespace page")
             return collections
@@ -181,39 +269,111 @@ class AnsibleCollectionsService(BaseHTTPService):
         """
         Récupère les modules d'une collection spécifique
         """
+        if local_catalog.covers(version):
+            local_result = local_catalog.get_collection_modules(namespace, collection)
+            if local_result is not None:
+                return local_result
+
         cache_key = f"ansible_modules:{version}:{namespace}:{collection}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
+        cached_result = await cache.lookup_async(cache_key)
+
+        if isinstance(cached_result, NegativeEntry):
+            logger.info(f"Returning cached failure for {namespace}.{collection} modules ({cached_result.message})")
+            return []
+        if cached_result is not NOT_CACHED:
             logger.info(f"Returning cached modules for {namespace}.{collection} (Ansible {version})")
             return cached_result
         
         try:
-            # Construire URL de la collection
-            if version == "latest":
-                collection_url = f"https://docs.ansible.com/ansible/latest/collections/{namespace}/{collection}/index.html"
-            else:
-                collection_url = f"https://docs.ansible.com/projects/ansible/{version}/collections/{namespace}/{collection}/index.html"
-            
-            logger.info(f"Fetching modules from {collection_url}")
-            
-            session = await self.get_session()
-            async with session.get(collection_url) as response:
-                if response.status == 200:
-                    html_content = await response.text()
-                    modules = self._parse_modules_from_collection_html(html_content)
-                    
-                    # Cache le résultat
-                    cache.set(cache_key, modules, self.CACHE_TTL_MODULES)
-                    logger.info(f"Found {len(modules)} modules for {namespace}.{collection}")
-                    return modules
-                else:
-                    logger.error(f"Failed to fetch modules for {namespace}.{collection}: HTTP {response.status}")
-                    return []
-                    
+            return await single_flight.do(
+                cache_key, lambda: self._fetch_collection_modules(version, namespace, collection, cache_key)
+            )
+        except UpstreamHTTPError as e:
+            logger.error(f"Error fetching modules for {namespace}.{collection}: {str(e)}")
+            cache.set_negative(cache_key, e.status, str(e), e.url)
+            return []
         except Exception as e:
             logger.error(f"Error fetching modules for {namespace}.{collection}: {str(e)}")
             return []
+
+    async def _fetch_collection_modules(
+        self, version: str, namespace: str, collection: str, cache_key: str
+    ) -> List[Dict[str, Any]]:
+        """Télécharge, parse et met en cache la page d'une collection"""
+        collection_url = self._collection_url(version, namespace, collection)
+
+        logger.info(f"Fetching modules from {collection_url}")
+
+        not_modified, html_content, validators = await self._fetch_page(
+            collection_url, cache_key, self.CACHE_TTL_MODULES
+        )
+        if not_modified is not NOT_CACHED:
+            return not_modified
+
+        modules = await self._parse("_parse_modules_from_collection_html", html_content)
+
+        # Cache le résultat
+        cache.set(cache_key, modules, self.CACHE_TTL_MODULES, validators=validators)
+        module_search.index_modules(version, namespace, collection, modules)
+        logger.info(f"Found {len(modules)} modules for {namespace}.{collection}")
+
+        # La version de la collection (docs-blob) est sur la même page
+        collection_version = self._parse_collection_version(html_content)
+        if collection_version:
+            cache.set(f"ansible_collection_version:{version}:{namespace}:{collection}",
+                      collection_version, self.CACHE_TTL_MODULES)
+        return modules
+
+    @staticmethod
+    def _collection_url(version: str, namespace: str, collection: str) -> str:
+        if version == "latest":
+            return f"https://docs.ansible.com/ansible/latest/collections/{namespace}/{collection}/index.html"
+        return f"https://docs.ansible.com/projects/ansible/{version}/collections/{namespace}/{collection}/index.html"
+
+    @staticmethod
+    def _parse_collection_version(html: str) -> Optional[str]:
+        """Version de la collection livrée avec la version Ansible documentée"""
+        match = COLLECTION_VERSION_RE.search(html)
+        return match.group(1) if match else None
+
+    async def get_collection_version(self, version: str, namespace: str, collection: str) -> Optional[str]:
+        """
+        Récupère la version d'une collection incluse dans une version Ansible
+
+        Returns:
+            Version de la collection (ex: 8.2.1), None si inconnue
+        """
+        cache_key = f"ansible_collection_version:{version}:{namespace}:{collection}"
+        cached_result = await cache.lookup_async(cache_key)
+
+        if isinstance(cached_result, NegativeEntry):
+            return None
+        if cached_result is not NOT_CACHED:
+            return cached_result
+
+        try:
+            return await single_flight.do(
+                cache_key, lambda: self._fetch_collection_version(version, namespace, collection, cache_key)
+            )
+        except UpstreamHTTPError as e:
+            logger.warning(f"Error fetching version of {namespace}.{collection}: {str(e)}")
+            cache.set_negative(cache_key, e.status, str(e), e.url)
+            return None
+
+    async def _fetch_collection_version(
+        self, version: str, namespace: str, collection: str, cache_key: str
+    ) -> Optional[str]:
+        """Télécharge la page d'une collection pour y lire sa version"""
+        not_modified, html_content, validators = await self._fetch_page(
+            self._collection_url(version, namespace, collection), cache_key, self.CACHE_TTL_MODULES
+        )
+        if not_modified is not NOT_CACHED:
+            return not_modified
+
+        collection_version = self._parse_collection_version(html_content)
+        if collection_version:
+            cache.set(cache_key, collection_version, self.CACHE_TTL_MODULES, validators=validators)
+        return collection_version
     
     def _parse_modules_from_collection_html(self, html: str) -> List[Dict[str, Any]]:
         """
@@ -222,7 +382,7 @@ class AnsibleCollectionsService(BaseHTTPService):
         modules = []
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = make_soup(html)
             
             # Chercher la section "Plugin Index" ou "Modules"
             # Format: liens vers module_name_module.html
@@ -261,55 +421,238 @@ class AnsibleCollectionsService(BaseHTTPService):
     
     async def get_module_schema(self, version: str, namespace: str, collection: str, module: str) -> Dict[str, Any]:
         """
-        Récupère le schéma d'un module en parsant sa documentation HTML
+        Récupère le schéma d'un module
+
+        Sources : l'index local de la version Ansible installée, puis les
+        métadonnées de documentation (ansible-doc, docs-blob Galaxy), la
+        documentation HTML en dernier recours.
         """
+        if local_catalog.covers(version):
+            local_result = local_catalog.get_module_schema(namespace, collection, module)
+            if local_result is not None:
+                return local_result
+
         cache_key = f"ansible_schema:{version}:{namespace}:{collection}:{module}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
+        cached_result = await cache.lookup_async(cache_key)
+
+        if isinstance(cached_result, NegativeEntry):
+            logger.info(f"Returning cached failure for {namespace}.{collection}.{module} ({cached_result.message})")
+            raise UpstreamHTTPError(cached_result.status, cached_result.url, cached_result.message)
+        if cached_result is not NOT_CACHED:
             logger.info(f"Returning cached schema for {namespace}.{collection}.{module}")
             return cached_result
         
         try:
-            # Construire URL du module
-            if version == "latest":
-                module_url = f"https://docs.ansible.com/ansible/latest/collections/{namespace}/{collection}/{module}_module.html"
-            else:
-                module_url = f"https://docs.ansible.com/projects/ansible/{version}/collections/{namespace}/{collection}/{module}_module.html"
-            
-            logger.info(f"Fetching schema from {module_url}")
-            
-            session = await self.get_session()
-            async with session.get(module_url) as response:
-                if response.status == 200:
-                    html_content = await response.text()
-                    schema = self._parse_module_schema_from_html(html_content, module)
-                    
-                    # Cache le résultat
-                    cache.set(cache_key, schema, self.CACHE_TTL_SCHEMA)
-                    logger.info(f"Extracted schema for {namespace}.{collection}.{module}")
-                    return schema
-                else:
-                    logger.error(f"Failed to fetch module documentation: HTTP {response.status}")
-                    raise Exception(f"Module documentation not available (HTTP {response.status})")
-                    
+            return await single_flight.do(
+                cache_key, lambda: self._fetch_module_schema(version, namespace, collection, module, cache_key)
+            )
+        except UpstreamHTTPError as e:
+            logger.error(f"Error fetching schema for {namespace}.{collection}.{module}: {str(e)}")
+            cache.set_negative(cache_key, e.status, str(e), e.url)
+            raise
         except Exception as e:
             logger.error(f"Error fetching schema for {namespace}.{collection}.{module}: {str(e)}")
             raise
+
+    async def get_module_schemas(
+        self, version: str, fqcns: List[str], concurrency: Optional[int] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """
+        Récupère les schémas de plusieurs modules en une fois
+
+        Les schémas en cache (ou dans l'index local) sont résolus
+        immédiatement, les autres sont récupérés en parallèle via
+        get_module_schema avec au plus `concurrency` téléchargements.
+
+        Args:
+            version: Version Ansible
+            fqcns: Noms complets des modules (ex: community.general.ufw)
+            concurrency: Récupérations simultanées (défaut: settings.MODULE_SCHEMAS_BATCH_CONCURRENCY)
+
+        Returns:
+            (schemas, errors): {fqcn: schéma} et {fqcn: message d'erreur}
+        """
+        schemas: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        misses: List[Tuple[str, str, str, str]] = []
+
+        for fqcn in dict.fromkeys(fqcns):
+            parts = fqcn.split(".")
+            if len(parts) != 3 or not all(parts):
+                errors[fqcn] = "Invalid module name, expected namespace.collection.module"
+                continue
+            namespace, collection, module = parts
+
+            if local_catalog.covers(version):
+                local_result = local_catalog.get_module_schema(namespace, collection, module)
+                if local_result is not None:
+                    schemas[fqcn] = local_result
+                    continue
+            cached_result = await cache.lookup_async(f"ansible_schema:{version}:{namespace}:{collection}:{module}")
+            if isinstance(cached_result, NegativeEntry):
+                errors[fqcn] = cached_result.message
+            elif cached_result is not NOT_CACHED:
+                schemas[fqcn] = cached_result
+            else:
+                misses.append((fqcn, namespace, collection, module))
+
+        if misses:
+            logger.info(f"Fetching {len(misses)} module schemas for Ansible {version} ({len(schemas)} cached)")
+            semaphore = asyncio.Semaphore(concurrency or settings.MODULE_SCHEMAS_BATCH_CONCURRENCY)
+
+            async def fetch(fqcn: str, namespace: str, collection: str, module: str) -> None:
+                async with semaphore:
+                    try:
+                        schemas[fqcn] = await self.get_module_schema(version, namespace, collection, module)
+                    except Exception as e:
+                        errors[fqcn] = str(e)
+
+            await asyncio.gather(*(fetch(*miss) for miss in misses))
+
+        return schemas, errors
+
+    def search_modules(self, version: str, query: str, limit: int = 20, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        Recherche plein texte des modules d'une version Ansible
+
+        Seuls les modules déjà récupérés (listes de modules, schémas, index
+        local) sont indexés : le crawler du catalogue complète l'index.
+        """
+        if local_catalog.covers(version):
+            version = local_catalog.ansible_version
+        return module_search.search(version, query, limit, fuzzy)
+
+    async def diff_collection(
+        self, version: str, other_version: str, namespace: str, collection: str
+    ) -> Dict[str, Any]:
+        """
+        Compare les modules d'une collection entre deux versions Ansible
+
+        Les schémas sont comparés par empreinte de contenu : deux entrées de
+        cache pointant sur le même blob sont identiques sans autre calcul,
+        sinon l'empreinte est calculée sans le champ "source" (un même
+        schéma peut venir d'ansible-doc pour une version et du docs-blob
+        pour l'autre).
+
+        Returns:
+            added / removed (modules), changed (modules dont le schéma
+            diffère, avec le détail des paramètres), unchanged (nombre),
+            errors ({fqcn: message} des schémas non récupérés)
+        """
+        modules, other_modules = await asyncio.gather(
+            self.get_collection_modules(version, namespace, collection),
+            self.get_collection_modules(other_version, namespace, collection)
+        )
+        names = {m["name"] for m in modules}
+        other_names = {m["name"] for m in other_modules}
+        common = sorted(names & other_names)
+
+        fqcns = [f"{namespace}.{collection}.{module}" for module in common]
+        (schemas, errors), (other_schemas, other_errors) = await asyncio.gather(
+            self.get_module_schemas(version, fqcns),
+            self.get_module_schemas(other_version, fqcns)
+        )
+        errors.update(other_errors)
+
+        changed = []
+        unchanged = 0
+        for module, fqcn in zip(common, fqcns):
+            if fqcn not in schemas or fqcn not in other_schemas:
+                continue
+            digest = cache.get_digest(f"ansible_schema:{version}:{namespace}:{collection}:{module}")
+            other_digest = cache.get_digest(f"ansible_schema:{other_version}:{namespace}:{collection}:{module}")
+            if (digest is not None and digest == other_digest) or \
+                    _schema_fingerprint(schemas[fqcn]) == _schema_fingerprint(other_schemas[fqcn]):
+                unchanged += 1
+                continue
+            changed.append({"module": module, **_diff_parameters(schemas[fqcn], other_schemas[fqcn])})
+
+        return {
+            "added": sorted(other_names - names),
+            "removed": sorted(names - other_names),
+            "changed": changed,
+            "unchanged": unchanged,
+            "errors": errors
+        }
+
+    async def _fetch_module_schema(
+        self, version: str, namespace: str, collection: str, module: str, cache_key: str
+    ) -> Dict[str, Any]:
+        """Télécharge, parse et met en cache la documentation d'un module"""
+        schema = await self._fetch_structured_schema(version, namespace, collection, module)
+        if schema is not None:
+            cache.set(cache_key, schema, self.CACHE_TTL_SCHEMA)
+            module_search.index_schema(version, namespace, collection, module, schema)
+            logger.info(f"Schema for {namespace}.{collection}.{module} from {schema['source']}")
+            return schema
+
+        # Construire URL du module
+        if version == "latest":
+            module_url = f"https://docs.ansible.com/ansible/latest/collections/{namespace}/{collection}/{module}_module.html"
+        else:
+            module_url = f"https://docs.ansible.com/projects/ansible/{version}/collections/{namespace}/{collection}/{module}_module.html"
+
+        logger.info(f"Fetching schema from {module_url}")
+
+        not_modified, html_content, validators = await self._fetch_page(
+            module_url, cache_key, self.CACHE_TTL_SCHEMA, "Module documentation not available"
+        )
+        if not_modified is not NOT_CACHED:
+            return not_modified
+
+        schema = await self._parse("_parse_module_schema_from_html", html_content, module)
+
+        # Cache le résultat
+        cache.set(cache_key, schema, self.CACHE_TTL_SCHEMA, validators=validators)
+        module_search.index_schema(version, namespace, collection, module, schema)
+        logger.info(f"Extracted schema for {namespace}.{collection}.{module}")
+        return schema
     
+    async def _fetch_structured_schema(
+        self, version: str, namespace: str, collection: str, module: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Schéma depuis les métadonnées de documentation, dans l'ordre de
+        settings.MODULE_SCHEMA_SOURCES
+
+        Returns:
+            Schéma, None si aucune source structurée ne documente le module
+        """
+        for source in settings.module_schema_sources_list:
+            try:
+                if source == "ansible-doc":
+                    schema = await module_docs_service.get_ansible_doc_schema(version, namespace, collection, module)
+                elif source == "docs-blob":
+                    collection_version = await self.get_collection_version(version, namespace, collection)
+                    schema = None
+                    if collection_version:
+                        schema = await module_docs_service.get_docs_blob_schema(
+                            namespace, collection, collection_version, module
+                        )
+                else:
+                    logger.warning(f"Unknown module schema source: {source}")
+                    continue
+            except Exception as e:
+                logger.warning(f"Schema source {source} failed for {namespace}.{collection}.{module}: {str(e)}")
+                continue
+            if schema is not None:
+                return schema
+        return None
+
     def _parse_module_schema_from_html(self, html: str, module_name: str) -> Dict[str, Any]:
         """
         Parse le schéma des paramètres depuis la documentation HTML du module
         """
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = make_soup(html)
             
             schema = {
                 "module": module_name,
                 "description": "",
                 "parameters": [],
                 "examples": [],
-                "return_values": []
+                "return_values": [],
+                "source": "html"
             }
             
             # Extraire la description principale
@@ -340,7 +683,8 @@ class AnsibleCollectionsService(BaseHTTPService):
                 "description": f"Documentation parsing failed for {module_name}",
                 "parameters": [],
                 "examples": [],
-                "return_values": []
+                "return_values": [],
+                "source": "html"
             }
     
     def _extract_parameters_from_table(self, table_elem) -> List[Dict[str, Any]]:
@@ -460,5 +804,30 @@ class AnsibleCollectionsService(BaseHTTPService):
         
         return examples
 
+def _schema_fingerprint(schema: Dict[str, Any]) -> str:
+    """Empreinte du contenu d'un schéma, indépendante de sa source"""
+    return content_digest({k: v for k, v in schema.items() if k != "source"})[0]
+
+
+def _diff_parameters(schema: Dict[str, Any], other_schema: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Paramètres ajoutés, supprimés et modifiés entre deux schémas d'un module"""
+    parameters = {p["name"]: p for p in schema.get("parameters", []) if p.get("name")}
+    other_parameters = {p["name"]: p for p in other_schema.get("parameters", []) if p.get("name")}
+    return {
+        "parameters_added": sorted(other_parameters.keys() - parameters.keys()),
+        "parameters_removed": sorted(parameters.keys() - other_parameters.keys()),
+        "parameters_changed": sorted(
+            name for name in parameters.keys() & other_parameters.keys()
+            if parameters[name] != other_parameters[name]
+        )
+    }
+
+
+def _parse_in_worker(method_name: str, *args: Any) -> Any:
+    """Point d'entrée des processus de parsing (picklable)"""
+    return getattr(ansible_collections_service, method_name)(*args)
+
+
 # Instance globale du service
-ansible_collections_service = AnsibleCollectionsService()
\ No newline at end of file
+ansible_collections_service = AnsibleCollectionsService()
+ansible_collections_service.register_cache_refreshers()
\ No newline at end of file
@@ -6,7 +6,7 @@ import re
 import logging
 from typing import List
 from app.core.http_service import BaseHTTPService
-from app.services.cache_service import cache
+from app.services.cache_service import cache, NOT_CACHED
 
 logger = logging.getLogger(__name__)
 
@@ -35,38 +35,36 @@ class AnsibleVersionsService(BaseHTTPService):
             Liste des versions Ansible disponibles
         """
         if not force_refresh:
-            cached_versions = cache.get(self.CACHE_KEY_VERSIONS)
+            cached_versions = await cache.get_async(self.CACHE_KEY_VERSIONS)
             if cached_versions:
                 logger.info(f"Returning cached Ansible versions: {len(cached_versions)} versions")
                 return cached_versions
         
         try:
             logger.info("Fetching Ansible versions from documentation")
-            session = await self.get_session()
-            
-            async with session.get(f"{self.ANSIBLE_DOCS_BASE_URL}/ansible/") as response:
-                if response.status == 200:
-                    html_content = await response.text()
-                    versions = self._parse_versions_from_html(html_content)
-                    
-                    # Validation des versions
-                    validated_versions = await self._validate_versions(versions[:10])  # Valide top 10
-                    
-                    if validated_versions:
-                        # Cache avec TTL de 24h
-                        cache.set(self.CACHE_KEY_VERSIONS, validated_versions, self.CACHE_TTL)
-                        logger.info(f"Found and validated {len(validated_versions)} Ansible versions")
-                        return validated_versions
-                    else:
-                        logger.warning("No versions validated, using fallback")
-                        return self._get_fallback_versions()
+            status, html_content, _ = await self.fetch(f"{self.ANSIBLE_DOCS_BASE_URL}/ansible/")
+
+            if status == 200:
+                versions = self._parse_versions_from_html(html_content)
+
+                # Validation des versions
+                validated_versions = await self._validate_versions(versions[:10])  # Valide top 10
+
+                if validated_versions:
+                    # Cache avec TTL de 24h
+                    cache.set(self.CACHE_KEY_VERSIONS, validated_versions, self.CACHE_TTL)
+                    logger.info(f"Found and validated {len(validated_versions)} Ansible versions")
+                    return validated_versions
                 else:
-                    logger.error(f"Failed to fetch Ansible versions: HTTP {response.status}")
-                    return self._get_fallback_versions()
-                    
+                    logger.warning("No versions validated, using fallback")
+                    return self._get_stale_or_fallback_versions()
+            else:
+                logger.error(f"Failed to fetch Ansible versions: HTTP {status}")
+                return self._get_stale_or_fallback_versions()
+
         except Exception as e:
             logger.error(f"Error fetching Ansible versions: {str(e)}")
-            return self._get_fallback_versions()
+            return self._get_stale_or_fallback_versions()
     
     def _parse_versions_from_html(self, html: str) -> List[str]:
         """
@@ -124,6 +122,17 @@ class AnsibleVersionsService(BaseHTTPService):
         
         return validated
     
+    def _get_stale_or_fallback_versions(self) -> List[str]:
+        """
+        Dernière liste connue (même expirée) si docs.ansible.com est indisponible,
+        sinon les versions de fallback
+        """
+        stale = cache.get_stale(self.CACHE_KEY_VERSIONS)
+        if stale is not NOT_CACHED:
+            logger.warning("Ansible docs unavailable, serving last known versions")
+            return stale
+        return self._get_fallback_versions()
+
     def _get_fallback_versions(self) -> List[str]:
         """
         Versions de fallback en cas d'échec du scraping
@@ -0,0 +1,195 @@
+"""
+Cache eviction policies for EnhancedCache
+
+Each policy tracks the keys held by the cache and designates the next
+victim when the cache exceeds its entry or memory budget.
+
+Available policies:
+- lru: evict the least recently used key
+- lfu: evict the least frequently used key (ties broken by recency)
+- ttl: evict the key closest to expiration first
+
+All bookkeeping operations are O(1) (O(log n) for the ttl heap) so that
+eviction stays cheap even with hundreds of thousands of schema keys.
+"""
+
+import heapq
+import itertools
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class EvictionPolicy:
+    """
+    Base class for eviction policies.
+
+    The cache calls the hooks below whenever a key is inserted, read or
+    removed, and asks select_victim() for a key to drop when over budget.
+    """
+
+    name = "base"
+
+    def on_insert(self, key: str, entry: Dict[str, Any]) -> None:
+        """Called when a key is inserted or overwritten"""
+        raise NotImplementedError
+
+    def on_access(self, key: str, entry: Dict[str, Any]) -> None:
+        """Called on a cache hit"""
+        raise NotImplementedError
+
+    def on_remove(self, key: str) -> None:
+        """Called when a key leaves the cache (delete, expiry or eviction)"""
+        raise NotImplementedError
+
+    def select_victim(self) -> Optional[str]:
+        """Return the key to evict next, or None if nothing is tracked"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Forget all tracked keys"""
+        raise NotImplementedError
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently used eviction backed by an OrderedDict"""
+
+    name = "lru"
+
+    def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def on_insert(self, key: str, entry: Dict[str, Any]) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def on_access(self, key: str, entry: Dict[str, Any]) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def on_remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def select_victim(self) -> Optional[str]:
+        if not self._order:
+            return None
+        return next(iter(self._order))
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class LFUPolicy(EvictionPolicy):
+    """
+    Least frequently used eviction with O(1) frequency buckets.
+
+    Keys are grouped by access count; within a bucket the oldest key is
+    evicted first, so LFU degrades to LRU among equally popular keys.
+    """
+
+    name = "lfu"
+
+    def __init__(self):
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+
+    def _move(self, key: str, old_freq: Optional[int], new_freq: int) -> None:
+        if old_freq is not None:
+            bucket = self._buckets[old_freq]
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[old_freq]
+        self._buckets.setdefault(new_freq, OrderedDict())[key] = None
+        self._freq[key] = new_freq
+
+    def on_insert(self, key: str, entry: Dict[str, Any]) -> None:
+        old = self._freq.get(key)
+        # Overwriting a key counts as a use, new keys start at 1
+        self._move(key, old, (old or 0) + 1)
+
+    def on_access(self, key: str, entry: Dict[str, Any]) -> None:
+        old = self._freq.get(key)
+        if old is not None:
+            self._move(key, old, old + 1)
+
+    def on_remove(self, key: str) -> None:
+        freq = self._freq.pop(key, None)
+        if freq is not None:
+            bucket = self._buckets[freq]
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[freq]
+
+    def select_victim(self) -> Optional[str]:
+        if not self._buckets:
+            return None
+        # Number of distinct frequencies is small compared to number of keys
+        return next(iter(self._buckets[min(self._buckets)]))
+
+    def clear(self) -> None:
+        self._freq.clear()
+        self._buckets.clear()
+
+
+class TTLPolicy(EvictionPolicy):
+    """
+    TTL-priority eviction: keys closest to expiration are evicted first.
+
+    Uses a min-heap with lazy invalidation: overwritten or removed keys
+    leave stale heap items that are skipped when popped.
+    """
+
+    name = "ttl"
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        self._expires: Dict[str, float] = {}
+        self._counter = itertools.count()
+
+    def on_insert(self, key: str, entry: Dict[str, Any]) -> None:
+        self._expires[key] = entry["expires"]
+        heapq.heappush(self._heap, (entry["expires"], next(self._counter), key))
+        # Compact when stale items dominate the heap
+        if len(self._heap) > 2 * len(self._expires) + 64:
+            self._heap = [(exp, next(self._counter), k) for k, exp in self._expires.items()]
+            heapq.heapify(self._heap)
+
+    def on_access(self, key: str, entry: Dict[str, Any]) -> None:
+        pass
+
+    def on_remove(self, key: str) -> None:
+        self._expires.pop(key, None)
+
+    def select_victim(self) -> Optional[str]:
+        while self._heap:
+            expires, _, key = self._heap[0]
+            if self._expires.get(key) == expires:
+                return key
+            heapq.heappop(self._heap)
+        return None
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._expires.clear()
+
+
+EVICTION_POLICIES = {
+    LRUPolicy.name: LRUPolicy,
+    LFUPolicy.name: LFUPolicy,
+    TTLPolicy.name: TTLPolicy,
+}
+
+
+def create_eviction_policy(name: str) -> EvictionPolicy:
+    """
+    Create an eviction policy by name.
+
+    Raises:
+        ValueError: If the policy name is unknown
+    """
+    policy_cls = EVICTION_POLICIES.get(name.lower())
+    if policy_cls is None:
+        raise ValueError(
+            f"Unknown cache eviction policy '{name}'. "
+            f"Available policies: {', '.join(sorted(EVICTION_POLICIES))}"
+        )
+    return policy_cls()
@@ -0,0 +1,148 @@
+"""
+Segment index over colon-delimited cache keys
+
+Cache keys are built as colon-separated segments, e.g.
+ansible_schema:{version}:{namespace}:{collection}:{module}. The index
+stores them in a trie (one level per segment), so pattern lookups only
+visit the branches that can match instead of scanning every key.
+
+Pattern semantics (glob per segment):
+- Segments are matched with fnmatch rules (*, ?, [seq]) against a single
+  key segment: "ansible_*:13:*" matches every key of version 13 in any
+  ansible_* family.
+- A last segment ending with "*" also matches everything below it, so
+  "ansible_schema:13:*" and "ansible_schema:13*" remove whole subtrees,
+  like the previous fnmatch-based implementation.
+
+Literal segments cost one dict lookup; wildcard segments only iterate the
+children of the current node. Cost is proportional to the matches.
+"""
+
+from fnmatch import fnmatchcase
+from typing import Dict, Iterator, List
+
+SEPARATOR = ":"
+GLOB_CHARS = frozenset("*?[")
+
+
+def _is_glob(segment: str) -> bool:
+    return not GLOB_CHARS.isdisjoint(segment)
+
+
+def match_key(pattern: str, key: str) -> bool:
+    """
+    Check a single key against a pattern using the index semantics.
+
+    Used to filter keys that did not come from the index (e.g. Redis SCAN
+    results, where * also matches across colons).
+    """
+    pattern_segments = pattern.split(SEPARATOR)
+    key_segments = key.split(SEPARATOR)
+    last = len(pattern_segments) - 1
+    for i, segment in enumerate(pattern_segments):
+        if i >= len(key_segments):
+            return False
+        if not fnmatchcase(key_segments[i], segment):
+            return False
+        if i == last and segment.endswith("*"):
+            return True
+    return len(key_segments) == len(pattern_segments)
+
+
+class _Node:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.terminal = False
+
+
+class KeyIndex:
+    """
+    Trie of cache keys split on ':'.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str) -> None:
+        """Index a key (no-op if already indexed)"""
+        node = self._root
+        for segment in key.split(SEPARATOR):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node()
+            node = child
+        if not node.terminal:
+            node.terminal = True
+            self._size += 1
+
+    def discard(self, key: str) -> None:
+        """Remove a key from the index, pruning empty branches"""
+        path = []
+        node = self._root
+        for segment in key.split(SEPARATOR):
+            child = node.children.get(segment)
+            if child is None:
+                return
+            path.append((node, segment))
+            node = child
+        if not node.terminal:
+            return
+        node.terminal = False
+        self._size -= 1
+
+        # Prune nodes that no longer lead to any key
+        for parent, segment in reversed(path):
+            child = parent.children[segment]
+            if child.terminal or child.children:
+                break
+            del parent.children[segment]
+
+    def clear(self) -> None:
+        """Remove all keys"""
+        self._root = _Node()
+        self._size = 0
+
+    def match(self, pattern: str = "*") -> List[str]:
+        """Return the indexed keys matching pattern"""
+        results: List[str] = []
+        self._match(self._root, pattern.split(SEPARATOR), 0, [], results)
+        return results
+
+    def _match(self, node: _Node, segments: List[str], depth: int, path: List[str], results: List[str]) -> None:
+        segment = segments[depth]
+        is_last = depth == len(segments) - 1
+
+        if _is_glob(segment):
+            candidates = [
+                (name, child) for name, child in node.children.items()
+                if fnmatchcase(name, segment)
+            ]
+        else:
+            child = node.children.get(segment)
+            candidates = [(segment, child)] if child is not None else []
+
+        for name, child in candidates:
+            path.append(name)
+            if not is_last:
+                self._match(child, segments, depth + 1, path, results)
+            elif segment.endswith("*"):
+                results.extend(self._walk(child, path))
+            elif child.terminal:
+                results.append(SEPARATOR.join(path))
+            path.pop()
+
+    def _walk(self, node: _Node, path: List[str]) -> Iterator[str]:
+        """Yield every key in the subtree of node (node included)"""
+        stack = [(node, list(path))]
+        while stack:
+            current, current_path = stack.pop()
+            if current.terminal:
+                yield SEPARATOR.join(current_path)
+            for name, child in reversed(list(current.children.items())):
+                stack.append((child, current_path + [name]))
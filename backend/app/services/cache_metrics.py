@@ -0,0 +1,147 @@
+"""
+Cache metrics per key family and Prometheus text exposition
+
+Hit/miss/key counters per family are maintained by EnhancedCache (see
+get_stats()["families"]). This module adds fill latency histograms: the
+time spent by the fetch that fills a cache miss, recorded by the
+single-flight coalescer so that service fetches, @cached_async functions
+and background refreshes are all measured once per upstream call.
+
+render_prometheus() formats everything in the Prometheus text format
+(version 0.0.4) without requiring the prometheus_client package.
+"""
+
+import bisect
+from typing import Any, Dict, List, Tuple
+
+METRIC_PREFIX = "automation_factory_cache"
+
+# Upper bounds in seconds (scraping docs.ansible.com usually takes 0.1-5s)
+FILL_LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class LatencyHistogram:
+    """Cumulative histogram with fixed bucket bounds"""
+
+    def __init__(self, buckets: Tuple[float, ...] = FILL_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs including +Inf"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((_format_float(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class CacheMetrics:
+    """Fill latency and fill error counters per key family"""
+
+    def __init__(self):
+        self._fills: Dict[str, LatencyHistogram] = {}
+        self._fill_errors: Dict[str, int] = {}
+
+    def observe_fill(self, family: str, seconds: float, error: bool = False) -> None:
+        """Record the duration of a fetch that filled (or failed to fill) a key"""
+        histogram = self._fills.get(family)
+        if histogram is None:
+            histogram = self._fills[family] = LatencyHistogram()
+        histogram.observe(seconds)
+        if error:
+            self._fill_errors[family] = self._fill_errors.get(family, 0) + 1
+
+    def get_fill_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Fill count, errors and mean latency per family"""
+        return {
+            family: {
+                "fills": histogram.count,
+                "errors": self._fill_errors.get(family, 0),
+                "avg_seconds": round(histogram.sum / histogram.count, 4) if histogram.count else 0
+            }
+            for family, histogram in self._fills.items()
+        }
+
+    def reset(self) -> None:
+        self._fills.clear()
+        self._fill_errors.clear()
+
+    def render_prometheus(self, cache_stats: Dict[str, Any]) -> str:
+        """
+        Render cache metrics in the Prometheus text format.
+
+        Args:
+            cache_stats: Output of EnhancedCache.get_stats()
+        """
+        lines: List[str] = []
+
+        def metric(name: str, metric_type: str, help_text: str, samples: List[Tuple[str, str, Any]]) -> None:
+            # samples: (name suffix, labels, value)
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{full_name}{suffix}{labels} {_format_float(value)}")
+
+        families = sorted(cache_stats.get("families", {}).items())
+        metric("hits_total", "counter", "Cache hits per key family",
+               [("", _labels(family=f), s["hits"]) for f, s in families])
+        metric("misses_total", "counter", "Cache misses per key family",
+               [("", _labels(family=f), s["misses"]) for f, s in families])
+        metric("keys", "gauge", "Keys held in memory per key family",
+               [("", _labels(family=f), s["keys"]) for f, s in families])
+
+        samples = []
+        for family, histogram in sorted(self._fills.items()):
+            for le, count in histogram.cumulative():
+                samples.append(("_bucket", _labels(family=family, le=le), count))
+            samples.append(("_sum", _labels(family=family), histogram.sum))
+            samples.append(("_count", _labels(family=family), histogram.count))
+        metric("fill_duration_seconds", "histogram",
+               "Duration of upstream fetches filling cache misses", samples)
+        metric("fill_errors_total", "counter", "Upstream fetches that failed to fill a key",
+               [("", _labels(family=f), c) for f, c in sorted(self._fill_errors.items())])
+
+        metric("entries", "gauge", "Keys held in memory", [("", "", cache_stats.get("total_keys", 0))])
+        metric("memory_bytes", "gauge", "Estimated memory used by cached values",
+               [("", "", cache_stats.get("estimated_memory_bytes", 0))])
+        for name, key, help_text in (
+            ("evictions_total", "evictions", "Keys evicted to stay within budget"),
+            ("expired_total", "expired", "Keys removed after their hard TTL"),
+            ("stale_hits_total", "stale_hits", "Stale values served while revalidating"),
+            ("l2_hits_total", "l2_hits", "Hits served by the shared Redis tier"),
+            ("coalesced_requests_total", "coalesced_requests", "Requests joined to a fetch in flight"),
+        ):
+            metric(name, "counter", help_text, [("", "", cache_stats.get(key, 0))])
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_float(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return str(value)
+
+
+# Global metrics registry
+cache_metrics = CacheMetrics()
@@ -0,0 +1,388 @@
+"""
+Redis-backed shared cache tier (L2) for EnhancedCache
+
+Every replica keeps its in-process cache (L1) and shares a Redis tier (L2)
+so that a catalog scraped by one pod is reused by all the others:
+
+- L1 miss -> L2 lookup -> L1 is populated with the remaining TTL
+- set/delete/delete_pattern/clear are written through to L2
+- Writes are broadcast on a pub/sub channel so other replicas drop their
+  stale L1 copies (they reload from L2 on next read)
+
+Redis is never waited for on the event loop: writes, deletes and
+invalidations called from it are queued to the tier's worker thread
+(write-behind), and reads from async code go through aget()
+(EnhancedCache.lookup_async()), which runs in the same thread, after the
+writes queued before it. Synchronous reads raise on the event loop.
+
+Values are stored in a compact format: a one byte header followed by
+compact JSON, zlib-compressed when larger than COMPRESS_THRESHOLD bytes.
+
+Works with any Redis-protocol client (redis-py, fakeredis for tests).
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from app.services.cache_key_index import match_key
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is listed in requirements.txt
+    redis = None
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Serialization format headers
+FORMAT_JSON = b"j"
+FORMAT_ZLIB = b"z"
+COMPRESS_THRESHOLD = 1024
+
+
+def serialize(value: Any) -> bytes:
+    """Serialize a value to the compact L2 format"""
+    payload = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    if len(payload) > COMPRESS_THRESHOLD:
+        return FORMAT_ZLIB + zlib.compress(payload, 6)
+    return FORMAT_JSON + payload
+
+
+def deserialize(data: bytes) -> Any:
+    """Deserialize a value stored in the compact L2 format"""
+    header, payload = data[:1], data[1:]
+    if header == FORMAT_ZLIB:
+        payload = zlib.decompress(payload)
+    elif header != FORMAT_JSON:
+        raise ValueError(f"Unknown cache serialization format: {header!r}")
+    return json.loads(payload)
+
+
+class RedisCacheTier:
+    """
+    Shared L2 cache tier on top of a Redis-protocol server.
+
+    Reads and writes use a synchronous client (EnhancedCache exposes a
+    synchronous API) with a short socket timeout, in a single worker thread
+    when called from the event loop (one thread keeps them in order);
+    invalidations are received by an asyncio pub/sub listener task.
+
+    When Redis is unreachable the tier backs off for RETRY_AFTER_SECONDS and
+    the cache keeps working from L1 only.
+    """
+
+    CHANNEL = "automation_factory:cache:invalidate"
+    RETRY_AFTER_SECONDS = 30
+
+    def __init__(
+        self,
+        client: Any,
+        async_client: Any = None,
+        key_prefix: str = "af:cache:",
+        channel: Optional[str] = None
+    ):
+        """
+        Args:
+            client: Synchronous Redis client (redis.Redis or compatible)
+            async_client: Asyncio Redis client used for pub/sub invalidation
+            key_prefix: Prefix applied to every key stored in Redis
+            channel: Pub/sub channel for invalidation messages
+        """
+        self._client = client
+        self._async_client = async_client
+        self.key_prefix = key_prefix
+        self.channel = channel or self.CHANNEL
+        self.instance_id = uuid.uuid4().hex
+        self._unavailable_until = 0.0
+        self._listener_task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="redis-cache-tier")
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "errors": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0
+        }
+
+    @classmethod
+    def from_url(cls, url: str, key_prefix: str = "af:cache:", socket_timeout: float = 0.25) -> "RedisCacheTier":
+        """Create a tier from a redis:// URL"""
+        if redis is None:
+            raise RuntimeError("redis package is not installed")
+        client = redis.Redis.from_url(
+            url,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout
+        )
+        async_client = aioredis.Redis.from_url(url)
+        return cls(client, async_client, key_prefix=key_prefix)
+
+    # ========================================
+    # Availability
+    # ========================================
+
+    @property
+    def available(self) -> bool:
+        """False while backing off after a Redis error"""
+        return time.monotonic() >= self._unavailable_until
+
+    def _on_error(self, operation: str, error: Exception) -> None:
+        self._stats["errors"] += 1
+        self._unavailable_until = time.monotonic() + self.RETRY_AFTER_SECONDS
+        logger.warning(
+            f"Redis cache tier {operation} failed, using L1 only for "
+            f"{self.RETRY_AFTER_SECONDS}s: {error}"
+        )
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    @staticmethod
+    def _on_event_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def _write_behind(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Run a write now, or queue it to the worker thread when called on the event loop"""
+        if self._on_event_loop():
+            self._executor.submit(fn, *args)
+        else:
+            fn(*args)
+
+    def _blocking(self, operation: str) -> None:
+        """Refuse a synchronous Redis read on the event loop"""
+        if self._on_event_loop():
+            raise RuntimeError(f"Redis cache tier {operation} would block the event loop")
+
+    async def flush(self) -> None:
+        """Wait for the queued writes"""
+        await asyncio.wrap_future(self._executor.submit(lambda: None))
+
+    # ========================================
+    # Key operations
+    # ========================================
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a value from Redis.
+
+        Returns:
+            (value, remaining_ttl_seconds) or None if not found/unavailable
+        """
+        if not self.available:
+            return None
+        self._blocking("get")
+        return self._get(key)
+
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.get(self._redis_key(key))
+            pipe.pttl(self._redis_key(key))
+            data, pttl = pipe.execute()
+        except Exception as e:
+            self._on_error("get", e)
+            return None
+
+        if data is None or pttl is None or pttl == -2:
+            self._stats["misses"] += 1
+            return None
+
+        try:
+            value = deserialize(data)
+        except Exception as e:
+            logger.warning(f"Discarding undecodable L2 entry {key}: {e}")
+            self._delete([key])
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        # pttl == -1 means no expiry in Redis (should not happen, keep a day)
+        remaining = pttl / 1000 if pttl > 0 else 86400
+        return value, remaining
+
+    async def aget(self, key: str) -> Optional[Tuple[Any, float]]:
+        """get() for the event loop, run in the worker thread after the queued writes"""
+        if not self.available:
+            return None
+        return await asyncio.wrap_future(self._executor.submit(self._get, key))
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Write a value to Redis with TTL (write-behind on the event loop)"""
+        if self.available:
+            self._write_behind(self._set, key, value, ttl_seconds)
+
+    def _set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        try:
+            self._client.set(
+                self._redis_key(key),
+                serialize(value),
+                px=max(1, int(ttl_seconds * 1000))
+            )
+            self._stats["sets"] += 1
+        except Exception as e:
+            self._on_error("set", e)
+
+    def delete(self, keys: List[str]) -> int:
+        """Delete keys from Redis (write-behind on the event loop, which counts 0)"""
+        if not keys or not self.available:
+            return 0
+        if self._on_event_loop():
+            self._executor.submit(self._delete, keys)
+            return 0
+        return self._delete(keys)
+
+    def _delete(self, keys: List[str]) -> int:
+        try:
+            return self._client.delete(*[self._redis_key(k) for k in keys])
+        except Exception as e:
+            self._on_error("delete", e)
+            return 0
+
+    def scan_keys(self, pattern: str = "*") -> List[str]:
+        """
+        List cache keys stored in Redis matching a pattern.
+
+        Redis MATCH lets * span ':' separators, so results are filtered with
+        the segment semantics of the L1 key index.
+        """
+        if not self.available:
+            return []
+        self._blocking("scan")
+        return self._scan_keys(pattern)
+
+    def _scan_keys(self, pattern: str) -> List[str]:
+        try:
+            prefix_len = len(self.key_prefix)
+            keys = []
+            for raw in self._client.scan_iter(match=self._redis_key(pattern), count=1000):
+                if isinstance(raw, bytes):
+                    raw = raw.decode("utf-8")
+                key = raw[prefix_len:]
+                if match_key(pattern, key):
+                    keys.append(key)
+            return keys
+        except Exception as e:
+            self._on_error("scan", e)
+            return []
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Delete all keys matching a glob pattern (write-behind on the event loop, which counts 0)"""
+        if not self.available:
+            return 0
+        if self._on_event_loop():
+            self._executor.submit(self._delete_pattern, pattern)
+            return 0
+        return self._delete_pattern(pattern)
+
+    def _delete_pattern(self, pattern: str) -> int:
+        keys = self._scan_keys(pattern)
+        deleted = 0
+        for i in range(0, len(keys), 500):
+            deleted += self._delete(keys[i:i + 500])
+        return deleted
+
+    def clear(self) -> int:
+        """Delete all keys owned by this cache (key prefix only)"""
+        return self.delete_pattern("*")
+
+    # ========================================
+    # Pub/sub invalidation
+    # ========================================
+
+    def publish_invalidation(
+        self,
+        keys: Optional[List[str]] = None,
+        pattern: Optional[str] = None,
+        clear: bool = False
+    ) -> None:
+        """Broadcast an invalidation to the other replicas (write-behind on the event loop)"""
+        if not self.available:
+            return
+        message = {"origin": self.instance_id}
+        if clear:
+            message["op"] = "clear"
+        elif pattern is not None:
+            message["op"] = "pattern"
+            message["pattern"] = pattern
+        else:
+            message["op"] = "delete"
+            message["keys"] = keys or []
+        self._write_behind(self._publish, message)
+
+    def _publish(self, message: Dict[str, Any]) -> None:
+        try:
+            self._client.publish(self.channel, json.dumps(message, separators=(",", ":")))
+            self._stats["invalidations_sent"] += 1
+        except Exception as e:
+            self._on_error("publish", e)
+
+    async def start_listener(self, on_invalidate: Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]) -> None:
+        """Start the background task applying invalidations from other replicas"""
+        if self._async_client is None:
+            logger.warning("Redis cache tier has no async client, invalidation listener disabled")
+            return
+        if self._listener_task and not self._listener_task.done():
+            return
+        self._listener_task = asyncio.create_task(self._listen(on_invalidate))
+
+    async def stop_listener(self) -> None:
+        """Stop the invalidation listener"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _listen(self, on_invalidate: Callable[[Dict[str, Any]], Any]) -> None:
+        """Subscribe to the invalidation channel, reconnecting on errors"""
+        while True:
+            pubsub = self._async_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                logger.info(f"Listening for cache invalidations on {self.channel}")
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        payload = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    if payload.get("origin") == self.instance_id:
+                        continue
+                    self._stats["invalidations_received"] += 1
+                    result = on_invalidate(payload)
+                    if asyncio.iscoroutine(result):
+                        await result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error, reconnecting: {e}")
+                await asyncio.sleep(5)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get L2 statistics"""
+        return {
+            "enabled": True,
+            "available": self.available,
+            "listening": bool(self._listener_task and not self._listener_task.done()),
+            **self._stats
+        }
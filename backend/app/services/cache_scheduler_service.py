@@ -1,11 +1,20 @@
 """
 Cache Scheduler Service - Automatic cache synchronization with Ansible docs
+
+Each sync refreshes the collections index of the recent Ansible versions,
+then starts a background crawl walking version -> namespace -> collection
+-> module index -> schema, so the whole catalog is cached before users
+open it. The crawl runs a bounded number of concurrent jobs and throttles
+upstream requests per host.
 """
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Optional, List, Callable, Any
+from typing import Optional, List, Callable, Any, Dict, Tuple
+from app.core.config import settings
+from app.core.http_service import HostRateLimiter, request_rate_limiter
 from app.services.ansible_collections_service import ansible_collections_service
 from app.services.ansible_versions_service import ansible_versions_service
 from app.services.cache_service import cache
@@ -22,6 +31,9 @@ class CacheSchedulerService:
     # Default sync interval: 24 hours
     SYNC_INTERVAL_HOURS = 24
 
+    # Minimum delay between two crawl progress notifications
+    CRAWL_PROGRESS_INTERVAL_SECONDS = 10
+
     def __init__(self):
         self._running = False
         self._task: Optional[asyncio.Task] = None
@@ -29,6 +41,8 @@ class CacheSchedulerService:
         self._next_sync: Optional[datetime] = None
         self._sync_in_progress = False
         self._notification_callbacks: List[Callable[[dict], Any]] = []
+        self._crawl_task: Optional[asyncio.Task] = None
+        self._crawl_stats: Optional[Dict[str, Any]] = None
 
     def register_notification_callback(self, callback: Callable[[dict], Any]):
         """Register a callback to be called when cache events occur"""
@@ -80,13 +94,15 @@ class CacheSchedulerService:
             return
 
         self._running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
-            self._task = None
+        for task in (self._task, self._crawl_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._crawl_task = None
 
         logger.info("⏹️ Cache scheduler stopped")
         await self._notify("scheduler_stopped", "Cache scheduler stopped")
@@ -163,6 +179,11 @@ class CacheSchedulerService:
                     logger.error(error_msg)
                     sync_results["errors"].append(error_msg)
 
+            # Warm collections, module lists and schemas in the background
+            if settings.CACHE_CRAWL_ENABLED:
+                crawl_versions = sync_results["versions_synced"][:settings.CACHE_CRAWL_VERSIONS]
+                sync_results["crawl"] = self.start_crawl(crawl_versions)
+
             # Update sync timestamps
             self._last_sync = datetime.utcnow()
             self._next_sync = self._last_sync + timedelta(hours=self.SYNC_INTERVAL_HOURS)
@@ -195,6 +216,131 @@ class CacheSchedulerService:
         finally:
             self._sync_in_progress = False
 
+    # ========================================
+    # Catalog crawler
+    # ========================================
+
+    def start_crawl(self, versions: List[str]) -> str:
+        """
+        Start a background crawl of the catalog of versions.
+
+        Returns:
+            "started", or "already_running" if a crawl is in progress
+        """
+        if self._crawl_task and not self._crawl_task.done():
+            logger.warning("Catalog crawl already in progress, skipping")
+            return "already_running"
+        self._crawl_task = asyncio.create_task(self.crawl_catalog(
+            versions,
+            concurrency=settings.CACHE_CRAWL_CONCURRENCY,
+            rate_per_host=settings.CACHE_CRAWL_RATE_PER_HOST,
+            include_schemas=settings.CACHE_CRAWL_SCHEMAS
+        ))
+        return "started"
+
+    async def crawl_catalog(
+        self,
+        versions: List[str],
+        concurrency: int = 8,
+        rate_per_host: float = 5.0,
+        include_schemas: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Walk version -> namespace -> collection -> module index -> schema.
+
+        Jobs are queued and consumed by `concurrency` workers; each job goes
+        through the regular service method, so cached entries are reused and
+        fetched ones are cached. Upstream requests of the crawl are limited
+        to rate_per_host requests per second per host.
+
+        Returns:
+            Crawl statistics (pages visited per level, errors, duration)
+        """
+        queue: "asyncio.Queue[Tuple[str, tuple]]" = asyncio.Queue()
+        stats = {
+            "versions": 0,
+            "namespaces": 0,
+            "collections": 0,
+            "modules": 0,
+            "schemas": 0,
+            "errors": 0,
+            "pending": 0
+        }
+        crawl_start = time.monotonic()
+        last_progress = crawl_start
+        self._crawl_stats = stats
+
+        async def run_job(kind: str, args: tuple) -> None:
+            if kind == "version":
+                version, = args
+                collections = await ansible_collections_service.get_collections(version)
+                for namespace in collections:
+                    queue.put_nowait(("namespace", (version, namespace)))
+                stats["versions"] += 1
+            elif kind == "namespace":
+                version, namespace = args
+                for collection in await ansible_collections_service.get_namespace_collections(version, namespace):
+                    queue.put_nowait(("collection", (version, namespace, collection)))
+                stats["namespaces"] += 1
+            elif kind == "collection":
+                version, namespace, collection = args
+                modules = await ansible_collections_service.get_collection_modules(version, namespace, collection)
+                if include_schemas:
+                    for module in modules:
+                        queue.put_nowait(("schema", (version, namespace, collection, module["name"])))
+                stats["collections"] += 1
+                stats["modules"] += len(modules)
+            elif kind == "schema":
+                await ansible_collections_service.get_module_schema(*args)
+                stats["schemas"] += 1
+
+        async def worker() -> None:
+            nonlocal last_progress
+            while True:
+                kind, args = await queue.get()
+                try:
+                    await run_job(kind, args)
+                except Exception as e:
+                    stats["errors"] += 1
+                    logger.debug(f"Crawl job {kind} {args} failed: {e}")
+                finally:
+                    queue.task_done()
+
+                now = time.monotonic()
+                if now - last_progress >= self.CRAWL_PROGRESS_INTERVAL_SECONDS:
+                    last_progress = now
+                    stats["pending"] = queue.qsize()
+                    await self._notify("cache_crawl_progress",
+                        f"Catalog crawl: {stats['collections']} collections, {stats['schemas']} schemas",
+                        dict(stats))
+
+        await self._notify("cache_crawl_started", f"Catalog crawl started for Ansible {', '.join(versions)}", {
+            "versions": versions,
+            "concurrency": concurrency,
+            "rate_per_host": rate_per_host
+        })
+
+        for version in versions:
+            queue.put_nowait(("version", (version,)))
+
+        # Tasks started below inherit the limiter: only crawl requests are throttled
+        token = request_rate_limiter.set(HostRateLimiter(rate_per_host))
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            request_rate_limiter.reset(token)
+
+        stats["pending"] = 0
+        stats["duration_seconds"] = round(time.monotonic() - crawl_start, 1)
+        logger.info(f"✅ Catalog crawl completed: {stats}")
+        await self._notify("cache_crawl_completed",
+            f"Catalog crawl completed in {stats['duration_seconds']:.1f}s", dict(stats))
+        return stats
+
     def get_status(self) -> dict:
         """Get current scheduler status"""
         return {
@@ -203,6 +349,8 @@ class CacheSchedulerService:
             "last_sync": self._last_sync.isoformat() if self._last_sync else None,
             "next_sync": self._next_sync.isoformat() if self._next_sync else None,
             "sync_interval_hours": self.SYNC_INTERVAL_HOURS,
+            "crawl_in_progress": bool(self._crawl_task and not self._crawl_task.done()),
+            "crawl": self._crawl_stats,
             "cache_stats": cache.get_stats()
         }
 
@@ -3,38 +3,261 @@ Enhanced cache service for Galaxy API responses with statistics
 
 Features:
 - In-memory cache with TTL
-- Statistics tracking (hits, misses, expired)
-- Pattern-based key deletion
+- Bounded size (max entries and approximate memory budget)
+- Pluggable eviction policy (LRU, LFU, TTL-priority)
+- Statistics tracking (hits, misses, expired, evictions), per key family
+- Fill latency histograms per key family (see cache_metrics)
+- Background reaper removing expired keys in bounded slices
+- Pattern-based key deletion and listing through a segment index (no full scans)
+- Optional shared Redis tier (L2) with pub/sub invalidation
+- Request coalescing (single-flight): concurrent misses share one fetch
+- Stale-while-revalidate (soft/hard TTL) and refresh-ahead for hot keys
+- Negative caching of failed upstream lookups (lookup() / set_negative())
+- Stale fallback when the upstream fails (get_stale())
+- HTTP validators (ETag/Last-Modified) per entry for conditional refreshes
+- Content-addressed payloads for selected key families: identical values
+  (e.g. a module schema unchanged across Ansible versions) are stored once
 - Generic @cached_async decorator for any async function
 """
 
+import asyncio
+import heapq
+import itertools
 import json
 import hashlib
 from functools import wraps
-from typing import Any, Dict, Optional, List, Callable, TypeVar
+from typing import Any, Awaitable, Dict, Optional, List, Callable, Tuple, TypeVar
 import logging
 import time
 from datetime import datetime
 
+from app.core.cache_config import CacheTTL
+from app.core.config import settings
+from app.services.cache_eviction import create_eviction_policy
+from app.services.cache_key_index import KeyIndex
+from app.services.cache_metrics import cache_metrics
+
 T = TypeVar('T')
 
 logger = logging.getLogger(__name__)
 
+def key_family(key: str) -> str:
+    """Key family of a cache key: its first colon-delimited segment"""
+    return key.split(":", 1)[0]
+
+
+class _NotCached:
+    """Type of the NOT_CACHED sentinel"""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "NOT_CACHED"
+
+
+# Returned by EnhancedCache.lookup() when a key is not cached, so that a
+# cached empty value ([] or {}) is distinguished from a miss
+NOT_CACHED = _NotCached()
+
+# Internal marker of lookups that found nothing in L1 (L2 still to check)
+_L1_MISS = object()
+
+
+class NegativeEntry:
+    """
+    Cached failure of an upstream lookup (HTTP 404, 5xx...).
+
+    Stored with set_negative() so repeated requests for a missing page are
+    answered locally until the negative TTL expires.
+    """
+
+    __slots__ = ("status", "message", "url")
+
+    def __init__(self, status: int, message: Optional[str] = None, url: Optional[str] = None):
+        self.status = status
+        self.message = message or f"HTTP {status}"
+        self.url = url
+
+    def __repr__(self) -> str:
+        return f"NegativeEntry(status={self.status}, message={self.message!r})"
+
+
+# Fixed per-entry overhead (entry dict, key string, policy bookkeeping)
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def estimate_size(key: str, value: Any) -> int:
+    """
+    Estimate the memory footprint of a cache entry in bytes.
+
+    Uses the compact JSON size of the value as an approximation; Python
+    objects are larger in memory but scale proportionally, which is what
+    matters for a budget.
+    """
+    try:
+        payload_size = len(json.dumps(value, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        payload_size = len(repr(value))
+    return payload_size + len(key) + ENTRY_OVERHEAD_BYTES
+
+
+def content_digest(value: Any) -> Tuple[str, int]:
+    """
+    Content hash of a JSON-compatible value and its compact JSON size.
+
+    Keys are sorted so that equal values always get the same digest.
+    """
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest(), len(payload)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller starts the work in its own task; callers arriving while
+    it runs await the same task. The shared task is shielded so that a
+    cancelled client request does not abort the fetch for the others.
+
+    Each execution is timed and recorded as a fill of the key's family in
+    cache_metrics.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn() for key, or join the execution already in flight"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._timed(key, fn))
+            self._flights[key] = flight
+            flight.add_done_callback(lambda f, key=key: self._forget(key, f))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced request for key: {key}")
+        return await asyncio.shield(flight)
+
+    async def _timed(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        try:
+            result = await fn()
+        except Exception:
+            cache_metrics.observe_fill(key_family(key), time.perf_counter() - start, error=True)
+            raise
+        cache_metrics.observe_fill(key_family(key), time.perf_counter() - start)
+        return result
+
+    def _forget(self, key: str, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not flight.cancelled():
+            flight.exception()
+
+    def in_flight(self) -> int:
+        """Number of keys currently being fetched"""
+        return len(self._flights)
+
+
+# Process-wide request coalescer, shared by the cache and the scraping services
+single_flight = SingleFlight()
+
+
 class EnhancedCache:
     """
     Enhanced in-memory cache with statistics and pattern-based operations
-    In production, replace with Redis
+
+    The cache is bounded by max_entries and max_bytes (0 or None disables
+    a limit). When a limit is exceeded, entries are evicted according to
+    the configured eviction policy.
+
+    An optional shared L2 tier (see cache_redis_tier.RedisCacheTier) can be
+    attached with attach_l2(): L1 misses are then looked up in L2 and all
+    writes are propagated to L2 and to the other replicas. Code on the event
+    loop reads with lookup_async()/get_async(), so an L1 miss never blocks
+    the loop on a Redis round trip.
+
+    Every entry has a soft TTL (the ttl given to set()) and a hard TTL (soft
+    TTL plus the stale window of its key family, see CacheTTL.STALE_WINDOWS).
+    For families with a registered refresher, reads between the soft and
+    hard TTL return the stale value immediately and refresh it in the
+    background; hot entries are also refreshed ahead of their soft TTL.
+
+    Expired entries are removed by a background reaper (start_reaper())
+    driven by a min-heap of hard expirations, so get_stats() never scans
+    the cache.
+
+    Values of the content_addressed families are interned by content hash:
+    entries hold the digest of their value and share one reference-counted
+    blob (digest -> value), whose size is counted once in the memory budget.
     """
+
+    REAPER_BATCH_SIZE = 500
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = "lru",
+        content_addressed: Optional[List[str]] = None
+    ):
         self._cache: Dict[str, Dict[str, Any]] = {}
+        self.content_addressed = frozenset(content_addressed or ())
+        self._blobs: Dict[str, Dict[str, Any]] = {}  # digest -> {"data", "refs", "size"}
+        self.max_entries = max_entries or None
+        self.max_bytes = max_bytes or None
+        self._policy = create_eviction_policy(eviction_policy)
+        self._index = KeyIndex()
+        self._bytes = 0
+        self._expiry_heap: List[tuple] = []
+        self._expiry_counter = itertools.count()
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._families: Dict[str, Dict[str, int]] = {}
+        self._l2 = None
+        self._refreshers: Dict[str, Callable[[str], Awaitable[Any]]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
         self._stats = {
             "hits": 0,
             "misses": 0,
             "sets": 0,
             "deletes": 0,
-            "expired": 0
+            "expired": 0,
+            "evictions": 0,
+            "l2_hits": 0,
+            "stale_hits": 0,
+            "background_refreshes": 0,
+            "refresh_failures": 0,
+            "negative_sets": 0,
+            "negative_hits": 0,
+            "revalidations": 0,
+            "deduplicated_sets": 0
         }
+
+    def attach_l2(self, tier) -> None:
+        """Attach a shared L2 tier (RedisCacheTier or compatible)"""
+        self._l2 = tier
+        logger.info("Shared L2 cache tier attached")
+
+    @property
+    def l2(self):
+        """The attached shared L2 tier, or None"""
+        return self._l2
+
+    def detach_l2(self) -> None:
+        """Detach the shared L2 tier"""
+        self._l2 = None
+
+    def register_refresher(self, family: str, refresher: Callable[[str], Awaitable[Any]]) -> None:
+        """
+        Register the background refresher of a key family.
+
+        refresher(key) must re-fetch the value for key and store it with
+        cache.set() (the services' _fetch_* methods do exactly that).
+        """
+        self._refreshers[family] = refresher
         
     def _make_key(self, prefix: str, **kwargs) -> str:
         """Create a cache key from parameters"""
@@ -45,71 +268,603 @@ class EnhancedCache:
         return ":".join(key_parts)
         
     def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        entry = self._cache.get(key)
-        if not entry:
-            self._stats["misses"] += 1
+        """
+        Get value from cache (L1, then shared L2 if attached).
+
+        Returns None when the key is not cached or holds a negative entry;
+        use lookup() to tell those cases and cached empty values apart.
+        """
+        value = self.lookup(key)
+        if value is NOT_CACHED or isinstance(value, NegativeEntry):
             return None
-            
-        # TTL check
-        if time.time() > entry["expires"]:
-            del self._cache[key]
-            self._stats["expired"] += 1
-            self._stats["misses"] += 1
+        return value
+
+    def lookup(self, key: str) -> Any:
+        """
+        Get the cached value of key, a NegativeEntry, or NOT_CACHED.
+
+        An L1 miss waits for the L2 tier, which raises RuntimeError on the
+        event loop: code there uses lookup_async() instead.
+        """
+        value = self._lookup_l1(key)
+        if value is _L1_MISS:
+            return self._promote_from_l2(key, self._l2.get(key) if self._l2 is not None else None)
+        return value
+
+    async def lookup_async(self, key: str) -> Any:
+        """lookup() whose L2 round trip does not block the event loop"""
+        value = self._lookup_l1(key)
+        if value is not _L1_MISS:
+            return value
+        found = await self._l2.aget(key) if self._l2 is not None else None
+        if key in self._cache:
+            # Set while L2 was queried: the local write is the newer one
+            value = self._lookup_l1(key)
+            if value is not _L1_MISS:
+                return value
+        return self._promote_from_l2(key, found)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get() whose L2 round trip does not block the event loop"""
+        value = await self.lookup_async(key)
+        if value is NOT_CACHED or isinstance(value, NegativeEntry):
             return None
-            
-        self._stats["hits"] += 1
+        return value
+
+    def _lookup_l1(self, key: str) -> Any:
+        """lookup() in L1 only, _L1_MISS if the key is not there"""
+        entry = self._cache.get(key)
+        now = time.time()
+        if entry and now > entry["expires"]:
+            # Hard TTL check
+            self._remove_entry(key)
+            self._stats["expired"] += 1
+            entry = None
+
+        if not entry:
+            return _L1_MISS
+
+        if isinstance(entry["data"], NegativeEntry):
+            # Negative entries are never revalidated, they just expire
+            entry["hits"] += 1
+            self._record_hit(key)
+            self._stats["negative_hits"] += 1
+            logger.debug(f"Cache NEGATIVE HIT for key: {key}")
+            return entry["data"]
+
+        refresher = self._refreshers.get(key_family(key))
+        if now > entry["soft_expires"]:
+            if refresher is None and now >= entry.get("retry_after", 0):
+                # Nobody can revalidate this entry: it is expired for readers
+                self._record_miss(key)
+                return NOT_CACHED
+            if refresher is None:
+                # The upstream just failed (see set_negative): serve stale
+                # until the negative TTL has elapsed
+                self._stats["stale_hits"] += 1
+                entry["hits"] += 1
+                self._record_hit(key)
+                return entry["data"]
+            # Stale-while-revalidate: serve stale, refresh in background
+            self._schedule_refresh(key, entry, refresher)
+            self._stats["stale_hits"] += 1
+        elif (
+            refresher is not None
+            and entry["hits"] >= CacheTTL.REFRESH_AHEAD_MIN_HITS
+            and now > entry["soft_expires"] - entry["ttl"] * CacheTTL.REFRESH_AHEAD_RATIO
+        ):
+            # Refresh-ahead for hot entries about to go stale
+            self._schedule_refresh(key, entry, refresher)
+
+        entry["hits"] += 1
+        self._policy.on_access(key, entry)
+        self._record_hit(key)
         logger.debug(f"Cache HIT for key: {key}")
         return entry["data"]
+
+    def get_stale(self, key: str) -> Any:
+        """
+        Cached value of key even past its soft TTL (within the hard TTL),
+        or NOT_CACHED.
+
+        For callers whose upstream fetch just failed: serving the stale
+        value beats an empty result.
+        """
+        entry = self._live_entry(key)
+        if entry is None:
+            return NOT_CACHED
+        self._stats["stale_hits"] += 1
+        logger.debug(f"Cache STALE fallback for key: {key}")
+        return entry["data"]
+
+    def _live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Positive entry of key within its hard TTL, ignoring the soft TTL"""
+        entry = self._cache.get(key)
+        if entry is None or time.time() > entry["expires"] or isinstance(entry["data"], NegativeEntry):
+            return None
+        return entry
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        entry: Dict[str, Any],
+        refresher: Callable[[str], Awaitable[Any]]
+    ) -> None:
+        """Start a background refresh of key unless one is already running"""
+        if key in self._refreshing or time.time() < entry.get("retry_after", 0):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No event loop (sync caller): the entry is served as is
+        self._stats["background_refreshes"] += 1
+        self._refreshing[key] = loop.create_task(self._refresh(key, refresher))
+
+    async def _refresh(self, key: str, refresher: Callable[[str], Awaitable[Any]]) -> None:
+        """Run a refresher through single-flight, backing off on failure"""
+        try:
+            # Shares the flight with any foreground fetch of the same key
+            await single_flight.do(key, lambda: refresher(key))
+        except Exception as e:
+            self._stats["refresh_failures"] += 1
+            entry = self._cache.get(key)
+            if entry is not None:
+                entry["retry_after"] = time.time() + CacheTTL.REFRESH_RETRY
+            logger.warning(f"Background refresh failed for key {key}, keeping stale value: {e}")
+        finally:
+            self._refreshing.pop(key, None)
         
-    def set(self, key: str, value: Any, ttl_seconds: int = 300) -> None:
-        """Set value in cache with TTL"""
-        self._cache[key] = {
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_seconds: int = 300
+    ) -> Any:
+        """
+        Get a value from cache or compute it with fetcher().
+
+        Concurrent misses for the same key are coalesced: fetcher() runs
+        once and every caller receives its result (or its exception).
+        A None result is returned but not cached; exceptions are not cached.
+        """
+        cached = await self.get_async(key)
+        if cached is not None:
+            return cached
+        return await single_flight.do(key, lambda: self._fetch_and_store(key, fetcher, ttl_seconds))
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_seconds: int
+    ) -> Any:
+        result = await fetcher()
+        if result is not None:
+            self.set(key, result, ttl_seconds)
+        return result
+
+    def _promote_from_l2(self, key: str, found: Optional[Tuple[Any, float]]) -> Any:
+        """Promote an L2 answer ((value, remaining TTL) or None) to L1"""
+        if found is not None:
+            value, remaining_ttl = found
+            # L2 holds the hard TTL: derive the soft TTL from the window
+            window = CacheTTL.stale_window(key)
+            self._store(key, value, remaining_ttl - window, window)
+            self._record_hit(key)
+            self._stats["l2_hits"] += 1
+            logger.debug(f"Cache L2 HIT for key: {key}")
+            return value
+        self._record_miss(key)
+        return NOT_CACHED
+
+    def _family_stats(self, key: str) -> Dict[str, int]:
+        family = key_family(key)
+        stats = self._families.get(family)
+        if stats is None:
+            stats = self._families[family] = {"keys": 0, "hits": 0, "misses": 0}
+        return stats
+
+    def _record_hit(self, key: str) -> None:
+        self._stats["hits"] += 1
+        self._family_stats(key)["hits"] += 1
+
+    def _record_miss(self, key: str) -> None:
+        self._stats["misses"] += 1
+        self._family_stats(key)["misses"] += 1
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: int = 300,
+        validators: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Set value in cache with TTL, evicting entries if over budget.
+
+        validators (ETag/Last-Modified of the upstream page) are kept in L1
+        and returned by get_validators() for conditional refreshes.
+        """
+        window = CacheTTL.stale_window(key)
+        self._store(key, value, ttl_seconds, window, validators)
+        self._stats["sets"] += 1
+        logger.debug(f"Cache SET for key: {key}, TTL: {ttl_seconds}s (+{window}s stale)")
+
+        if self._l2 is not None:
+            self._l2.set(key, value, ttl_seconds + window)
+            self._l2.publish_invalidation(keys=[key])
+
+    def set_negative(
+        self,
+        key: str,
+        status: int,
+        message: Optional[str] = None,
+        url: Optional[str] = None,
+        ttl_seconds: Optional[int] = None
+    ) -> None:
+        """
+        Cache a failed upstream lookup for key (L1 only, no stale window).
+
+        The TTL defaults to CacheTTL.negative_ttl(status). Negative entries
+        are skipped by get(), exports and snapshots.
+
+        A transient failure (anything but 404/410) does not replace a stale
+        value still within its hard TTL: the value is kept, and its
+        background refresh is postponed by the negative TTL.
+        """
+        if ttl_seconds is None:
+            ttl_seconds = CacheTTL.negative_ttl(status)
+        stale_entry = self._live_entry(key) if status not in (404, 410) else None
+        if stale_entry is not None:
+            stale_entry["retry_after"] = time.time() + ttl_seconds
+            logger.debug(f"Cache kept stale value for key: {key} (HTTP {status})")
+            return
+        self._store(key, NegativeEntry(status, message, url), ttl_seconds)
+        self._stats["negative_sets"] += 1
+        logger.debug(f"Cache NEGATIVE SET for key: {key} (HTTP {status}), TTL: {ttl_seconds}s")
+
+    def get_validators(self, key: str) -> Optional[Dict[str, str]]:
+        """HTTP validators stored with key, even if the entry is stale"""
+        entry = self._cache.get(key)
+        if entry is None or time.time() > entry["expires"]:
+            return None
+        return entry.get("validators")
+
+    def revalidate(self, key: str, ttl_seconds: int) -> Any:
+        """
+        Mark an entry as still valid upstream (HTTP 304 Not Modified).
+
+        Extends its soft and hard TTL without replacing the value.
+
+        Returns:
+            The cached value, or NOT_CACHED if the entry is gone
+        """
+        entry = self._cache.get(key)
+        if entry is None or isinstance(entry["data"], NegativeEntry):
+            return NOT_CACHED
+
+        window = CacheTTL.stale_window(key)
+        now = time.time()
+        entry["soft_expires"] = now + ttl_seconds
+        entry["expires"] = now + ttl_seconds + window
+        entry["ttl"] = ttl_seconds
+        entry.pop("retry_after", None)
+        self._policy.on_insert(key, entry)
+        self._push_expiry(key, entry["expires"])
+        self._stats["revalidations"] += 1
+        logger.debug(f"Cache REVALIDATED key: {key}, TTL: {ttl_seconds}s (+{window}s stale)")
+
+        if self._l2 is not None:
+            # Same value, only the TTL changes: no invalidation needed
+            self._l2.set(key, entry["data"], ttl_seconds + window)
+        return entry["data"]
+
+    def _store(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: float,
+        stale_window: float = 0,
+        validators: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """Insert an entry in L1 only. Returns False if it does not fit."""
+        digest = None
+        if key_family(key) in self.content_addressed and not isinstance(value, NegativeEntry):
+            # The entry itself only costs its key; the blob is counted once
+            digest, payload_size = content_digest(value)
+            size = len(key) + ENTRY_OVERHEAD_BYTES
+            incoming = size if digest in self._blobs else size + payload_size
+        else:
+            size = incoming = estimate_size(key, value)
+        if self.max_bytes and incoming > self.max_bytes:
+            logger.warning(f"Cache SET skipped for key: {key} ({incoming} bytes exceeds budget)")
+            return False
+
+        if key in self._cache:
+            self._remove_entry(key)
+
+        # Make room before inserting so the new entry is never the victim
+        self._enforce_limits(incoming_entries=1, incoming_bytes=incoming)
+
+        if digest is not None:
+            value = self._acquire_blob(digest, value, payload_size)
+
+        now = time.time()
+        entry = {
             "data": value,
-            "expires": time.time() + ttl_seconds,
-            "created_at": time.time(),
-            "ttl": ttl_seconds
+            "soft_expires": now + ttl_seconds,
+            "expires": now + ttl_seconds + stale_window,
+            "created_at": now,
+            "ttl": ttl_seconds,
+            "size": size,
+            "hits": 0
         }
-        self._stats["sets"] += 1
-        logger.debug(f"Cache SET for key: {key}, TTL: {ttl_seconds}s")
+        if validators:
+            entry["validators"] = validators
+        if digest is not None:
+            entry["digest"] = digest
+        self._cache[key] = entry
+        self._index.add(key)
+        self._bytes += size
+        self._family_stats(key)["keys"] += 1
+        self._policy.on_insert(key, entry)
+        self._push_expiry(key, entry["expires"])
+        return True
+
+    def _acquire_blob(self, digest: str, value: Any, payload_size: int) -> Any:
+        """Take a reference on the blob of digest, creating it from value. Returns the shared value."""
+        blob = self._blobs.get(digest)
+        if blob is None:
+            blob = self._blobs[digest] = {"data": value, "refs": 0, "size": payload_size}
+            self._bytes += payload_size
+        else:
+            self._stats["deduplicated_sets"] += 1
+        blob["refs"] += 1
+        return blob["data"]
+
+    def _release_blob(self, digest: str) -> None:
+        """Drop a reference on a blob, freeing it with its last reference"""
+        blob = self._blobs.get(digest)
+        if blob is None:
+            return
+        blob["refs"] -= 1
+        if blob["refs"] <= 0:
+            del self._blobs[digest]
+            self._bytes -= blob["size"]
+
+    def get_digest(self, key: str) -> Optional[str]:
+        """Content digest of a live content-addressed entry, None otherwise"""
+        entry = self._cache.get(key)
+        if entry is None or time.time() > entry["expires"]:
+            return None
+        return entry.get("digest")
+
+    def _push_expiry(self, key: str, expires: float) -> None:
+        """Schedule a key for the reaper (stale heap items are skipped lazily)"""
+        heapq.heappush(self._expiry_heap, (expires, next(self._expiry_counter), key))
+        # Compact when overwritten/removed keys dominate the heap
+        if len(self._expiry_heap) > 2 * len(self._cache) + 1024:
+            self._expiry_heap = [
+                (e["expires"], next(self._expiry_counter), k) for k, e in self._cache.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _remove_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Remove an entry and update size accounting (no stats)"""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+            if "digest" in entry:
+                self._release_blob(entry["digest"])
+            self._index.discard(key)
+            self._family_stats(key)["keys"] -= 1
+            self._policy.on_remove(key)
+        return entry
+
+    def _over_budget(self, incoming_entries: int = 0, incoming_bytes: int = 0) -> bool:
+        """Check whether the cache (plus an incoming entry) exceeds its budget"""
+        if self.max_entries and len(self._cache) + incoming_entries > self.max_entries:
+            return True
+        if self.max_bytes and self._bytes + incoming_bytes > self.max_bytes:
+            return True
+        return False
+
+    def _enforce_limits(self, incoming_entries: int = 0, incoming_bytes: int = 0) -> None:
+        """Evict entries chosen by the eviction policy until within budget"""
+        while self._over_budget(incoming_entries, incoming_bytes):
+            victim = self._policy.select_victim()
+            if victim is None:
+                break
+            self._remove_entry(victim)
+            self._stats["evictions"] += 1
+            logger.debug(f"Cache EVICT ({self._policy.name}) for key: {victim}")
         
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
-        if key in self._cache:
-            del self._cache[key]
+        deleted = self._remove_entry(key) is not None
+        if self._l2 is not None:
+            deleted = self._l2.delete([key]) > 0 or deleted
+            self._l2.publish_invalidation(keys=[key])
+        if deleted:
             self._stats["deletes"] += 1
-            return True
-        return False
+        return deleted
         
     def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern (supports * wildcard)"""
-        import fnmatch
-        keys_to_delete = [k for k in self._cache.keys() if fnmatch.fnmatch(k, pattern)]
+        """
+        Delete all keys matching pattern.
+
+        Patterns are globs matched per ':' segment; a trailing * also matches
+        the whole subtree (see cache_key_index).
+        """
+        keys_to_delete = self._index.match(pattern)
         for key in keys_to_delete:
-            del self._cache[key]
-        self._stats["deletes"] += len(keys_to_delete)
-        logger.info(f"Deleted {len(keys_to_delete)} keys matching pattern: {pattern}")
-        return len(keys_to_delete)
+            self._remove_entry(key)
+        deleted = len(keys_to_delete)
+        if self._l2 is not None:
+            deleted = max(deleted, self._l2.delete_pattern(pattern))
+            self._l2.publish_invalidation(pattern=pattern)
+        self._stats["deletes"] += deleted
+        logger.info(f"Deleted {deleted} keys matching pattern: {pattern}")
+        return deleted
         
     def clear(self) -> None:
         """Clear all cache"""
         count = len(self._cache)
-        self._cache.clear()
+        self._clear_local()
+        if self._l2 is not None:
+            count = max(count, self._l2.clear())
+            self._l2.publish_invalidation(clear=True)
         self._stats["deletes"] += count
         logger.info("Cache cleared")
+
+    def _clear_local(self) -> None:
+        """Clear L1 only"""
+        self._cache.clear()
+        self._index.clear()
+        self._policy.clear()
+        self._blobs.clear()
+        self._bytes = 0
+        self._expiry_heap = []
+        for stats in self._families.values():
+            stats["keys"] = 0
+
+    def apply_invalidation(self, message: Dict[str, Any]) -> None:
+        """
+        Apply an invalidation broadcast by another replica to L1 only.
+
+        Message format: {"op": "delete", "keys": [...]},
+        {"op": "pattern", "pattern": "..."} or {"op": "clear"}
+        """
+        op = message.get("op")
+        if op == "delete":
+            for key in message.get("keys", []):
+                self._remove_entry(key)
+        elif op == "pattern":
+            pattern = message.get("pattern", "")
+            for key in self._index.match(pattern):
+                self._remove_entry(key)
+        elif op == "clear":
+            self._clear_local()
         
+    def export_entries(self, prefixes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Export live L1 entries (optionally only keys starting with prefixes).
+
+        Returns dicts with key, data, soft_expires, expires, ttl, validators
+        and digest (content-addressed entries, else None), as used by the
+        on-disk snapshot.
+        """
+        now = time.time()
+        prefixes = tuple(prefixes) if prefixes else None
+        return [
+            {
+                "key": key,
+                "data": entry["data"],
+                "soft_expires": entry["soft_expires"],
+                "expires": entry["expires"],
+                "ttl": entry["ttl"],
+                "validators": entry.get("validators"),
+                "digest": entry.get("digest")
+            }
+            for key, entry in self._cache.items()
+            if entry["expires"] > now
+            and not isinstance(entry["data"], NegativeEntry)
+            and (prefixes is None or key.startswith(prefixes))
+        ]
+
+    def restore_entry(
+        self,
+        key: str,
+        value: Any,
+        soft_expires: float,
+        expires: float,
+        ttl: float,
+        validators: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Restore an exported entry into L1 with its original expiration times.
+
+        Expired entries and keys already present are skipped.
+        """
+        now = time.time()
+        if expires <= now or key in self._cache:
+            return False
+        if not self._store(key, value, soft_expires - now, expires - soft_expires, validators):
+            return False
+        self._cache[key]["ttl"] = ttl
+        return True
+
+    # ========================================
+    # Expiry reaper
+    # ========================================
+
+    def reap_expired(self, max_keys: Optional[int] = None) -> int:
+        """
+        Remove up to max_keys expired entries (all of them if None).
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now and (max_keys is None or removed < max_keys):
+            expires, _, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            if entry is None or entry["expires"] != expires:
+                continue  # Overwritten or already removed
+            self._remove_entry(key)
+            self._stats["expired"] += 1
+            removed += 1
+        return removed
+
+    def start_reaper(self, interval_seconds: float = 30, batch_size: Optional[int] = None) -> None:
+        """Start the background task removing expired entries"""
+        if self._reaper_task and not self._reaper_task.done():
+            return
+        self._reaper_task = asyncio.create_task(
+            self._reaper_loop(interval_seconds, batch_size or self.REAPER_BATCH_SIZE)
+        )
+
+    async def stop_reaper(self) -> None:
+        """Stop the background reaper"""
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+
+    async def _reaper_loop(self, interval_seconds: float, batch_size: int) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            total = 0
+            # Bounded slices, yielding to the event loop between them
+            while True:
+                removed = self.reap_expired(batch_size)
+                total += removed
+                if removed < batch_size:
+                    break
+                await asyncio.sleep(0)
+            if total:
+                logger.debug(f"Cache reaper removed {total} expired keys")
+
     def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
+        """Get cache statistics (constant time, no scan of the entries)"""
         total_requests = self._stats["hits"] + self._stats["misses"]
         hit_rate = (self._stats["hits"] / total_requests * 100) if total_requests > 0 else 0
-        
-        # Clean up expired entries
-        current_time = time.time()
-        expired_keys = [k for k, v in self._cache.items() if current_time > v["expires"]]
-        for key in expired_keys:
-            del self._cache[key]
-            self._stats["expired"] += 1
-        
+
+        families = {}
+        for family, stats in self._families.items():
+            requests = stats["hits"] + stats["misses"]
+            families[family] = {
+                "keys": stats["keys"],
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "hit_rate": f"{(stats['hits'] / requests * 100) if requests else 0:.1f}%"
+            }
+
         return {
             "total_keys": len(self._cache),
             "hits": self._stats["hits"],
@@ -118,16 +873,40 @@ class EnhancedCache:
             "sets": self._stats["sets"],
             "deletes": self._stats["deletes"],
             "expired": self._stats["expired"],
-            "memory_entries": len(self._cache)
+            "evictions": self._stats["evictions"],
+            "memory_entries": len(self._cache),
+            "estimated_memory_bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "eviction_policy": self._policy.name,
+            "l2_hits": self._stats["l2_hits"],
+            "stale_hits": self._stats["stale_hits"],
+            "background_refreshes": self._stats["background_refreshes"],
+            "refresh_failures": self._stats["refresh_failures"],
+            "negative_sets": self._stats["negative_sets"],
+            "negative_hits": self._stats["negative_hits"],
+            "revalidations": self._stats["revalidations"],
+            "content_blobs": len(self._blobs),
+            "deduplicated_sets": self._stats["deduplicated_sets"],
+            "coalesced_requests": single_flight.coalesced,
+            "requests_in_flight": single_flight.in_flight(),
+            "reaper_running": bool(self._reaper_task and not self._reaper_task.done()),
+            "families": families,
+            "fills": cache_metrics.get_fill_stats(),
+            "l2": self._l2.get_stats() if self._l2 is not None else {"enabled": False}
         }
         
     def get_keys(self, pattern: str = "*") -> List[str]:
-        """Get all keys matching pattern"""
-        import fnmatch
-        return [k for k in self._cache.keys() if fnmatch.fnmatch(k, pattern)]
+        """Get all keys matching pattern (same semantics as delete_pattern)"""
+        return self._index.match(pattern)
 
 # Global cache instance
-cache = EnhancedCache()
+cache = EnhancedCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    eviction_policy=settings.CACHE_EVICTION_POLICY,
+    content_addressed=settings.cache_content_addressed_families_list
+)
 
 def cached_async(ttl_seconds: int, key_fn: Callable[..., str]):
     """
@@ -155,16 +934,10 @@ def cached_async(ttl_seconds: int, key_fn: Callable[..., str]):
             # Generate cache key
             cache_key = key_fn(*args, **kwargs)
 
-            # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            cache.set(cache_key, result, ttl_seconds)
-
-            return result
+            # Cache lookup, concurrent misses share a single execution
+            return await cache.get_or_fetch(
+                cache_key, lambda: func(*args, **kwargs), ttl_seconds
+            )
         return wrapper
     return decorator
 
@@ -180,15 +953,9 @@ def cached_galaxy_request(cache_key_prefix: str, ttl_seconds: int = 900):
             # Create cache key
             cache_key = cache._make_key(cache_key_prefix, **kwargs)
 
-            # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            cache.set(cache_key, result, ttl_seconds)
-
-            return result
+            # Cache lookup, concurrent misses share a single execution
+            return await cache.get_or_fetch(
+                cache_key, lambda: func(*args, **kwargs), ttl_seconds
+            )
         return wrapper
     return decorator
\ No newline at end of file
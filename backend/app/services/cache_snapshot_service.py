@@ -0,0 +1,249 @@
+"""
+Cache Snapshot Service - Persist the catalog cache on disk for warm starts
+
+The ansible_* and galaxy_* key families are periodically written to a
+compact SQLite file and restored during application startup with their
+original TTLs, so a new pod serves catalog data from its first request.
+
+Values are stored content-addressed: one row per distinct payload (compact
+L2 format) keyed by its digest, and one row per key pointing at it, so a
+schema shared by several Ansible versions is written and decoded once.
+
+Snapshots are written to a temporary file and atomically renamed; reads
+use SQLite memory-mapped I/O. All disk work runs in a worker thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.cache_redis_tier import serialize, deserialize
+from app.services.cache_service import cache, EnhancedCache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = "3"
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
+
+class CacheSnapshotService:
+    """
+    Periodic on-disk snapshot of selected cache key families.
+    """
+
+    def __init__(
+        self,
+        target_cache: EnhancedCache,
+        path: str,
+        prefixes: Optional[List[str]] = None,
+        interval_seconds: int = 900
+    ):
+        self._cache = target_cache
+        self.path = path
+        self.prefixes = prefixes or []
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._last_save: Optional[datetime] = None
+        self._last_restore: Optional[datetime] = None
+        self._last_saved_entries = 0
+        self._last_restored_entries = 0
+
+    # ========================================
+    # Save
+    # ========================================
+
+    async def save(self) -> int:
+        """
+        Write a snapshot of the cache to disk.
+
+        Returns:
+            Number of entries written
+        """
+        # Collect entries on the event loop (no concurrent mutation)
+        entries = self._cache.export_entries(self.prefixes)
+        count = await asyncio.to_thread(self._write_snapshot, entries)
+        self._last_save = datetime.utcnow()
+        self._last_saved_entries = count
+        logger.info(f"Cache snapshot saved: {count} entries -> {self.path}")
+        return count
+
+    def _write_snapshot(self, entries: List[Dict[str, Any]]) -> int:
+        """Serialize entries into a new SQLite file and swap it in atomically"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE blobs (digest TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+            conn.execute(
+                "CREATE TABLE entries ("
+                "key TEXT PRIMARY KEY, digest TEXT NOT NULL, "
+                "soft_expires REAL NOT NULL, expires REAL NOT NULL, ttl REAL NOT NULL, "
+                "validators TEXT)"
+            )
+            conn.executemany(
+                "INSERT INTO meta (name, value) VALUES (?, ?)",
+                [("format_version", SNAPSHOT_FORMAT_VERSION), ("created_at", str(time.time()))]
+            )
+            blobs: Dict[str, bytes] = {}
+            rows = []
+            for entry in entries:
+                digest = entry.get("digest")
+                if digest is None or digest not in blobs:
+                    try:
+                        payload = serialize(entry["data"])
+                    except (TypeError, ValueError) as e:
+                        logger.debug(f"Skipping unserializable cache entry {entry['key']}: {e}")
+                        continue
+                    if digest is None:
+                        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+                    blobs.setdefault(digest, payload)
+                validators = json.dumps(entry["validators"]) if entry.get("validators") else None
+                rows.append((
+                    entry["key"], digest, entry["soft_expires"], entry["expires"], entry["ttl"], validators
+                ))
+            conn.executemany("INSERT INTO blobs (digest, payload) VALUES (?, ?)", blobs.items())
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, digest, soft_expires, expires, ttl, validators) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, self.path)
+        return len(rows)
+
+    # ========================================
+    # Restore
+    # ========================================
+
+    async def restore(self) -> int:
+        """
+        Load the snapshot into the cache, skipping expired entries.
+
+        Returns:
+            Number of entries restored
+        """
+        if not os.path.exists(self.path):
+            logger.info(f"No cache snapshot found at {self.path}")
+            return 0
+
+        try:
+            rows = await asyncio.to_thread(self._read_snapshot)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache snapshot {self.path}: {e}")
+            return 0
+
+        restored = 0
+        for key, value, soft_expires, expires, ttl, validators in rows:
+            if self._cache.restore_entry(key, value, soft_expires, expires, ttl, validators):
+                restored += 1
+
+        self._last_restore = datetime.utcnow()
+        self._last_restored_entries = restored
+        logger.info(f"Cache snapshot restored: {restored} entries from {self.path}")
+        return restored
+
+    def _read_snapshot(self) -> List[tuple]:
+        """Read and decode the live entries of the snapshot file"""
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+            row = conn.execute("SELECT value FROM meta WHERE name = 'format_version'").fetchone()
+            if not row or row[0] != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"unsupported snapshot format {row[0] if row else None}")
+
+            # Each payload is decoded once and shared by the keys pointing at it
+            values: Dict[str, Any] = {}
+            rows = []
+            cursor = conn.execute(
+                "SELECT e.key, e.digest, b.payload, e.soft_expires, e.expires, e.ttl, e.validators "
+                "FROM entries e JOIN blobs b ON b.digest = e.digest WHERE e.expires > ?",
+                (time.time(),)
+            )
+            for key, digest, payload, soft_expires, expires, ttl, validators in cursor:
+                try:
+                    if digest not in values:
+                        values[digest] = deserialize(payload)
+                    rows.append((
+                        key, values[digest], soft_expires, expires, ttl,
+                        json.loads(validators) if validators else None
+                    ))
+                except Exception as e:
+                    logger.debug(f"Skipping undecodable snapshot entry {key}: {e}")
+            return rows
+        finally:
+            conn.close()
+
+    # ========================================
+    # Periodic snapshots
+    # ========================================
+
+    async def start(self):
+        """Start periodic snapshots"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._snapshot_loop())
+        logger.info(f"Cache snapshots enabled every {self.interval_seconds}s -> {self.path}")
+
+    async def stop(self):
+        """Stop periodic snapshots and write a final snapshot"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.save()
+        except Exception as e:
+            logger.error(f"Final cache snapshot failed: {e}")
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.save()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache snapshot failed: {e}")
+
+    def get_status(self) -> dict:
+        """Get snapshot status"""
+        return {
+            "path": self.path,
+            "prefixes": self.prefixes,
+            "interval_seconds": self.interval_seconds,
+            "running": bool(self._task and not self._task.done()),
+            "last_save": self._last_save.isoformat() if self._last_save else None,
+            "last_saved_entries": self._last_saved_entries,
+            "last_restore": self._last_restore.isoformat() if self._last_restore else None,
+            "last_restored_entries": self._last_restored_entries
+        }
+
+
+# Global instance
+cache_snapshot = CacheSnapshotService(
+    cache,
+    path=settings.CACHE_SNAPSHOT_PATH,
+    prefixes=settings.cache_snapshot_prefixes_list,
+    interval_seconds=settings.CACHE_SNAPSHOT_INTERVAL_SECONDS
+)
@@ -0,0 +1,232 @@
+"""
+HTML parser backends and worker pool for documentation pages
+
+Documentation pages are parsed with BeautifulSoup using a configurable
+tree builder:
+- lxml: C-accelerated libxml2 parser (used by default when installed)
+- html.parser: pure Python parser from the standard library
+
+Parsing a large module page takes tens to hundreds of milliseconds, so
+it runs in a worker pool instead of the event loop:
+- thread: ThreadPoolExecutor (default, no serialization cost)
+- process: ProcessPoolExecutor (parallel parsing on several cores)
+- inline: parse in the calling coroutine (debugging)
+
+Index pages (collections index, namespace pages) only need the
+"name/index.html" links: extract_index_links() collects them in a single
+streaming pass (parser events, no tree), with the lxml parser target
+interface or the standard library HTMLParser.
+
+See benchmarks/bench_docs_parser.py and benchmarks/bench_index_links.py
+for parse times and output equivalence on the fixture pages in
+tests/fixtures/docs_pages.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from bs4 import BeautifulSoup
+
+from app.core.config import settings
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:  # pragma: no cover - lxml is listed in requirements.txt
+    etree = None
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+PARSER_BACKENDS = ("lxml", "html.parser")
+POOL_MODES = ("thread", "process", "inline")
+
+
+def resolve_parser_backend(name: str) -> str:
+    """
+    Resolve a parser backend name ("auto" picks lxml when installed).
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    name = name.lower()
+    if name == "auto":
+        return "lxml" if LXML_AVAILABLE else "html.parser"
+    if name not in PARSER_BACKENDS:
+        raise ValueError(
+            f"Unknown HTML parser backend '{name}'. "
+            f"Available backends: auto, {', '.join(PARSER_BACKENDS)}"
+        )
+    if name == "lxml" and not LXML_AVAILABLE:
+        raise ValueError("HTML parser backend 'lxml' requires the lxml package")
+    return name
+
+
+_parser_backend = resolve_parser_backend(settings.DOCS_PARSER_BACKEND)
+
+
+def get_parser_backend() -> str:
+    """Backend used by make_soup()"""
+    return _parser_backend
+
+
+def set_parser_backend(name: str) -> None:
+    """Change the backend used by make_soup() in this process"""
+    global _parser_backend
+    _parser_backend = resolve_parser_backend(name)
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """Parse an HTML document with the configured backend"""
+    return BeautifulSoup(html, _parser_backend)
+
+
+# ========================================
+# Streaming index link extraction
+# ========================================
+
+INDEX_LINK_SUFFIX = "/index.html"
+# Navigation pages that look like index links
+INDEX_LINK_EXCLUDED = frozenset({"index", "genindex", "search"})
+
+
+def _index_link_name(href: Optional[str]) -> Optional[str]:
+    """
+    Name of a relative "name/index.html" link, or None.
+
+    name must start with a letter and contain at least two characters
+    among ASCII letters, digits and underscores.
+    """
+    if not href or not href.endswith(INDEX_LINK_SUFFIX):
+        return None
+    name = href[:-len(INDEX_LINK_SUFFIX)]
+    if len(name) < 2 or not name.isascii() or not name[0].isalpha():
+        return None
+    if not name.replace("_", "").isalnum():
+        return None
+    return name
+
+
+class _IndexLinkCollector:
+    """Ordered, de-duplicated names of index links"""
+
+    def __init__(self):
+        self.names: Dict[str, None] = {}
+
+    def add(self, href: Optional[str]) -> None:
+        name = _index_link_name(href)
+        if name is not None and name not in INDEX_LINK_EXCLUDED:
+            self.names.setdefault(name, None)
+
+
+class _IndexLinkTarget(_IndexLinkCollector):
+    """lxml parser target: receives parser events, no tree is built"""
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if tag == "a":
+            self.add(attrib.get("href"))
+
+    def end(self, tag: str) -> None:
+        pass
+
+    def data(self, data: str) -> None:
+        pass
+
+    def close(self) -> List[str]:
+        return list(self.names)
+
+
+class _IndexLinkHTMLParser(HTMLParser):
+    """Standard library tokenizer collecting index links"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.collector = _IndexLinkCollector()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href":
+                    self.collector.add(value)
+                    break
+
+
+def extract_index_links(html: str) -> List[str]:
+    """
+    Names of the relative "name/index.html" links of a page.
+
+    Single streaming pass over the document (lxml parser target when the
+    lxml backend is active, html.parser tokenizer otherwise). Names are
+    returned in document order without duplicates.
+    """
+    if _parser_backend == "lxml":
+        parser = etree.HTMLParser(target=_IndexLinkTarget())
+        parser.feed(html)
+        return parser.close()
+
+    parser = _IndexLinkHTMLParser()
+    parser.feed(html)
+    parser.close()
+    return list(parser.collector.names)
+
+
+class ParserPool:
+    """
+    Executor running parse functions off the event loop.
+
+    In process mode the function and its arguments must be picklable
+    (module-level functions, plain data).
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: int = 2):
+        if mode not in POOL_MODES:
+            raise ValueError(f"Unknown parser pool mode '{mode}'. Available modes: {', '.join(POOL_MODES)}")
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[Executor] = None
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.mode == "process"
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="docs-parser"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) in the pool and return its result"""
+        if self.mode == "inline":
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(fn, *args))
+
+    def shutdown(self) -> None:
+        """Stop the workers (a new pool is created on next use)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "backend": _parser_backend,
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "started": self._executor is not None
+        }
+
+
+# Global parser pool
+parser_pool = ParserPool(settings.DOCS_PARSER_POOL, settings.DOCS_PARSER_WORKERS)
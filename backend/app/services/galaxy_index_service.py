@@ -0,0 +1,707 @@
+"""
+Galaxy Index Service - Local index of Galaxy role and collection metadata
+
+Every search string, filter, sort order and page of the role browser used
+to be its own cache key proxied to Galaxy v1. The metadata of each active
+GalaxySource is instead mirrored into one local SQLite file and queried
+there:
+
+- roles (Galaxy v1) and collections (highest versions of the Galaxy v3
+  search, with their descriptions and tags): one row per item and source,
+  with B-tree indexes for namespace filters and the supported sort orders,
+  and an FTS5 table (prefix-indexed) for the search box
+- sync: pages are crawled newest-modified first and the crawl stops at the
+  first page older than the cursor of the previous sync, so a periodic sync
+  costs a page or two; a full crawl (first sync, then every
+  full_sync_hours) also drops the items deleted upstream
+- namespace role counts and download totals are maintained by triggers as
+  roles are upserted; each sync also re-crawls the most downloaded roles,
+  whose counts change without a new modification date
+- a source is served from the index once its first full crawl completed;
+  until then, and for sort orders the index does not know, callers proxy
+  to Galaxy as before
+
+Syncs run in the background, throttled per host (see request_rate_limiter),
+and write through their own connection in a worker thread; queries use a
+separate read connection and only see committed syncs (WAL mode).
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from app.core.config import settings
+from app.core.http_service import BaseHTTPService, HostRateLimiter, UpstreamHTTPError, request_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+GALAXY_INDEX_FORMAT_VERSION = "3"
+
+ROLES = "roles"
+COLLECTIONS = "collections"
+
+# Sort orders of Galaxy v1 (order_by, optionally "-" prefixed) served by the index
+ROLE_ORDERS = {
+    "download_count": "download_count",
+    "name": "name",
+    "namespace": "namespace",
+    "created": "created",
+    "modified": "modified",
+    "id": "role_id",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source_id TEXT NOT NULL, kind TEXT NOT NULL, cursor TEXT, ready INTEGER NOT NULL DEFAULT 0,
+    items INTEGER NOT NULL DEFAULT 0, last_sync REAL, last_full_sync REAL,
+    PRIMARY KEY (source_id, kind)
+);
+
+CREATE TABLE IF NOT EXISTS roles (
+    id INTEGER PRIMARY KEY, source_id TEXT NOT NULL, role_id INTEGER NOT NULL,
+    namespace TEXT NOT NULL, name TEXT NOT NULL, description TEXT NOT NULL DEFAULT '',
+    download_count INTEGER NOT NULL DEFAULT 0, github_user TEXT, github_repo TEXT,
+    created TEXT, modified TEXT, seen_at REAL NOT NULL,
+    UNIQUE (source_id, role_id)
+);
+CREATE INDEX IF NOT EXISTS roles_downloads ON roles (source_id, download_count);
+CREATE INDEX IF NOT EXISTS roles_namespace ON roles (source_id, namespace, download_count);
+CREATE INDEX IF NOT EXISTS roles_name ON roles (source_id, name);
+CREATE INDEX IF NOT EXISTS roles_created ON roles (source_id, created);
+CREATE INDEX IF NOT EXISTS roles_modified ON roles (source_id, modified);
+CREATE VIRTUAL TABLE IF NOT EXISTS roles_fts USING fts5(
+    namespace, name, description, content='roles', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS roles_ai AFTER INSERT ON roles BEGIN
+    INSERT INTO roles_fts (rowid, namespace, name, description)
+    VALUES (new.id, new.namespace, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS roles_ad AFTER DELETE ON roles BEGIN
+    INSERT INTO roles_fts (roles_fts, rowid, namespace, name, description)
+    VALUES ('delete', old.id, old.namespace, old.name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS roles_au AFTER UPDATE OF namespace, name, description ON roles BEGIN
+    INSERT INTO roles_fts (roles_fts, rowid, namespace, name, description)
+    VALUES ('delete', old.id, old.namespace, old.name, old.description);
+    INSERT INTO roles_fts (rowid, namespace, name, description)
+    VALUES (new.id, new.namespace, new.name, new.description);
+END;
+
+-- Role count and downloads per namespace, kept up to date by the triggers
+-- below as roles are upserted or deleted
+CREATE TABLE IF NOT EXISTS namespace_stats (
+    source_id TEXT NOT NULL, namespace TEXT NOT NULL,
+    role_count INTEGER NOT NULL, total_downloads INTEGER NOT NULL,
+    PRIMARY KEY (source_id, namespace)
+);
+CREATE INDEX IF NOT EXISTS namespace_popularity ON namespace_stats (source_id, total_downloads);
+CREATE TRIGGER IF NOT EXISTS namespace_stats_ai AFTER INSERT ON roles BEGIN
+    INSERT INTO namespace_stats (source_id, namespace, role_count, total_downloads)
+    VALUES (new.source_id, new.namespace, 1, new.download_count)
+    ON CONFLICT (source_id, namespace) DO UPDATE SET role_count = role_count + 1,
+        total_downloads = total_downloads + excluded.total_downloads;
+END;
+CREATE TRIGGER IF NOT EXISTS namespace_stats_ad AFTER DELETE ON roles BEGIN
+    UPDATE namespace_stats SET role_count = role_count - 1, total_downloads = total_downloads - old.download_count
+    WHERE source_id = old.source_id AND namespace = old.namespace;
+    DELETE FROM namespace_stats WHERE source_id = old.source_id AND namespace = old.namespace AND role_count <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS namespace_stats_au AFTER UPDATE OF namespace, download_count ON roles BEGIN
+    UPDATE namespace_stats SET role_count = role_count - 1, total_downloads = total_downloads - old.download_count
+    WHERE source_id = old.source_id AND namespace = old.namespace;
+    DELETE FROM namespace_stats WHERE source_id = old.source_id AND namespace = old.namespace AND role_count <= 0;
+    INSERT INTO namespace_stats (source_id, namespace, role_count, total_downloads)
+    VALUES (new.source_id, new.namespace, 1, new.download_count)
+    ON CONFLICT (source_id, namespace) DO UPDATE SET role_count = role_count + 1,
+        total_downloads = total_downloads + excluded.total_downloads;
+END;
+
+CREATE TABLE IF NOT EXISTS collections (
+    id INTEGER PRIMARY KEY, source_id TEXT NOT NULL, namespace TEXT NOT NULL, name TEXT NOT NULL,
+    version TEXT, description TEXT NOT NULL DEFAULT '', tags TEXT NOT NULL DEFAULT '',
+    download_count INTEGER NOT NULL DEFAULT 0, updated_at TEXT, seen_at REAL NOT NULL,
+    UNIQUE (source_id, namespace, name)
+);
+CREATE INDEX IF NOT EXISTS collections_downloads ON collections (source_id, download_count);
+CREATE INDEX IF NOT EXISTS collections_updated ON collections (source_id, updated_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS collections_fts USING fts5(
+    namespace, name, description, tags, content='collections', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS collections_ai AFTER INSERT ON collections BEGIN
+    INSERT INTO collections_fts (rowid, namespace, name, description, tags)
+    VALUES (new.id, new.namespace, new.name, new.description, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS collections_ad AFTER DELETE ON collections BEGIN
+    INSERT INTO collections_fts (collections_fts, rowid, namespace, name, description, tags)
+    VALUES ('delete', old.id, old.namespace, old.name, old.description, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS collections_au AFTER UPDATE OF namespace, name, description, tags ON collections BEGIN
+    INSERT INTO collections_fts (collections_fts, rowid, namespace, name, description, tags)
+    VALUES ('delete', old.id, old.namespace, old.name, old.description, old.tags);
+    INSERT INTO collections_fts (rowid, namespace, name, description, tags)
+    VALUES (new.id, new.namespace, new.name, new.description, new.tags);
+END;
+"""
+
+ROLE_UPSERT = (
+    "INSERT INTO roles (source_id, role_id, namespace, name, description, download_count, "
+    "github_user, github_repo, created, modified, seen_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (source_id, role_id) DO UPDATE SET namespace = excluded.namespace, name = excluded.name, "
+    "description = excluded.description, download_count = excluded.download_count, "
+    "github_user = excluded.github_user, github_repo = excluded.github_repo, created = excluded.created, "
+    "modified = excluded.modified, seen_at = excluded.seen_at"
+)
+COLLECTION_UPSERT = (
+    "INSERT INTO collections (source_id, namespace, name, version, description, tags, download_count, "
+    "updated_at, seen_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (source_id, namespace, name) DO UPDATE SET version = excluded.version, "
+    "description = excluded.description, tags = excluded.tags, download_count = excluded.download_count, "
+    "updated_at = excluded.updated_at, seen_at = excluded.seen_at"
+)
+
+ROLE_COLUMNS = "role_id, namespace, name, description, download_count, github_user, github_repo, created, modified"
+
+
+def fts_query(text: str) -> Optional[str]:
+    """FTS5 query matching every word of text as a prefix, None if text has no word"""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _role_from_row(row: Tuple) -> Dict[str, Any]:
+    """Role dict of an index row, shaped like GalaxyRolesService._normalize_standalone_role"""
+    role_id, namespace, name, description, download_count, github_user, github_repo, created, modified = row
+    return {
+        "id": role_id,
+        "name": name,
+        "namespace": namespace,
+        "description": description,
+        "download_count": download_count,
+        "github_user": github_user or "",
+        "github_repo": github_repo or "",
+        "created": created,
+        "modified": modified,
+        "fqrn": f"{namespace}.{name}",
+        "type": "standalone"
+    }
+
+
+class GalaxyIndex(BaseHTTPService):
+    """
+    Local index of the roles and collections of the active Galaxy sources.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        page_size: int = 100,
+        max_pages: int = 1000,
+        sync_interval_minutes: float = 60,
+        full_sync_hours: float = 168,
+        rate_per_host: float = 5,
+        popular_pages: int = 10
+    ):
+        super().__init__(timeout=60)
+        self.path = path
+        self.page_size = max(1, page_size)
+        self.max_pages = max(1, max_pages)
+        self.sync_interval_minutes = sync_interval_minutes
+        self.full_sync_hours = full_sync_hours
+        self.rate_per_host = rate_per_host
+        self.popular_pages = popular_pages
+        self._conn: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._ready: Dict[Tuple[str, str], bool] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+        self._sync_lock = asyncio.Lock()
+        self._last_sync: Optional[datetime] = None
+        self._last_sync_seconds: Optional[float] = None
+        self._last_sync_items = 0
+
+    # ========================================
+    # Queries
+    # ========================================
+
+    def covers(self, source_id: str, kind: str = ROLES) -> bool:
+        """Whether the index holds a complete copy of a source"""
+        return self._conn is not None and self._ready.get((source_id, kind), False)
+
+    def search_roles(
+        self,
+        source_id: str,
+        search: str = "",
+        namespace: str = "",
+        page: int = 1,
+        page_size: int = 50,
+        order_by: str = "-download_count",
+        source: str = "public"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        One page of standalone roles, shaped like the Galaxy v1 role list.
+
+        Returns:
+            {count, next, previous, results}, None if the index cannot
+            serve the request (source not indexed, unknown sort order)
+        """
+        column = ROLE_ORDERS.get(order_by.lstrip("-"))
+        if column is None or not self.covers(source_id):
+            return None
+        direction = "DESC" if order_by.startswith("-") else "ASC"
+
+        where, params = ["r.source_id = ?"], [source_id]
+        if namespace:
+            where.append("r.namespace = ?")
+            params.append(namespace)
+        match = fts_query(search)
+        if match:
+            where.append("r.id IN (SELECT rowid FROM roles_fts WHERE roles_fts MATCH ?)")
+            params.append(match)
+        condition = " AND ".join(where)
+
+        count = self._reader.execute(f"SELECT COUNT(*) FROM roles r WHERE {condition}", params).fetchone()[0]
+        rows = self._reader.execute(
+            f"SELECT {ROLE_COLUMNS} FROM roles r WHERE {condition} "
+            f"ORDER BY r.{column} {direction}, r.role_id LIMIT ? OFFSET ?",
+            [*params, page_size, (page - 1) * page_size]
+        ).fetchall()
+
+        def page_link(number: int) -> str:
+            query = {"page": number, "page_size": page_size, "order_by": order_by, "source": source}
+            if search:
+                query["search"] = search
+            if namespace:
+                query["namespace"] = namespace
+            return f"/api/galaxy-roles/standalone?{urlencode(query)}"
+
+        return {
+            "count": count,
+            "next": page_link(page + 1) if page * page_size < count else None,
+            "previous": page_link(page - 1) if page > 1 else None,
+            "results": [_role_from_row(row) for row in rows]
+        }
+
+    def get_role(self, source_id: str, namespace: str, name: str) -> Optional[Dict[str, Any]]:
+        """A standalone role by namespace and name, None if not indexed"""
+        if not self.covers(source_id):
+            return None
+        row = self._reader.execute(
+            f"SELECT {ROLE_COLUMNS} FROM roles WHERE source_id = ? AND namespace = ? AND name = ? "
+            "ORDER BY download_count DESC LIMIT 1",
+            (source_id, namespace, name)
+        ).fetchone()
+        return _role_from_row(row) if row else None
+
+    def popular_namespaces(self, source_id: str, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """
+        Namespaces with the most role downloads (totals kept by the index).
+
+        Returns:
+            [{name, role_count, total_downloads}], None if the source is not indexed
+        """
+        if not self.covers(source_id):
+            return None
+        rows = self._reader.execute(
+            "SELECT namespace, role_count, total_downloads FROM namespace_stats WHERE source_id = ? "
+            "ORDER BY total_downloads DESC LIMIT ?",
+            (source_id, limit)
+        ).fetchall()
+        return [
+            {"name": namespace, "role_count": role_count, "total_downloads": total_downloads}
+            for namespace, role_count, total_downloads in rows
+        ]
+
+    def search_collections(self, source_id: str, query: str, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+        """
+        Collections matching every word of query (namespace, name,
+        description or tags), most downloaded first.
+
+        Returns:
+            [{namespace, name, version}], None if the source is not indexed
+        """
+        if not self.covers(source_id, COLLECTIONS):
+            return None
+        match = fts_query(query)
+        if not match:
+            return []
+        rows = self._reader.execute(
+            "SELECT namespace, name, version FROM collections WHERE source_id = ? "
+            "AND id IN (SELECT rowid FROM collections_fts WHERE collections_fts MATCH ?) "
+            "ORDER BY download_count DESC LIMIT ?",
+            (source_id, match, limit)
+        ).fetchall()
+        return [{"namespace": ns, "name": name, "version": version} for ns, name, version in rows]
+
+    # ========================================
+    # Storage
+    # ========================================
+
+    def open(self) -> None:
+        """Open (or create) the index file; an unusable file is recreated once"""
+        if self._conn is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            conn = self._connect()
+        except (sqlite3.Error, ValueError) as e:
+            logger.info(f"Galaxy index {self.path} not usable ({e}), starting a new one")
+            for path in (self.path, f"{self.path}-wal", f"{self.path}-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+            conn = self._connect()
+
+        # Queries run on the event loop with their own connection: in WAL
+        # mode they read the last committed state while a sync writes
+        reader = sqlite3.connect(self.path, check_same_thread=False)
+        reader.execute("PRAGMA query_only=ON")
+        self._conn, self._reader = conn, reader
+        self._ready = {
+            (source_id, kind): bool(ready)
+            for source_id, kind, ready in conn.execute("SELECT source_id, kind, ready FROM sync_state")
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection used by syncs (writes run in a worker thread)"""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE name = 'format_version'").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO meta (name, value) VALUES ('format_version', ?)", (GALAXY_INDEX_FORMAT_VERSION,))
+                conn.commit()
+            elif row[0] != GALAXY_INDEX_FORMAT_VERSION:
+                raise ValueError(f"unsupported index format {row[0]}")
+        except (sqlite3.Error, ValueError):
+            conn.close()
+            raise
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._reader.close()
+            self._conn.close()
+            self._conn = self._reader = None
+        self._ready = {}
+
+    def _sync_state(self, source_id: str, kind: str) -> Dict[str, Any]:
+        row = self._conn.execute(
+            "SELECT cursor, ready, last_full_sync FROM sync_state WHERE source_id = ? AND kind = ?",
+            (source_id, kind)
+        ).fetchone()
+        if row is None:
+            return {"cursor": None, "ready": False, "last_full_sync": None}
+        return {"cursor": row[0], "ready": bool(row[1]), "last_full_sync": row[2]}
+
+    def _write_page(self, sql: str, rows: List[Tuple]) -> None:
+        with self._conn:
+            self._conn.executemany(sql, rows)
+
+    def _finish_sync(
+        self, source_id: str, kind: str, cursor: Optional[str], full: bool, complete: bool, started: float
+    ) -> int:
+        """Save the sync cursor; after a complete full crawl, drop the items not seen"""
+        with self._conn:
+            if full and complete:
+                self._conn.execute(f"DELETE FROM {kind} WHERE source_id = ? AND seen_at < ?", (source_id, started))
+            items = self._conn.execute(f"SELECT COUNT(*) FROM {kind} WHERE source_id = ?", (source_id,)).fetchone()[0]
+            state = self._sync_state(source_id, kind)
+            ready = state["ready"] or (full and complete)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (source_id, kind, cursor, ready, items, last_sync, last_full_sync) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    source_id, kind, cursor, int(ready), items, time.time(),
+                    started if full and complete else state["last_full_sync"]
+                )
+            )
+        self._ready[(source_id, kind)] = ready
+        return items
+
+    def _drop_sources(self, active_ids: List[str]) -> None:
+        """Forget the sources that are no longer active"""
+        placeholders = ", ".join("?" for _ in active_ids) or "''"
+        with self._conn:
+            for table in (ROLES, COLLECTIONS, "sync_state", "namespace_stats"):
+                self._conn.execute(f"DELETE FROM {table} WHERE source_id NOT IN ({placeholders})", active_ids)
+        self._ready = {key: ready for key, ready in self._ready.items() if key[0] in active_ids}
+
+    # ========================================
+    # Sync
+    # ========================================
+
+    async def sync(self, full: Optional[bool] = None) -> int:
+        """
+        Sync the roles and collections of every active Galaxy source.
+
+        Args:
+            full: Force (True) or skip (False) a full crawl; by default a
+                source is fully crawled on its first sync and then every
+                full_sync_hours
+
+        Returns:
+            Number of items fetched
+        """
+        from app.services.galaxy_source_service import GalaxySourceService
+
+        await asyncio.to_thread(self.open)
+        async with self._sync_lock:
+            started = time.monotonic()
+            sources = GalaxySourceService.get_active_sources()
+            if not sources:
+                logger.info("Galaxy index: no active Galaxy source loaded, nothing to sync")
+                return 0
+            await asyncio.to_thread(self._drop_sources, [source["id"] for source in sources])
+
+            token = request_rate_limiter.set(HostRateLimiter(self.rate_per_host))
+            fetched = 0
+            try:
+                for source in sources:
+                    for kind in (ROLES, COLLECTIONS):
+                        try:
+                            fetched += await self._sync_source(source, kind, full)
+                        except Exception as e:
+                            logger.error(f"Galaxy index: {kind} sync of {source['name']} failed: {e}")
+                    if self.covers(source["id"]) and self.popular_pages:
+                        try:
+                            fetched += await self._refresh_downloads(source)
+                        except Exception as e:
+                            logger.error(f"Galaxy index: download counts refresh of {source['name']} failed: {e}")
+            finally:
+                request_rate_limiter.reset(token)
+
+            self._last_sync = datetime.utcnow()
+            self._last_sync_seconds = round(time.monotonic() - started, 1)
+            self._last_sync_items = fetched
+            logger.info(f"Galaxy index synced: {fetched} items from {len(sources)} source(s) in {self._last_sync_seconds}s")
+            return fetched
+
+    async def _sync_source(self, source: Dict[str, Any], kind: str, full: Optional[bool]) -> int:
+        """Crawl one kind of items of a source, newest-modified first"""
+        source_id = source["id"]
+        state = await asyncio.to_thread(self._sync_state, source_id, kind)
+        if full is None:
+            full = not state["ready"] or (
+                time.time() - (state["last_full_sync"] or 0) > self.full_sync_hours * 3600
+            )
+        cursor = None if full else state["cursor"]
+        newest = state["cursor"]
+        started = time.time()
+        fetched, complete = 0, False
+
+        pages = 0
+        async for items, has_more in self.iter_pages(source, kind):
+            pages += 1
+            rows = await self._write_items(source_id, kind, items, started)
+            fetched += len(rows)
+            modified = [m for m in (self._modified(kind, row) for row in rows) if m]
+            if modified:
+                newest = max([newest, *modified]) if newest else max(modified)
+            if not has_more:
+                complete = True
+                break
+            if cursor and modified and max(modified) < cursor:
+                # Everything further down was already indexed
+                break
+        if pages == self.max_pages and not complete:
+            logger.warning(f"Galaxy index: {kind} crawl of {source['name']} stopped after {self.max_pages} pages")
+
+        items_count = await asyncio.to_thread(self._finish_sync, source_id, kind, newest, full, complete, started)
+        logger.info(
+            f"Galaxy index: {source['name']} {kind} {'full' if full else 'incremental'} sync, "
+            f"{fetched} fetched, {items_count} indexed"
+        )
+        return fetched
+
+    async def _refresh_downloads(self, source: Dict[str, Any]) -> int:
+        """
+        Re-crawl the most downloaded roles of a source.
+
+        Download counts change without touching a role's modification
+        date, so the incremental sync alone would leave them (and the
+        namespace totals) stale; the top pages carry most of the totals.
+        """
+        source_id = source["id"]
+        started = time.time()
+        fetched = 0
+        async for items, _ in self.iter_pages(source, ROLES, "-download_count", self.popular_pages):
+            fetched += len(await self._write_items(source_id, ROLES, items, started))
+        return fetched
+
+    async def _write_items(self, source_id: str, kind: str, items: List[Dict[str, Any]], seen_at: float) -> List[Tuple]:
+        """Upsert the Galaxy items of one page, returns their rows"""
+        rows = [row for row in (self._row(source_id, kind, item, seen_at) for item in items) if row]
+        if rows:
+            await asyncio.to_thread(self._write_page, ROLE_UPSERT if kind == ROLES else COLLECTION_UPSERT, rows)
+        return rows
+
+    async def iter_pages(
+        self,
+        source: Dict[str, Any],
+        kind: str,
+        order_by: Optional[str] = None,
+        max_pages: Optional[int] = None
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        Stream the pages of roles or collections of a source.
+
+        Args:
+            source: Active source (id, name, url, token)
+            kind: ROLES (Galaxy v1) or COLLECTIONS (Galaxy v3 search, highest versions)
+            order_by: Galaxy sort order (default: newest-modified first)
+            max_pages: Pages at most (default: max_pages of the index)
+
+        Yields:
+            (items of one page, whether more pages follow)
+        """
+        for page in range(max_pages or self.max_pages):
+            items, has_more = await self._fetch_page(source, kind, page, order_by)
+            yield items, has_more
+            if not has_more:
+                return
+
+    async def _fetch_page(
+        self, source: Dict[str, Any], kind: str, page: int, order_by: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Items of one page of a source and whether more pages follow"""
+        base_url = source["url"].rstrip("/")
+        headers = {"Accept": "application/json"}
+        if source.get("token"):
+            headers["Authorization"] = f"Token {source['token']}"
+
+        if kind == ROLES:
+            url = f"{base_url}/api/v1/roles/"
+            params = {"page": page + 1, "page_size": self.page_size, "order_by": order_by or "-modified"}
+        else:
+            # The search endpoint (unlike the collection index) carries the
+            # descriptions and tags matched by Galaxy's keyword search
+            url = f"{base_url}/api/v3/plugin/ansible/search/collection-versions/"
+            params = {
+                "is_highest": "true", "offset": page * self.page_size, "limit": self.page_size,
+                "order_by": order_by or "-pulp_created"
+            }
+
+        status, data, _ = await self.fetch(url, headers=headers, params=params, read="json")
+        if status == 404 and page > 0:
+            return [], False  # Galaxy v1 answers 404 past the last page
+        if status != 200:
+            raise UpstreamHTTPError(status, url)
+
+        if kind == ROLES:
+            return data.get("results", []), bool(data.get("next"))
+        items = data.get("data", [])
+        total = data.get("meta", {}).get("count", 0)
+        return items, bool(items) and (page + 1) * self.page_size < total
+
+    @staticmethod
+    def _row(source_id: str, kind: str, item: Dict[str, Any], seen_at: float) -> Optional[Tuple]:
+        """Index row of a Galaxy item, None if the item lacks its identifiers"""
+        if kind == ROLES:
+            from app.services.galaxy_roles_service import galaxy_roles_service
+
+            role = galaxy_roles_service._normalize_standalone_role(item)
+            if role["id"] is None or not role["name"]:
+                return None
+            return (
+                source_id, role["id"], role["namespace"], role["name"], role["description"] or "",
+                role["download_count"] or 0, role["github_user"], role["github_repo"],
+                role["created"], role["modified"], seen_at
+            )
+        version = item.get("collection_version") or item
+        if not version.get("namespace") or not version.get("name"):
+            return None
+        tags = " ".join(
+            tag.get("name", "") if isinstance(tag, dict) else str(tag) for tag in version.get("tags") or []
+        )
+        return (
+            source_id, version["namespace"], version["name"], version.get("version"),
+            version.get("description") or "", tags,
+            item.get("download_count") or version.get("download_count") or 0,
+            version.get("pulp_created") or item.get("updated_at"), seen_at
+        )
+
+    @staticmethod
+    def _modified(kind: str, row: Tuple) -> Optional[str]:
+        return row[9] if kind == ROLES else row[7]
+
+    # ========================================
+    # Lifecycle
+    # ========================================
+
+    async def start(self) -> None:
+        """Open the index and sync it periodically in the background"""
+        try:
+            await asyncio.to_thread(self.open)
+        except (sqlite3.Error, ValueError, OSError) as e:
+            # Galaxy is queried directly; each sync retries to open the index
+            logger.error(f"Galaxy index {self.path} cannot be opened: {e}")
+        if self._sync_task and not self._sync_task.done():
+            return
+        self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Galaxy index sync failed: {e}")
+            await asyncio.sleep(self.sync_interval_minutes * 60)
+
+    async def stop(self) -> None:
+        """Stop the background sync and close the index"""
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.close_session()
+        self.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get Galaxy index status"""
+        sources = {}
+        if self._conn is not None:
+            for source_id, kind, ready, items, last_sync in self._reader.execute(
+                "SELECT source_id, kind, ready, items, last_sync FROM sync_state ORDER BY source_id, kind"
+            ):
+                sources.setdefault(source_id, {})[kind] = {
+                    "ready": bool(ready),
+                    "items": items,
+                    "last_sync": datetime.utcfromtimestamp(last_sync).isoformat() if last_sync else None
+                }
+        return {
+            "path": self.path,
+            "open": self._conn is not None,
+            "syncing": self._sync_lock.locked(),
+            "sources": sources,
+            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            "last_sync_seconds": self._last_sync_seconds,
+            "last_sync_items": self._last_sync_items
+        }
+
+
+# Global instance
+galaxy_index = GalaxyIndex(
+    path=settings.GALAXY_INDEX_PATH,
+    page_size=settings.GALAXY_INDEX_PAGE_SIZE,
+    max_pages=settings.GALAXY_INDEX_MAX_PAGES,
+    sync_interval_minutes=settings.GALAXY_INDEX_SYNC_INTERVAL_MINUTES,
+    full_sync_hours=settings.GALAXY_INDEX_FULL_SYNC_HOURS,
+    rate_per_host=settings.GALAXY_INDEX_RATE_PER_HOST,
+    popular_pages=settings.GALAXY_INDEX_POPULAR_PAGES
+)
@@ -6,16 +6,48 @@ Supports:
 - API v3: Collection roles (namespace.collection.role format)
 - Private Galaxy: AAP (Automation Hub) or Galaxy NG
 - Dynamic source configuration from database (admin-configurable)
+
+Role lists, role details and the collection search step of role search
+are served from the local Galaxy index once it holds a full copy of the
+source (see galaxy_index_service); otherwise Galaxy is queried.
+
+With source="all" (federated mode), every active source is queried
+concurrently and the answers are merged by source priority, duplicates
+(same FQCN) keeping the highest-priority copy; the query returns once the
+highest-priority sources have answered (plus a short grace period for the
+others) or at a deadline.
+
+Requests go through BaseHTTPService.fetch() (retries, circuit breaker per
+host); when Galaxy fails, the last cached role details and popular namespaces
+are served even past their TTL rather than an empty result.
+
+Collection roles come from the docs-blob of the collection version, cached
+by concrete version (a published version never changes) together with its
+module schemas (see module_docs_service); "latest" is resolved through a
+short-lived pointer revalidated with conditional requests, so docs-blobs
+are only downloaded once per version.
 """
 
+import asyncio
+import heapq
 import logging
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Set, Tuple, TypeVar
 from app.core.config import settings
-from app.core.http_service import BaseHTTPService
-from app.services.cache_service import cache
+from app.core.http_service import BaseHTTPService, UpstreamHTTPError
+from app.services.cache_service import cache, single_flight, NOT_CACHED
+from app.services.galaxy_index_service import galaxy_index
+from app.services.module_docs_service import module_docs_service
+
+T = TypeVar('T')
 
 logger = logging.getLogger(__name__)
 
+# Source value of the federated mode (all active sources)
+FEDERATED_SOURCE = "all"
+
+# Popular namespaces kept per source (largest limit of the API)
+POPULAR_NAMESPACES_KEPT = 100
+
 
 class GalaxyRolesService(BaseHTTPService):
     """Service for fetching roles from Ansible Galaxy APIs"""
@@ -25,12 +57,24 @@ class GalaxyRolesService(BaseHTTPService):
     CACHE_TTL_ROLES = CacheTTL.ROLES_LIST
     CACHE_TTL_DETAILS = CacheTTL.ROLE_DETAILS
     CACHE_TTL_CONFIG = CacheTTL.NAMESPACES
+    CACHE_TTL_LATEST = CacheTTL.LATEST_VERSION
 
     def __init__(self):
         super().__init__(timeout=60)
         # Environment variables as fallback only (used when DB cache not loaded)
         self._fallback_public_url = settings.GALAXY_PUBLIC_URL.rstrip('/')
         self._fallback_public_enabled = settings.GALAXY_PUBLIC_ENABLED
+        # Federated queries left out after their deadline, still filling the cache
+        self._background: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _stale_or(cache_key: str, default: Any) -> Any:
+        """Stale cached value of cache_key after an upstream failure, else default"""
+        stale = cache.get_stale(cache_key)
+        if stale is not NOT_CACHED:
+            logger.warning(f"Galaxy unavailable, serving stale value for {cache_key}")
+            return stale
+        return default
 
     def _get_active_sources(self) -> List[dict]:
         """
@@ -59,13 +103,66 @@ class GalaxyRolesService(BaseHTTPService):
         return fallback
 
     def _get_source_by_type(self, source_type: str) -> Optional[dict]:
-        """Get the first active source of the specified type."""
+        """Get the first active source of the specified type (or with that ID)."""
         sources = self._get_active_sources()
         for source in sources:
-            if source["source_type"] == source_type:
+            if source["source_type"] == source_type or source["id"] == source_type:
                 return source
         return None
 
+    async def _federated(self, query: Callable[[str], Awaitable[T]]) -> List[Tuple[dict, T]]:
+        """
+        Run query(source_id) on every active source concurrently.
+
+        Waits for the highest-priority sources, then at most
+        GALAXY_FEDERATED_GRACE_SECONDS for the others, and never longer
+        than GALAXY_FEDERATED_DEADLINE_SECONDS. Sources still pending are
+        left out of the answer but not cancelled: they run to completion in
+        the background and fill the cache for the next query.
+
+        Returns:
+            [(source, result)] of the sources that answered, by priority
+        """
+        sources = sorted(self._get_active_sources(), key=lambda s: s["priority"])
+        if not sources:
+            return []
+        tasks = {asyncio.create_task(query(source["id"])): source for source in sources}
+        top_priority = sources[0]["priority"]
+        primary = [task for task, source in tasks.items() if source["priority"] == top_priority]
+
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + settings.GALAXY_FEDERATED_DEADLINE_SECONDS
+        grace_started = False
+        pending = set(tasks)
+        while pending:
+            remaining = ends_at - loop.time()
+            if remaining <= 0:
+                break
+            _, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not grace_started and all(task.done() for task in primary):
+                grace_started = True
+                ends_at = min(ends_at, loop.time() + settings.GALAXY_FEDERATED_GRACE_SECONDS)
+
+        for task in pending:
+            logger.warning(f"Galaxy source {tasks[task]['name']} did not answer in time, left out")
+            self._background.add(task)
+            task.add_done_callback(self._background_done)
+
+        answers = []
+        for task, source in tasks.items():
+            if task in pending:
+                continue
+            if task.exception() is not None:
+                logger.error(f"Galaxy source {source['name']} failed: {task.exception()}")
+                continue
+            answers.append((source, task.result()))
+        return answers
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Galaxy background query failed: {task.exception()}")
+
     def _get_base_url(self, source: str) -> Optional[str]:
         """Get base URL for the specified source type. Returns None if source is disabled."""
         source_config = self._get_source_by_type(source)
@@ -73,6 +170,11 @@ class GalaxyRolesService(BaseHTTPService):
             return source_config["url"].rstrip('/')
         return None
 
+    def _get_source_id(self, source: str) -> Optional[str]:
+        """ID of the active source of the specified type (key of the local index)"""
+        source_config = self._get_source_by_type(source)
+        return source_config["id"] if source_config else None
+
     def _get_headers(self, source: str) -> Dict[str, str]:
         """Get headers including auth token for private Galaxy"""
         headers = {
@@ -105,59 +207,114 @@ class GalaxyRolesService(BaseHTTPService):
             namespace: Filter by author/namespace
             page: Page number (1-indexed)
             page_size: Results per page
-            source: "public" or "private"
+            source: "public", "private", a source ID or "all" (federated)
             order_by: Sort field (default: most downloaded)
 
         Returns:
             Dict with count, next, previous, results
         """
-        cache_key = f"galaxy_standalone_roles:{source}:{namespace}:{search}:{page}:{page_size}"
-        cached = cache.get(cache_key)
+        if source == FEDERATED_SOURCE:
+            return await self._get_federated_standalone_roles(search, namespace, page, page_size, order_by)
+
+        source_id = self._get_source_id(source)
+        if source_id:
+            indexed = galaxy_index.search_roles(source_id, search, namespace, page, page_size, order_by, source)
+            if indexed is not None:
+                return indexed
+
+        cache_key = f"galaxy_standalone_roles:{source}:{namespace}:{search}:{page}:{page_size}:{order_by}"
+        cached = await cache.get_async(cache_key)
         if cached:
             logger.debug(f"Returning cached standalone roles: {cache_key}")
             return cached
 
         try:
-            base_url = self._get_base_url(source)
-            url = f"{base_url}/api/v1/roles/"
+            # Concurrent misses share a single Galaxy request
+            return await single_flight.do(
+                cache_key,
+                lambda: self._fetch_standalone_roles(
+                    cache_key, search, namespace, page, page_size, source, order_by
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error fetching standalone roles: {str(e)}")
+            return {"count": 0, "next": None, "previous": None, "results": []}
 
-            params = {
-                "page": page,
-                "page_size": page_size,
-                "order_by": order_by
-            }
-            if search:
-                params["search"] = search
-            if namespace:
-                params["namespace"] = namespace
+    async def _fetch_standalone_roles(
+        self,
+        cache_key: str,
+        search: str,
+        namespace: str,
+        page: int,
+        page_size: int,
+        source: str,
+        order_by: str
+    ) -> Dict[str, Any]:
+        """Fetch and cache one page of standalone roles from Galaxy v1"""
+        base_url = self._get_base_url(source)
+        url = f"{base_url}/api/v1/roles/"
+
+        params = {
+            "page": page,
+            "page_size": page_size,
+            "order_by": order_by
+        }
+        if search:
+            params["search"] = search
+        if namespace:
+            params["namespace"] = namespace
+
+        headers = self._get_headers(source)
+
+        logger.info(f"Fetching standalone roles from {url} with params {params}")
+
+        status, data, _ = await self.fetch(url, params=params, headers=headers, read="json")
+        if status != 200:
+            logger.warning(f"Galaxy v1 API returned {status}")
+            raise UpstreamHTTPError(status, url)
+
+        result = {
+            "count": data.get("count", 0),
+            "next": data.get("next"),
+            "previous": data.get("previous"),
+            "results": [
+                self._normalize_standalone_role(role)
+                for role in data.get("results", [])
+            ]
+        }
+        cache.set(cache_key, result, self.CACHE_TTL_ROLES)
+        logger.info(f"Found {len(result['results'])} standalone roles")
+        return result
 
-            session = await self.get_session()
-            headers = self._get_headers(source)
+    async def _get_federated_standalone_roles(
+        self, search: str, namespace: str, page: int, page_size: int, order_by: str
+    ) -> Dict[str, Any]:
+        """
+        One page of standalone roles from every active source.
 
-            logger.info(f"Fetching standalone roles from {url} with params {params}")
-
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    result = {
-                        "count": data.get("count", 0),
-                        "next": data.get("next"),
-                        "previous": data.get("previous"),
-                        "results": [
-                            self._normalize_standalone_role(role)
-                            for role in data.get("results", [])
-                        ]
-                    }
-                    cache.set(cache_key, result, self.CACHE_TTL_ROLES)
-                    logger.info(f"Found {len(result['results'])} standalone roles")
-                    return result
-                else:
-                    logger.warning(f"Galaxy v1 API returned {response.status}")
-                    return {"count": 0, "next": None, "previous": None, "results": []}
+        Each source contributes its page; higher-priority sources come first
+        and a role (FQRN) listed by several sources keeps their copy. count
+        is the sum of the per-source counts (duplicates included), there
+        are no next/previous links: request the next page number.
+        """
+        answers = await self._federated(
+            lambda source_id: self.get_standalone_roles(search, namespace, page, page_size, source_id, order_by)
+        )
+        count, results, seen = 0, [], set()
+        for source, result in answers:
+            count += result.get("count", 0)
+            for role in result.get("results", []):
+                if role["fqrn"] not in seen:
+                    seen.add(role["fqrn"])
+                    results.append({**role, "source": source["name"]})
 
-        except Exception as e:
-            logger.error(f"Error fetching standalone roles: {str(e)}")
-            return {"count": 0, "next": None, "previous": None, "results": []}
+        return {
+            "count": count,
+            "next": None,
+            "previous": None,
+            "results": results,
+            "sources": [source["name"] for source, _ in answers]
+        }
 
     def _normalize_standalone_role(self, role: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize standalone role data from v1 API"""
@@ -191,39 +348,63 @@ class GalaxyRolesService(BaseHTTPService):
         Args:
             namespace: Author/namespace name
             name: Role name
-            source: "public" or "private"
+            source: "public", "private", a source ID or "all" (federated)
 
         Returns:
             Role details or None if not found
         """
+        if source == FEDERATED_SOURCE:
+            answers = await self._federated(
+                lambda source_id: self.get_standalone_role_details(namespace, name, source_id)
+            )
+            for source_config, role in answers:
+                if role:
+                    return {**role, "source": source_config["name"]}
+            return None
+
+        source_id = self._get_source_id(source)
+        if source_id and galaxy_index.covers(source_id):
+            return galaxy_index.get_role(source_id, namespace, name)
+
         cache_key = f"galaxy_standalone_role:{source}:{namespace}:{name}"
-        cached = cache.get(cache_key)
+        cached = await cache.get_async(cache_key)
         if cached:
             return cached
 
         try:
-            # First, search for the role by namespace and name
-            base_url = self._get_base_url(source)
-            url = f"{base_url}/api/v1/roles/"
-            params = {"namespace": namespace, "name": name}
-
-            session = await self.get_session()
-            headers = self._get_headers(source)
-
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = data.get("results", [])
-                    if results:
-                        role = self._normalize_standalone_role(results[0])
-                        cache.set(cache_key, role, self.CACHE_TTL_DETAILS)
-                        return role
-
-            return None
-
+            return await single_flight.do(
+                cache_key,
+                lambda: self._fetch_standalone_role_details(cache_key, namespace, name, source)
+            )
         except Exception as e:
             logger.error(f"Error fetching role details for {namespace}.{name}: {str(e)}")
-            return None
+            return self._stale_or(cache_key, None)
+
+    async def _fetch_standalone_role_details(
+        self,
+        cache_key: str,
+        namespace: str,
+        name: str,
+        source: str
+    ) -> Optional[Dict[str, Any]]:
+        """Look up and cache a standalone role by namespace and name"""
+        # First, search for the role by namespace and name
+        base_url = self._get_base_url(source)
+        url = f"{base_url}/api/v1/roles/"
+        params = {"namespace": namespace, "name": name}
+
+        headers = self._get_headers(source)
+
+        status, data, _ = await self.fetch(url, params=params, headers=headers, read="json")
+        if status != 200:
+            raise UpstreamHTTPError(status, url)
+        results = data.get("results", [])
+        if results:
+            role = self._normalize_standalone_role(results[0])
+            cache.set(cache_key, role, self.CACHE_TTL_DETAILS)
+            return role
+
+        return None
 
     async def get_popular_namespaces(
         self,
@@ -233,47 +414,70 @@ class GalaxyRolesService(BaseHTTPService):
         """
         Get list of popular role authors/namespaces
 
-        Returns list of namespaces with role counts
+        Returns namespaces with role counts, by total downloads. Once the
+        source is in the local Galaxy index, totals cover every role and
+        are read from the index; until then they are aggregated from the
+        first pages of the most downloaded roles.
         """
+        if source == FEDERATED_SOURCE:
+            answers = await self._federated(lambda source_id: self.get_popular_namespaces(source_id, POPULAR_NAMESPACES_KEPT))
+            totals: Dict[str, Dict[str, Any]] = {}
+            for _, namespaces in answers:
+                for ns in namespaces:
+                    total = totals.setdefault(ns["name"], {"name": ns["name"], "role_count": 0, "total_downloads": 0})
+                    total["role_count"] += ns["role_count"]
+                    total["total_downloads"] += ns["total_downloads"]
+            return heapq.nlargest(limit, totals.values(), key=lambda ns: ns["total_downloads"])
+
+        source_id = self._get_source_id(source)
+        if source_id:
+            indexed = galaxy_index.popular_namespaces(source_id, limit)
+            if indexed is not None:
+                return indexed
+
         cache_key = f"galaxy_popular_namespaces:{source}"
-        cached = cache.get(cache_key)
+        cached = await cache.get_async(cache_key)
         if cached:
             return cached[:limit]
 
         try:
-            # Fetch top roles to extract popular namespaces
-            roles_data = await self.get_standalone_roles(
-                page_size=100,
-                source=source,
-                order_by="-download_count"
-            )
-
-            # Count roles per namespace
+            # Stream the most downloaded roles page by page, counting per namespace
             namespace_counts: Dict[str, int] = {}
             namespace_downloads: Dict[str, int] = {}
 
-            for role in roles_data.get("results", []):
-                ns = role.get("namespace", "unknown")
-                namespace_counts[ns] = namespace_counts.get(ns, 0) + 1
-                namespace_downloads[ns] = namespace_downloads.get(ns, 0) + role.get("download_count", 0)
-
-            # Build namespace list sorted by total downloads
+            for page in range(1, settings.GALAXY_POPULAR_NAMESPACES_PAGES + 1):
+                roles_data = await self.get_standalone_roles(
+                    page=page,
+                    page_size=100,
+                    source=source,
+                    order_by="-download_count"
+                )
+                for role in roles_data.get("results", []):
+                    ns = role.get("namespace", "unknown")
+                    namespace_counts[ns] = namespace_counts.get(ns, 0) + 1
+                    namespace_downloads[ns] = namespace_downloads.get(ns, 0) + role.get("download_count", 0)
+                if not roles_data.get("next"):
+                    break
+
+            # Top namespaces by total downloads
             namespaces = [
                 {
                     "name": ns,
                     "role_count": namespace_counts[ns],
                     "total_downloads": namespace_downloads[ns]
                 }
-                for ns in namespace_counts
+                for ns in heapq.nlargest(POPULAR_NAMESPACES_KEPT, namespace_downloads, key=namespace_downloads.get)
             ]
-            namespaces.sort(key=lambda x: x["total_downloads"], reverse=True)
 
+            if not namespaces:
+                # No roles at all means Galaxy failed: do not cache it for a day
+                return self._stale_or(cache_key, [])[:limit]
             cache.set(cache_key, namespaces, self.CACHE_TTL_CONFIG)
             return namespaces[:limit]
 
         except Exception as e:
             logger.error(f"Error fetching popular namespaces: {str(e)}")
-            return []
+            return self._stale_or(cache_key, [])[:limit]
 
     # ========================================
     # API v3 - Collection Roles
@@ -293,72 +497,109 @@ class GalaxyRolesService(BaseHTTPService):
             namespace: Collection namespace
             collection: Collection name
             version: Collection version or "latest"
-            source: "public" or "private"
+            source: "public", "private", a source ID or "all" (federated)
 
         Returns:
             List of roles in the collection
         """
-        cache_key = f"galaxy_collection_roles:{source}:{namespace}:{collection}:{version}"
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
+        if source == FEDERATED_SOURCE:
+            answers = await self._federated(
+                lambda source_id: self.get_collection_roles(namespace, collection, version, source_id)
+            )
+            return self._merge_by_fqcn(answers)
 
         try:
-            base_url = self._get_base_url(source)
-
-            # First get collection info to find the version
             if version == "latest":
-                version = await self._get_latest_collection_version(
-                    namespace, collection, source
-                )
+                version = await self._get_latest_collection_version(namespace, collection, source)
                 if not version:
                     return []
 
-            # Fetch collection contents/docs to find roles
-            url = f"{base_url}/api/v3/plugin/ansible/content/published/collections/index/{namespace}/{collection}/versions/{version}/docs-blob/"
-
-            session = await self.get_session()
-            headers = self._get_headers(source)
-
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    roles = self._extract_roles_from_collection_docs(
-                        data, namespace, collection
-                    )
-                    cache.set(cache_key, roles, self.CACHE_TTL_ROLES)
-                    return roles
-                else:
-                    logger.warning(f"Galaxy v3 docs-blob returned {response.status} for {namespace}.{collection}")
-                    return []
+            base_url = self._get_base_url(source)
+            if not base_url:
+                return []
 
+            # A published collection version never changes: its docs-blob is
+            # cached by concrete version, shared with the module schemas
+            docs = await module_docs_service.get_docs_blob(
+                namespace, collection, version, base_url=base_url, headers=self._get_headers(source)
+            )
+            if docs is None:
+                return []
+            return self._extract_roles_from_collection_docs(docs["role_docs"], namespace, collection)
         except Exception as e:
             logger.error(f"Error fetching collection roles for {namespace}.{collection}: {str(e)}")
             return []
 
+    @staticmethod
+    def _merge_by_fqcn(answers: List[Tuple[dict, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Roles of federated answers (by priority), one per FQCN, tagged with their source"""
+        merged, seen = [], set()
+        for source, roles in answers:
+            for role in roles:
+                if role["fqcn"] not in seen:
+                    seen.add(role["fqcn"])
+                    merged.append({**role, "source": source["name"]})
+        return merged
+
     async def _get_latest_collection_version(
         self,
         namespace: str,
         collection: str,
         source: str = "public"
     ) -> Optional[str]:
-        """Get the latest version of a collection"""
-        try:
-            base_url = self._get_base_url(source)
-            url = f"{base_url}/api/v3/plugin/ansible/content/published/collections/index/{namespace}/{collection}/"
-
-            session = await self.get_session()
-            headers = self._get_headers(source)
+        """
+        Get the latest version of a collection
 
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get("highest_version", {}).get("version")
-                return None
+        The answer is cached for a short time with the ETag/Last-Modified of
+        Galaxy; once expired it is revalidated with a conditional request
+        (HTTP 304 without a body while no version has been published).
+        """
+        cache_key = f"galaxy_collection_latest:{source}:{namespace}:{collection}"
+        cached = await cache.get_async(cache_key)
+        if cached:
+            return cached
 
+        try:
+            return await single_flight.do(
+                cache_key,
+                lambda: self._fetch_latest_collection_version(cache_key, namespace, collection, source)
+            )
         except Exception as e:
             logger.error(f"Error getting latest version for {namespace}.{collection}: {str(e)}")
+            return self._stale_or(cache_key, None)
+
+    async def _fetch_latest_collection_version(
+        self,
+        cache_key: str,
+        namespace: str,
+        collection: str,
+        source: str
+    ) -> Optional[str]:
+        """Fetch (or revalidate) and cache the latest version pointer of a collection"""
+        base_url = self._get_base_url(source)
+        url = f"{base_url}/api/v3/plugin/ansible/content/published/collections/index/{namespace}/{collection}/"
+
+        headers = self._get_headers(source)
+
+        status, data, validators = await self.fetch_conditional(
+            url, cache.get_validators(cache_key), headers=headers, read="json"
+        )
+        if status == 304:
+            version = cache.revalidate(cache_key, self.CACHE_TTL_LATEST)
+            if version is not NOT_CACHED:
+                return version
+            # Pointer evicted meanwhile: fetch it again
+            status, data, validators = await self.fetch_conditional(url, headers=headers, read="json")
+
+        if status == 404:
             return None
+        if status != 200:
+            raise UpstreamHTTPError(status, url)
+
+        version = data.get("highest_version", {}).get("version")
+        if version:
+            cache.set(cache_key, version, self.CACHE_TTL_LATEST, validators=validators)
+        return version
 
     def _extract_roles_from_collection_docs(
         self,
@@ -400,7 +641,7 @@ class GalaxyRolesService(BaseHTTPService):
                         "type": "collection"
                     })
 
-        logger.info(f"Found {len(roles)} roles in {namespace}.{collection}")
+        logger.debug(f"Found {len(roles)} roles in {namespace}.{collection}")
         return roles
 
     async def search_collection_roles(
@@ -413,8 +654,111 @@ class GalaxyRolesService(BaseHTTPService):
         Search for roles across collections
 
         Note: Galaxy v3 doesn't have a direct role search, so we search collections
-        and then check their contents for roles
+        and then check their contents for roles (see iter_collection_roles).
+        Roles are returned in the collection search order; collections still
+        pending at the deadline are left out.
         """
+        found: Dict[int, List[Dict[str, Any]]] = {}
+        async for batch in self.iter_collection_roles(query, source, limit):
+            found[batch["rank"]] = batch["roles"]
+
+        roles = [role for rank in sorted(found) for role in found[rank]]
+        return roles[:limit]
+
+    async def iter_collection_roles(
+        self,
+        query: str,
+        source: str = "public",
+        limit: int = 50,
+        max_collections: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Search collections matching query, then yield their roles as each
+        collection lookup completes.
+
+        The lookups run concurrently (at most `concurrency` at a time). When
+        `deadline` seconds have elapsed (or the consumer stops iterating) the
+        search stops with the collections found so far; lookups already
+        running finish in the background and fill the cache for the next
+        search, those still waiting for a slot are dropped.
+
+        Args:
+            query: Search query
+            source: "public", "private", a source ID or "all" (federated)
+            limit: Collections requested from the Galaxy search
+            max_collections: Collections inspected (default: settings.GALAXY_ROLE_SEARCH_COLLECTIONS)
+            concurrency: Concurrent lookups (default: settings.GALAXY_ROLE_SEARCH_CONCURRENCY)
+            deadline: Seconds before partial results (default: settings.GALAXY_ROLE_SEARCH_DEADLINE_SECONDS)
+
+        Yields:
+            {"rank", "namespace", "collection", "source", "roles"}, rank
+            being the position of the collection in the search results
+        """
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + (deadline or settings.GALAXY_ROLE_SEARCH_DEADLINE_SECONDS)
+
+        if source == FEDERATED_SOURCE:
+            answers = await self._federated(
+                lambda source_id: self._search_collections(query, source_id, limit)
+            )
+            matches = [(item, config["id"]) for config, items in answers for item in items or []]
+        else:
+            matches = [(item, source) for item in await self._search_collections(query, source, limit) or []]
+
+        collections, seen = [], set()
+        for item, item_source in matches:
+            namespace = item.get("namespace", "")
+            collection = item.get("name", "")
+            if namespace and collection and (namespace, collection) not in seen:
+                # Federated: a collection found on several sources is looked
+                # up on the highest-priority one
+                seen.add((namespace, collection))
+                # The search already returns the highest version: no extra
+                # round trip to resolve "latest"
+                collections.append((namespace, collection, item.get("version") or "latest", item_source))
+        collections = collections[:max_collections or settings.GALAXY_ROLE_SEARCH_COLLECTIONS]
+        if not collections:
+            return
+
+        semaphore = asyncio.Semaphore(concurrency or settings.GALAXY_ROLE_SEARCH_CONCURRENCY)
+        started: Set[int] = set()
+
+        async def lookup(rank: int, namespace: str, collection: str, version: str, item_source: str) -> Dict[str, Any]:
+            async with semaphore:
+                started.add(rank)
+                roles = await self.get_collection_roles(namespace, collection, version, item_source)
+            return {"rank": rank, "namespace": namespace, "collection": collection, "source": item_source, "roles": roles}
+
+        tasks = [asyncio.create_task(lookup(rank, *item)) for rank, item in enumerate(collections)]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=max(0.0, ends_at - loop.time())):
+                try:
+                    yield await next_done
+                except asyncio.TimeoutError:
+                    pending = sum(not task.done() for task in tasks)
+                    logger.warning(
+                        f"Collection role search for {query!r} hit its deadline, "
+                        f"{pending}/{len(tasks)} collections left out"
+                    )
+                    break
+        finally:
+            for rank, task in enumerate(tasks):
+                if task.done():
+                    continue
+                if rank in started:
+                    self._background.add(task)
+                    task.add_done_callback(self._background_done)
+                else:
+                    task.cancel()
+
+    async def _search_collections(self, query: str, source: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Collections matching query on one source (local index, else Galaxy search), None on failure"""
+        source_id = self._get_source_id(source)
+        matches = galaxy_index.search_collections(source_id, query, limit) if source_id else None
+        if matches is not None:
+            return matches
         try:
             base_url = self._get_base_url(source)
             # Search collections that might contain roles
@@ -425,27 +769,16 @@ class GalaxyRolesService(BaseHTTPService):
                 "is_highest": "true"
             }
 
-            session = await self.get_session()
             headers = self._get_headers(source)
 
-            roles = []
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    for item in data.get("data", [])[:10]:  # Limit to first 10 collections
-                        namespace = item.get("namespace", "")
-                        collection = item.get("name", "")
-                        if namespace and collection:
-                            collection_roles = await self.get_collection_roles(
-                                namespace, collection, "latest", source
-                            )
-                            roles.extend(collection_roles)
-
-            return roles[:limit]
-
+            status, data, _ = await self.fetch(url, params=params, headers=headers, read="json")
+            if status != 200:
+                logger.warning(f"Galaxy v3 collection search returned {status}")
+                return None
+            return data.get("data", [])
         except Exception as e:
             logger.error(f"Error searching collection roles: {str(e)}")
-            return []
+            return None
 
     # ========================================
     # Configuration
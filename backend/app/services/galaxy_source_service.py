@@ -22,9 +22,13 @@ from app.schemas.galaxy_source import (
 )
 from app.utils.encryption import encrypt_token, decrypt_token, mask_token
 from app.core.config import settings
+from app.core.http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
+# Seconds allowed per endpoint when testing a source
+TEST_CONNECTION_TIMEOUT = 10.0
+
 
 class GalaxySourceService:
     """Service for managing Galaxy source configurations."""
@@ -474,53 +478,53 @@ class GalaxySourceService:
 
         start_time = time.time()
 
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            for endpoint in test_endpoints:
-                try:
-                    response = await client.get(endpoint, headers=headers)
-                    elapsed_ms = int((time.time() - start_time) * 1000)
-
-                    if response.status_code == 200:
-                        data = {}
-                        content_type = response.headers.get('content-type', '')
-                        if content_type.startswith('application/json'):
-                            try:
-                                data = response.json()
-                            except Exception:
-                                pass
-
-                        return GalaxySourceTestResponse(
-                            success=True,
-                            message=f"Successfully connected to {url}",
-                            response_time_ms=elapsed_ms,
-                            api_version=data.get('version') or data.get('current_version'),
-                            collections_count=data.get('count') if 'count' in data else None,
-                        )
-                    elif response.status_code == 401:
-                        return GalaxySourceTestResponse(
-                            success=False,
-                            message="Authentication failed - invalid or expired token",
-                            response_time_ms=elapsed_ms,
-                        )
-                    elif response.status_code == 403:
-                        return GalaxySourceTestResponse(
-                            success=False,
-                            message="Access forbidden - check token permissions",
-                            response_time_ms=elapsed_ms,
-                        )
-                except httpx.TimeoutException:
+        client = http_pool.httpx_client
+        for endpoint in test_endpoints:
+            try:
+                response = await client.get(endpoint, headers=headers, timeout=TEST_CONNECTION_TIMEOUT)
+                elapsed_ms = int((time.time() - start_time) * 1000)
+
+                if response.status_code == 200:
+                    data = {}
+                    content_type = response.headers.get('content-type', '')
+                    if content_type.startswith('application/json'):
+                        try:
+                            data = response.json()
+                        except Exception:
+                            pass
+
+                    return GalaxySourceTestResponse(
+                        success=True,
+                        message=f"Successfully connected to {url}",
+                        response_time_ms=elapsed_ms,
+                        api_version=data.get('version') or data.get('current_version'),
+                        collections_count=data.get('count') if 'count' in data else None,
+                    )
+                elif response.status_code == 401:
                     return GalaxySourceTestResponse(
                         success=False,
-                        message="Connection timeout after 10 seconds",
+                        message="Authentication failed - invalid or expired token",
+                        response_time_ms=elapsed_ms,
                     )
-                except httpx.ConnectError as e:
+                elif response.status_code == 403:
                     return GalaxySourceTestResponse(
                         success=False,
-                        message=f"Connection failed: {str(e)}",
+                        message="Access forbidden - check token permissions",
+                        response_time_ms=elapsed_ms,
                     )
-                except Exception as e:
-                    logger.warning(f"Test endpoint {endpoint} failed: {e}")
-                    continue
+            except httpx.TimeoutException:
+                return GalaxySourceTestResponse(
+                    success=False,
+                    message=f"Connection timeout after {TEST_CONNECTION_TIMEOUT:g} seconds",
+                )
+            except httpx.ConnectError as e:
+                return GalaxySourceTestResponse(
+                    success=False,
+                    message=f"Connection failed: {str(e)}",
+                )
+            except Exception as e:
+                logger.warning(f"Test endpoint {endpoint} failed: {e}")
+                continue
 
         elapsed_ms = int((time.time() - start_time) * 1000)
         return GalaxySourceTestResponse(
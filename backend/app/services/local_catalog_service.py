@@ -0,0 +1,363 @@
+"""
+Local Catalog Service - Offline Ansible catalog from the installed collections
+
+The backend image ships the ansible package, i.e. every collection of one
+Ansible release with its plugin documentation. For that release the
+catalog (namespaces, collections, modules, schemas) is served from a local
+index instead of docs.ansible.com:
+
+- build: `ansible-doc --list --json` gives the modules, then
+  `ansible-doc --json` is run on batches of modules by a few concurrent
+  subprocesses; schemas are normalized in the parser pool
+- storage: one SQLite file, the module list plus one zlib-compressed JSON
+  schema per module; written to a temporary file and atomically renamed
+- lookups: the namespace -> collection -> module tree is held in memory,
+  schemas are read by primary key (memory-mapped) on demand; module names,
+  descriptions and parameter names feed the module search index
+
+Modules of an ansible-doc batch that failed (timeout, crash) are recorded
+as failed: their schemas, and the module lists of their collections, are
+not served locally, so callers fall back to docs.ansible.com for them; a
+loaded index with failed modules is rebuilt in the background.
+
+The index is rebuilt in the background when it is missing, in an older
+format or built from another Ansible release.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.docs_parser import parser_pool
+from app.services.module_docs_service import (
+    ansible_version_matches,
+    installed_ansible_version,
+    run_ansible_doc,
+    schema_from_plugin_docs,
+)
+from app.services.module_search_service import VersionIndex, module_search
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CATALOG_FORMAT_VERSION = "3"
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+# ansible-doc --list on every installed collection takes a few seconds
+LIST_TIMEOUT_SECONDS = 120
+
+# (fqcn, namespace, collection, module, short description, parameter names, compressed schema)
+IndexRow = Tuple[str, str, str, str, str, str, bytes]
+
+
+def index_rows_from_ansible_doc(output: bytes, descriptions: Dict[str, str]) -> List[IndexRow]:
+    """Index rows for the modules of an `ansible-doc --json` output"""
+    rows = []
+    for fqcn, plugin_docs in json.loads(output or b"{}").items():
+        parts = fqcn.split(".")
+        if len(parts) != 3 or not plugin_docs or not plugin_docs.get("doc"):
+            continue
+        namespace, collection, module = parts
+        schema = schema_from_plugin_docs(module, plugin_docs, "ansible-doc")
+        payload = zlib.compress(json.dumps(schema, separators=(",", ":")).encode())
+        parameters = " ".join(p["name"] for p in schema["parameters"])
+        rows.append((fqcn, namespace, collection, module, descriptions.get(fqcn) or "", parameters, payload))
+    return rows
+
+
+class LocalCatalog:
+    """
+    Catalog index of the installed Ansible release.
+    """
+
+    def __init__(self, path: str, build_concurrency: int = 2, batch_size: int = 100):
+        self.path = path
+        self.build_concurrency = max(1, build_concurrency)
+        self.batch_size = max(1, batch_size)
+        self.ansible_version: Optional[str] = None  # Release of the loaded index
+        self._collections: Dict[str, List[str]] = {}
+        self._modules: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        self._incomplete: Set[Tuple[str, str]] = set()  # Collections with failed modules
+        self._failed_modules = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._build_task: Optional[asyncio.Task] = None
+        self._last_build: Optional[datetime] = None
+        self._last_build_seconds: Optional[float] = None
+        self._last_build_modules = 0
+
+    # ========================================
+    # Lookups
+    # ========================================
+
+    @property
+    def loaded(self) -> bool:
+        return self._conn is not None
+
+    def covers(self, version: str) -> bool:
+        """Whether the loaded index documents the requested Ansible version"""
+        return self.loaded and ansible_version_matches(self.ansible_version, version)
+
+    def get_collections(self) -> Dict[str, List[str]]:
+        """{namespace: [collections]}"""
+        return self._collections
+
+    def get_namespace_collections(self, namespace: str) -> Optional[List[str]]:
+        """Collections of a namespace, None if the namespace is not installed"""
+        return self._collections.get(namespace)
+
+    def get_collection_modules(self, namespace: str, collection: str) -> Optional[List[Dict[str, str]]]:
+        """Modules of a collection, None if not installed or only partly indexed"""
+        if (namespace, collection) in self._incomplete:
+            return None
+        return self._modules.get((namespace, collection))
+
+    def get_module_schema(self, namespace: str, collection: str, module: str) -> Optional[Dict[str, Any]]:
+        """Schema of a module, None if the module is not installed"""
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT schema FROM modules WHERE fqcn = ?", (f"{namespace}.{collection}.{module}",)
+        ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    # ========================================
+    # Load
+    # ========================================
+
+    async def load(self) -> bool:
+        """
+        Load the index if it matches the installed Ansible release.
+
+        Returns:
+            True if the index was loaded
+        """
+        installed = installed_ansible_version()
+        if not installed or not os.path.exists(self.path):
+            return False
+        try:
+            conn, collections, modules, incomplete, failed, search_index = await asyncio.to_thread(
+                self._read_index, installed
+            )
+        except (sqlite3.Error, ValueError) as e:
+            logger.info(f"Local catalog index {self.path} not usable: {e}")
+            return False
+
+        self.close()
+        self._conn = conn
+        self._collections = collections
+        self._modules = modules
+        self._incomplete = incomplete
+        self._failed_modules = failed
+        self.ansible_version = installed
+        module_search.replace_version(installed, search_index)
+        logger.info(
+            f"Local catalog loaded: Ansible {installed}, {len(modules)} collections"
+            + (f", {failed} modules not indexed" if failed else "")
+        )
+        return True
+
+    def _read_index(self, installed: str):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+            meta = dict(conn.execute("SELECT name, value FROM meta"))
+            if meta.get("format_version") != LOCAL_CATALOG_FORMAT_VERSION:
+                raise ValueError(f"unsupported index format {meta.get('format_version')}")
+            if meta.get("ansible_version") != installed:
+                raise ValueError(f"built for Ansible {meta.get('ansible_version')}, {installed} is installed")
+
+            collections: Dict[str, List[str]] = {}
+            modules: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+            search_index = VersionIndex()
+            cursor = conn.execute(
+                "SELECT namespace, collection, module, description, parameters FROM modules "
+                "ORDER BY namespace, collection, module"
+            )
+            for namespace, collection, module, description, parameters in cursor:
+                search_index.add(namespace, collection, module, description or "", parameters.split())
+                if (namespace, collection) not in modules:
+                    collections.setdefault(namespace, []).append(collection)
+                    modules[(namespace, collection)] = []
+                modules[(namespace, collection)].append({
+                    "name": module,
+                    "description": description or f"{module} module",
+                    "href": f"{module}_module.html"
+                })
+
+            incomplete: Set[Tuple[str, str]] = set()
+            failed = 0
+            for namespace, collection in conn.execute("SELECT namespace, collection FROM failed"):
+                failed += 1
+                if (namespace, collection) not in incomplete:
+                    incomplete.add((namespace, collection))
+                    if collection not in collections.get(namespace, []):
+                        collections.setdefault(namespace, []).append(collection)
+            for names in collections.values():
+                names.sort()
+            return conn, collections, modules, incomplete, failed, search_index
+        except Exception:
+            conn.close()
+            raise
+
+    # ========================================
+    # Build
+    # ========================================
+
+    async def build(self) -> int:
+        """
+        Build the index from the installed collections and load it.
+
+        Returns:
+            Number of modules indexed
+        """
+        installed = installed_ansible_version()
+        if not installed:
+            raise RuntimeError("The ansible package is not installed")
+
+        started = time.monotonic()
+        output = await run_ansible_doc("--list", "--json", "-t", "module", timeout=LIST_TIMEOUT_SECONDS)
+        if output is None:
+            raise RuntimeError("ansible-doc --list failed")
+        descriptions: Dict[str, str] = json.loads(output)
+        fqcns = sorted(descriptions)
+        batches = [fqcns[i:i + self.batch_size] for i in range(0, len(fqcns), self.batch_size)]
+        logger.info(f"Building local catalog for Ansible {installed}: {len(fqcns)} modules, {len(batches)} batches")
+
+        semaphore = asyncio.Semaphore(self.build_concurrency)
+
+        failed: List[str] = []
+
+        async def index_batch(batch: List[str]) -> List[IndexRow]:
+            async with semaphore:
+                batch_output = await run_ansible_doc(
+                    "--json", "-t", "module", *batch, timeout=settings.ANSIBLE_DOC_TIMEOUT_SECONDS
+                )
+            if batch_output is None:
+                logger.warning(f"Local catalog: failed to index {len(batch)} modules from {batch[0]}")
+                failed.extend(batch)
+                return []
+            batch_descriptions = {fqcn: descriptions[fqcn] for fqcn in batch}
+            return await parser_pool.run(index_rows_from_ansible_doc, batch_output, batch_descriptions)
+
+        results = await asyncio.gather(*(index_batch(batch) for batch in batches))
+        rows = [row for batch_rows in results for row in batch_rows]
+        await asyncio.to_thread(self._write_index, rows, installed, failed)
+
+        self._last_build = datetime.utcnow()
+        self._last_build_seconds = round(time.monotonic() - started, 1)
+        self._last_build_modules = len(rows)
+        logger.info(f"Local catalog built: {len(rows)} modules in {self._last_build_seconds}s -> {self.path}")
+        await self.load()
+        return len(rows)
+
+    def _write_index(self, rows: List[IndexRow], ansible_version: str, failed: List[str] = ()) -> None:
+        """Write the index into a new SQLite file and swap it in atomically"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE modules ("
+                "fqcn TEXT PRIMARY KEY, namespace TEXT NOT NULL, collection TEXT NOT NULL, "
+                "module TEXT NOT NULL, description TEXT, parameters TEXT NOT NULL, schema BLOB NOT NULL)"
+            )
+            conn.execute("CREATE TABLE failed (fqcn TEXT PRIMARY KEY, namespace TEXT NOT NULL, collection TEXT NOT NULL)")
+            conn.executemany(
+                "INSERT INTO meta (name, value) VALUES (?, ?)",
+                [
+                    ("format_version", LOCAL_CATALOG_FORMAT_VERSION),
+                    ("ansible_version", ansible_version),
+                    ("created_at", str(time.time()))
+                ]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO modules (fqcn, namespace, collection, module, description, parameters, schema) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO failed (fqcn, namespace, collection) VALUES (?, ?, ?)",
+                [(fqcn, *fqcn.split(".")[:2]) for fqcn in failed if fqcn.count(".") == 2]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, self.path)
+
+    # ========================================
+    # Lifecycle
+    # ========================================
+
+    async def start(self):
+        """Load the index, or build it in the background"""
+        if installed_ansible_version() is None:
+            logger.info("Local catalog disabled: the ansible package is not installed")
+            return
+        if await self.load() and not self._failed_modules:
+            return
+        if self._build_task and not self._build_task.done():
+            return
+        self._build_task = asyncio.create_task(self._build_in_background())
+
+    async def _build_in_background(self):
+        try:
+            await self.build()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Local catalog build failed: {e}")
+
+    async def stop(self):
+        """Cancel a build in progress and close the index"""
+        if self._build_task:
+            self._build_task.cancel()
+            try:
+                await self._build_task
+            except asyncio.CancelledError:
+                pass
+            self._build_task = None
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._incomplete = set()
+        self._failed_modules = 0
+
+    def get_status(self) -> dict:
+        """Get local catalog status"""
+        return {
+            "path": self.path,
+            "loaded": self.loaded,
+            "ansible_version": self.ansible_version,
+            "namespaces": len(self._collections),
+            "collections": len(self._modules),
+            "failed_modules": self._failed_modules,
+            "building": bool(self._build_task and not self._build_task.done()),
+            "last_build": self._last_build.isoformat() if self._last_build else None,
+            "last_build_seconds": self._last_build_seconds,
+            "last_build_modules": self._last_build_modules
+        }
+
+
+# Global instance
+local_catalog = LocalCatalog(
+    path=settings.LOCAL_CATALOG_PATH,
+    build_concurrency=settings.LOCAL_CATALOG_BUILD_CONCURRENCY,
+    batch_size=settings.LOCAL_CATALOG_BATCH_SIZE
+)
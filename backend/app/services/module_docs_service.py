@@ -0,0 +1,329 @@
+"""
+Module Docs Service - Module schemas from Ansible's documentation metadata
+
+Module schemas are built from the plugin documentation itself (the
+DOCUMENTATION / EXAMPLES / RETURN blocks, as structured data) instead of
+the rendered HTML page. Types, required flags, defaults, choices and
+aliases are then exact, and no HTML has to be parsed.
+
+Sources (tried in the order of settings.MODULE_SCHEMA_SOURCES, the HTML
+documentation page remains the fallback):
+- ansible-doc: `ansible-doc --json` against the locally installed
+  collections, used when the installed Ansible release is the requested
+  documentation version
+- docs-blob: Galaxy v3 docs-blob of the collection version shipped in the
+  requested Ansible release; one download holds the documentation of every
+  plugin of the collection, so it is cached per collection version
+
+Docs-blobs are also the source of collection roles (galaxy_roles_service):
+the cached entry of a collection version keeps its module schemas and its
+role entries, so one download serves both.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import shutil
+from importlib import metadata
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from app.core.cache_config import CacheTTL
+from app.core.config import settings
+from app.core.http_service import BaseHTTPService, UpstreamHTTPError
+from app.services.cache_service import cache, single_flight, NegativeEntry, NOT_CACHED
+from app.services.docs_parser import parser_pool
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_SOURCES = ("ansible-doc", "docs-blob")
+
+# Ansible option types -> type names used by the HTML schemas
+OPTION_TYPES = {
+    "str": "string",
+    "bool": "boolean",
+    "int": "integer",
+    "dict": "dict",
+    "list": "list",
+    "float": "float",
+    "path": "path",
+    "raw": "raw",
+}
+
+# Ansible documentation markup: L(text,url), C(code), I(italic), O(option)...
+_LINK_MARKUP = re.compile(r"\bL\(([^,)]+),[^)]*\)")
+_INLINE_MARKUP = re.compile(r"\b(?:RV|[BCEIMOPUV])\(([^)]*)\)")
+
+
+def _plain_text(value: Any) -> str:
+    """Documentation text (string or list of paragraphs) without markup"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = " ".join(str(v) for v in value)
+    return _INLINE_MARKUP.sub(r"\1", _LINK_MARKUP.sub(r"\1", str(value))).strip()
+
+
+def _option_type(name: Optional[str]) -> str:
+    return OPTION_TYPES.get(name or "str", name)
+
+
+def _parameters(options: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    parameters = []
+    for name, option in (options or {}).items():
+        option = option or {}
+        parameter = {
+            "name": name,
+            "type": _option_type(option.get("type")),
+            "required": bool(option.get("required", False)),
+            "description": _plain_text(option.get("description")),
+            "default": option.get("default"),
+            "aliases": option.get("aliases") or None,
+            "choices": option.get("choices") or None,
+        }
+        if option.get("elements"):
+            parameter["elements"] = _option_type(option["elements"])
+        if option.get("suboptions"):
+            parameter["suboptions"] = _parameters(option["suboptions"])
+        parameters.append(parameter)
+    return parameters
+
+
+def _return_values(returns: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": name,
+            "type": _option_type((value or {}).get("type")),
+            "description": _plain_text((value or {}).get("description")),
+            "returned": (value or {}).get("returned"),
+        }
+        for name, value in (returns or {}).items()
+    ]
+
+
+def schema_from_plugin_docs(module_name: str, plugin_docs: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """
+    Build a module schema from plugin documentation.
+
+    Args:
+        module_name: Short module name
+        plugin_docs: {"doc": {...}, "examples": str, "return": {...}}, as
+            returned by ansible-doc --json and in the docs-blob doc_strings
+        source: Name of the schema source
+
+    Returns:
+        Schema in the format of the HTML parser, plus "source"
+    """
+    doc = plugin_docs.get("doc") or {}
+    examples = (plugin_docs.get("examples") or "").strip()
+    return {
+        "module": module_name,
+        "description": _plain_text(doc.get("description")) or _plain_text(doc.get("short_description")),
+        "parameters": _parameters(doc.get("options")),
+        "examples": [examples] if examples else [],
+        "return_values": _return_values(plugin_docs.get("return")),
+        "source": source,
+    }
+
+
+def schemas_from_docs_blob(text: str) -> Dict[str, Dict[str, Any]]:
+    """Module schemas of a Galaxy docs-blob response, by module name"""
+    return _module_schemas(json.loads(text))
+
+
+def docs_from_docs_blob(text: str) -> Dict[str, Any]:
+    """
+    What is kept of a Galaxy docs-blob response: module schemas by module
+    name, and the role entries (docs-blob layout, without their doc_strings)
+    """
+    blob = json.loads(text)
+    role_contents = [
+        {key: content.get(key) for key in ("content_name", "content_type", "description", "doc_url")}
+        for content in blob.get("contents") or []
+        if content.get("content_type") == "role"
+    ]
+    collection_roles = (blob.get("collection_info") or {}).get("roles") or []
+    return {
+        "modules": _module_schemas(blob),
+        "role_docs": {"contents": role_contents, "collection_info": {"roles": collection_roles}},
+    }
+
+
+def _module_schemas(blob: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    schemas = {}
+    for content in blob.get("contents") or []:
+        if content.get("content_type") != "module":
+            continue
+        name = content.get("content_name")
+        doc_strings = content.get("doc_strings")
+        if name and doc_strings:
+            schemas[name] = schema_from_plugin_docs(name, doc_strings, "docs-blob")
+    return schemas
+
+
+def installed_ansible_version() -> Optional[str]:
+    """Version of the installed ansible package (collections bundle), if any"""
+    try:
+        return metadata.version("ansible")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def ansible_version_matches(installed: Optional[str], version: str) -> bool:
+    """Whether an installed Ansible release (10.5.0) is a documentation version (10)"""
+    if not installed:
+        return False
+    return installed == version or installed.startswith(f"{version}.")
+
+
+async def run_ansible_doc(*args: str, timeout: float) -> Optional[bytes]:
+    """
+    Run ansible-doc with the given arguments.
+
+    Returns:
+        Standard output, or None if ansible-doc failed or timed out
+    """
+    process = await asyncio.create_subprocess_exec(
+        settings.ANSIBLE_DOC_COMMAND, *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.warning(f"ansible-doc {' '.join(args[:4])} timed out after {timeout}s")
+        return None
+
+    if process.returncode != 0:
+        logger.debug(f"ansible-doc {' '.join(args[:4])} failed: {stderr.decode(errors='replace').strip()}")
+        return None
+    return stdout
+
+
+class ModuleDocsService(BaseHTTPService):
+    """Structured module documentation from ansible-doc and Galaxy docs-blobs"""
+
+    CACHE_TTL_DOCS_BLOB = CacheTTL.COLLECTION_VERSION_CONTENTS
+
+    def __init__(self):
+        super().__init__(timeout=120)  # docs-blobs of large collections weigh several MB
+        self.ansible_version = installed_ansible_version()
+
+    def ansible_doc_available(self, version: str) -> bool:
+        """Whether the local ansible-doc documents the requested Ansible version"""
+        if shutil.which(settings.ANSIBLE_DOC_COMMAND) is None:
+            return False
+        return ansible_version_matches(self.ansible_version, version)
+
+    async def get_ansible_doc_schema(
+        self, version: str, namespace: str, collection: str, module: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Module schema from `ansible-doc --json`.
+
+        Returns:
+            Schema, or None if ansible-doc does not cover this version or module
+        """
+        if not self.ansible_doc_available(version):
+            return None
+
+        fqcn = f"{namespace}.{collection}.{module}"
+        stdout = await run_ansible_doc("--json", "-t", "module", fqcn, timeout=settings.ANSIBLE_DOC_TIMEOUT_SECONDS)
+        if stdout is None:
+            return None
+        plugin_docs = json.loads(stdout or b"{}").get(fqcn)
+        if not plugin_docs or not plugin_docs.get("doc"):
+            return None
+        return schema_from_plugin_docs(module, plugin_docs, "ansible-doc")
+
+    async def get_docs_blob_schema(
+        self, namespace: str, collection: str, collection_version: str, module: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Module schema from the Galaxy docs-blob of a collection version.
+
+        Returns:
+            Schema, or None if the docs-blob is unavailable or lacks the module
+        """
+        schemas = await self.get_docs_blob_schemas(namespace, collection, collection_version)
+        return schemas.get(module) if schemas else None
+
+    async def get_docs_blob_schemas(
+        self, namespace: str, collection: str, collection_version: str
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Module schemas of a collection version, by module name (None if unavailable)"""
+        if not settings.GALAXY_PUBLIC_ENABLED:
+            return None
+        docs = await self.get_docs_blob(namespace, collection, collection_version)
+        return docs["modules"] if docs is not None else None
+
+    async def get_docs_blob(
+        self,
+        namespace: str,
+        collection: str,
+        collection_version: str,
+        base_url: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached docs-blob of a collection version (see docs_from_docs_blob()).
+
+        Args:
+            base_url: Galaxy server (public Galaxy by default)
+            headers: Request headers (authentication of a private Galaxy)
+
+        Returns:
+            {"modules": ..., "role_docs": ...}, or None if unavailable
+        """
+        base_url = (base_url or settings.GALAXY_PUBLIC_URL).rstrip("/")
+        host = urlsplit(base_url).netloc
+        cache_key = f"galaxy_docs_blob:{host}:{namespace}:{collection}:{collection_version}"
+        cached = await cache.lookup_async(cache_key)
+        if isinstance(cached, NegativeEntry):
+            return None
+        if cached is not NOT_CACHED:
+            return cached
+
+        try:
+            return await single_flight.do(
+                cache_key,
+                lambda: self._fetch_docs_blob(base_url, headers, namespace, collection, collection_version, cache_key)
+            )
+        except UpstreamHTTPError as e:
+            logger.warning(f"Docs-blob not available for {namespace}.{collection} {collection_version}: {str(e)}")
+            cache.set_negative(cache_key, e.status, str(e), e.url)
+            return None
+
+    async def _fetch_docs_blob(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]],
+        namespace: str,
+        collection: str,
+        collection_version: str,
+        cache_key: str
+    ) -> Dict[str, Any]:
+        """Download a docs-blob and cache what is kept of it"""
+        url = (
+            f"{base_url}/api/v3/plugin/ansible/content/published/collections/index/"
+            f"{namespace}/{collection}/versions/{collection_version}/docs-blob/"
+        )
+        logger.info(f"Fetching docs-blob of {namespace}.{collection} {collection_version}")
+
+        status, text, _ = await self.fetch(url, headers=headers)
+        if status != 200:
+            raise UpstreamHTTPError(status, url)
+
+        # Decoding and normalizing a multi-MB blob stays off the event loop
+        docs = await parser_pool.run(docs_from_docs_blob, text)
+        cache.set(cache_key, docs, self.CACHE_TTL_DOCS_BLOB)
+        logger.info(f"Docs-blob of {namespace}.{collection} {collection_version}: {len(docs['modules'])} modules")
+        return docs
+
+
+# Global instance
+module_docs_service = ModuleDocsService()
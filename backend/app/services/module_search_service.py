@@ -0,0 +1,304 @@
+"""
+Module Search Service - In-memory full-text index of Ansible modules
+
+Module names, descriptions and parameter names are indexed per Ansible
+version as they are fetched (get_collection_modules and get_module_schema
+results, local catalog index), so the catalog can be searched without
+drilling namespace -> collection -> modules.
+
+Index structure:
+- postings: token -> {document id: field weight}
+  (module name > namespace/collection > parameters > description)
+- sorted vocabulary for prefix queries (bisect)
+- single-deletion neighbourhood of every token for fuzzy queries (edit
+  distance 1, SymSpell style): "instnce" and "instance" share "instnce"
+
+A query matches documents containing every query term, exactly, as a
+prefix or, for terms of FUZZY_MIN_LENGTH characters or more, fuzzily.
+
+The indexed documents can be persisted to a gzipped JSON file and
+reloaded at startup (tokens are rebuilt on load).
+"""
+
+import asyncio
+import bisect
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_FORMAT_VERSION = "1"
+
+# Field weights of a token in a document
+NAME_WEIGHT = 3.0
+COLLECTION_WEIGHT = 2.0  # namespace and collection names
+PARAMETER_WEIGHT = 1.5
+DESCRIPTION_WEIGHT = 1.0
+
+# Match quality factors
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.6
+FUZZY_MATCH = 0.4
+FUZZY_MIN_LENGTH = 4
+
+MAX_RESULTS = 100
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "if", "in", "is", "it",
+    "of", "on", "or", "the", "this", "to", "when", "with"
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of a text, without stop words"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def name_tokens(name: str) -> List[str]:
+    """Tokens of an identifier: the whole name and its parts (ec2_instance -> ec2, instance)"""
+    name = name.lower()
+    return [name] + _TOKEN_RE.findall(name)
+
+
+def _deletes(token: str) -> Set[str]:
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class VersionIndex:
+    """Inverted index of the modules of one Ansible version"""
+
+    def __init__(self):
+        # Document fields: (namespace, collection, name, description, parameter names)
+        self.documents: List[Tuple[str, str, str, str, List[str]]] = []
+        self._doc_ids: Dict[str, int] = {}
+        self._doc_tokens: List[Set[str]] = []
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._vocabulary: List[str] = []  # sorted
+        self._fuzzy: Dict[str, Set[str]] = {}  # deletion variant -> tokens
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(
+        self,
+        namespace: str,
+        collection: str,
+        name: str,
+        description: Optional[str] = None,
+        parameters: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Index a module, or update it (fields given as None are kept).
+        """
+        fqcn = f"{namespace}.{collection}.{name}"
+        doc_id = self._doc_ids.get(fqcn)
+        if doc_id is None:
+            doc_id = len(self.documents)
+            self._doc_ids[fqcn] = doc_id
+            self.documents.append((namespace, collection, name, description or "", list(parameters or [])))
+            self._doc_tokens.append(set())
+        else:
+            _, _, _, old_description, old_parameters = self.documents[doc_id]
+            if description is None:
+                description = old_description
+            parameters = old_parameters if parameters is None else list(parameters)
+            if (description, parameters) == (old_description, old_parameters):
+                return
+            self.documents[doc_id] = (namespace, collection, name, description, parameters)
+            for token in self._doc_tokens[doc_id]:
+                self._postings[token].pop(doc_id, None)
+            self._doc_tokens[doc_id] = set()
+
+        _, _, _, description, parameters = self.documents[doc_id]
+        weights: Dict[str, float] = {}
+        for token in tokenize(description):
+            weights[token] = max(weights.get(token, 0), DESCRIPTION_WEIGHT)
+        for parameter in parameters:
+            for token in name_tokens(parameter):
+                weights[token] = max(weights.get(token, 0), PARAMETER_WEIGHT)
+        for token in name_tokens(collection) + name_tokens(namespace):
+            weights[token] = max(weights.get(token, 0), COLLECTION_WEIGHT)
+        for token in name_tokens(name):
+            weights[token] = NAME_WEIGHT
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+                if len(token) >= FUZZY_MIN_LENGTH:
+                    for variant in _deletes(token) | {token}:
+                        self._fuzzy.setdefault(variant, set()).add(token)
+            postings[doc_id] = weight
+        self._doc_tokens[doc_id] = set(weights)
+
+    def _expand(self, term: str, fuzzy: bool) -> Dict[str, float]:
+        """Index tokens matching a query term, with their match factor"""
+        matches: Dict[str, float] = {}
+        vocabulary = self._vocabulary
+        position = bisect.bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            token = vocabulary[position]
+            matches[token] = EXACT_MATCH if token == term else PREFIX_MATCH
+            position += 1
+        if fuzzy and len(term) >= FUZZY_MIN_LENGTH:
+            for variant in _deletes(term) | {term}:
+                for token in self._fuzzy.get(variant, ()):
+                    matches.setdefault(token, FUZZY_MATCH)
+        return matches
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """Modules matching every term of the query, best first"""
+        terms = list(dict.fromkeys(_TOKEN_RE.findall(query.lower())))
+        terms = [t for t in terms if t not in STOP_WORDS] or terms
+        if not terms:
+            return []
+
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            term_scores: Dict[int, float] = {}
+            for token, factor in self._expand(term, fuzzy).items():
+                for doc_id, weight in self._postings[token].items():
+                    score = weight * factor
+                    if score > term_scores.get(doc_id, 0):
+                        term_scores[doc_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.documents[item[0]][2]))
+        results = []
+        for doc_id, score in ranked[:limit]:
+            namespace, collection, name, description, _ = self.documents[doc_id]
+            results.append({
+                "fqcn": f"{namespace}.{collection}.{name}",
+                "namespace": namespace,
+                "collection": collection,
+                "name": name,
+                "description": description,
+                "score": round(score, 3)
+            })
+        return results
+
+
+class ModuleSearchService:
+    """
+    Full-text module search across collections, per Ansible version.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._indexes: Dict[str, VersionIndex] = {}
+
+    def _index(self, version: str) -> VersionIndex:
+        index = self._indexes.get(version)
+        if index is None:
+            index = self._indexes[version] = VersionIndex()
+        return index
+
+    def index_modules(self, version: str, namespace: str, collection: str, modules: List[Dict[str, Any]]) -> None:
+        """Index a collection module list (get_collection_modules format)"""
+        index = self._index(version)
+        for module in modules:
+            index.add(namespace, collection, module["name"], module.get("description"))
+
+    def index_schema(self, version: str, namespace: str, collection: str, module: str, schema: Dict[str, Any]) -> None:
+        """Index the parameter names of a module schema"""
+        parameters = [p["name"] for p in schema.get("parameters", []) if p.get("name")]
+        self._index(version).add(namespace, collection, module, parameters=parameters)
+
+    def replace_version(self, version: str, index: VersionIndex) -> None:
+        """Swap in an index built elsewhere (e.g. from the local catalog)"""
+        self._indexes[version] = index
+
+    def search(self, version: str, query: str, limit: int = 20, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """Search the modules of a version (see VersionIndex.search)"""
+        index = self._indexes.get(version)
+        if index is None:
+            return []
+        return index.search(query, max(1, min(limit, MAX_RESULTS)), fuzzy)
+
+    def indexed_modules(self, version: str) -> int:
+        index = self._indexes.get(version)
+        return len(index) if index is not None else 0
+
+    # ========================================
+    # Persistence
+    # ========================================
+
+    async def save(self) -> int:
+        """
+        Write the indexed documents to disk.
+
+        Returns:
+            Number of documents written
+        """
+        # Copy the documents on the event loop (no concurrent mutation)
+        documents = {version: list(index.documents) for version, index in self._indexes.items()}
+        count = await asyncio.to_thread(self._write, documents)
+        logger.info(f"Module search index saved: {count} modules -> {self.path}")
+        return count
+
+    def _write(self, documents: Dict[str, list]) -> int:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        payload = {"format_version": SEARCH_INDEX_FORMAT_VERSION, "created_at": time.time(), "versions": documents}
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        return sum(len(docs) for docs in documents.values())
+
+    async def load(self) -> int:
+        """
+        Load the documents saved on disk into the index.
+
+        Returns:
+            Number of documents loaded
+        """
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            documents = await asyncio.to_thread(self._read)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable module search index {self.path}: {e}")
+            return 0
+
+        count = 0
+        for version, docs in documents.items():
+            index = self._index(version)
+            for namespace, collection, name, description, parameters in docs:
+                index.add(namespace, collection, name, description, parameters)
+                count += 1
+        logger.info(f"Module search index loaded: {count} modules from {self.path}")
+        return count
+
+    def _read(self) -> Dict[str, list]:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("format_version") != SEARCH_INDEX_FORMAT_VERSION:
+            raise ValueError(f"unsupported index format {payload.get('format_version')}")
+        return payload.get("versions", {})
+
+    def get_status(self) -> dict:
+        return {
+            "path": self.path,
+            "versions": {version: len(index) for version, index in self._indexes.items()}
+        }
+
+
+# Global instance
+module_search = ModuleSearchService(settings.SEARCH_INDEX_PATH)
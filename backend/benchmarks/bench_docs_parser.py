@@ -0,0 +1,85 @@
+"""
+Benchmark documentation parsing backends
+
+Parses the fixture pages of tests/fixtures/docs_pages with each available
+BeautifulSoup backend, reports the median parse time per page and checks
+that every backend produces the same output as html.parser.
+
+Usage (from backend/):
+    python -m benchmarks.bench_docs_parser [--repeat 20]
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.services.ansible_collections_service import AnsibleCollectionsService
+from app.services.docs_parser import LXML_AVAILABLE, PARSER_BACKENDS, get_parser_backend, set_parser_backend
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "docs_pages"
+
+# Fixture page -> (parse method, extra arguments)
+PAGES = {
+    "collections_index.html": ("_parse_collections_from_html", ()),
+    "namespace_community.html": ("_parse_namespace_collections_from_html", ()),
+    "collection_amazon_aws.html": ("_parse_modules_from_collection_html", ()),
+    "module_community_general_ufw.html": ("_parse_module_schema_from_html", ("ufw",)),
+    "module_amazon_aws_ec2_instance.html": ("_parse_module_schema_from_html", ("ec2_instance",)),
+}
+
+
+def run(repeat: int) -> int:
+    service = AnsibleCollectionsService()
+    backends = [b for b in PARSER_BACKENDS if b != "lxml" or LXML_AVAILABLE]
+    pages = {name: (FIXTURES_DIR / name).read_text(encoding="utf-8") for name in PAGES}
+    original_backend = get_parser_backend()
+
+    timings = {}
+    outputs = {}
+    try:
+        for backend in backends:
+            set_parser_backend(backend)
+            for name, html in pages.items():
+                method_name, args = PAGES[name]
+                parse = getattr(service, method_name)
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = parse(html, *args)
+                    samples.append(time.perf_counter() - start)
+                timings[(backend, name)] = statistics.median(samples) * 1000
+                outputs[(backend, name)] = result
+    finally:
+        set_parser_backend(original_backend)
+
+    reference = "html.parser"
+    header = f"{'page':<40} {'size':>8}" + "".join(f" {b + ' ms':>15}" for b in backends) + "  output"
+    print(header)
+    print("-" * len(header))
+    all_equal = True
+    for name, html in pages.items():
+        equal = all(outputs[(b, name)] == outputs[(reference, name)] for b in backends)
+        all_equal = all_equal and equal
+        row = f"{name:<40} {len(html) // 1024:>6}KB"
+        row += "".join(f" {timings[(b, name)]:>15.2f}" for b in backends)
+        row += "  identical" if equal else "  DIFFERENT"
+        print(row)
+
+    if not LXML_AVAILABLE:
+        print("\nlxml is not installed: only html.parser was measured")
+    return 0 if all_equal else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="parses per page and backend (default: 20)")
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    sys.exit(run(options.repeat))
+
+
+if __name__ == "__main__":
+    main()
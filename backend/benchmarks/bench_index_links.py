@@ -0,0 +1,105 @@
+"""
+Benchmark index link extraction
+
+Compares the tree-based extraction previously used for the collections
+index and namespace pages (BeautifulSoup find_all with a regex on href)
+with the streaming extractors of app.services.docs_parser on the fixture
+pages, reports the median time per page and checks that every extractor
+returns the same names.
+
+Usage (from backend/):
+    python -m benchmarks.bench_index_links [--repeat 50]
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from app.services.docs_parser import LXML_AVAILABLE, extract_index_links, get_parser_backend, set_parser_backend
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "docs_pages"
+
+PAGES = ("collections_index.html", "namespace_community.html")
+
+INDEX_LINK_RE = re.compile(r'^([a-z][a-z0-9_]+)/index\.html$', re.IGNORECASE)
+
+
+def soup_regex_links(html: str, backend: str) -> List[str]:
+    """Reference: tree + regex extraction as done before streaming extraction"""
+    names: List[str] = []
+    soup = BeautifulSoup(html, backend)
+    for link in soup.find_all('a', href=INDEX_LINK_RE):
+        match = INDEX_LINK_RE.match(link.get('href', ''))
+        if match:
+            name = match.group(1)
+            if name not in names and name not in ['index', 'genindex', 'search']:
+                names.append(name)
+    return names
+
+
+def streaming_links(backend: str) -> Callable[[str], List[str]]:
+    def extract(html: str) -> List[str]:
+        set_parser_backend(backend)
+        return extract_index_links(html)
+    return extract
+
+
+def run(repeat: int) -> int:
+    backends = ["lxml", "html.parser"] if LXML_AVAILABLE else ["html.parser"]
+    extractors: Dict[str, Callable[[str], List[str]]] = {}
+    for backend in backends:
+        extractors[f"soup+re/{backend}"] = lambda html, b=backend: soup_regex_links(html, b)
+    for backend in backends:
+        extractors[f"stream/{backend}"] = streaming_links(backend)
+
+    pages = {name: (FIXTURES_DIR / name).read_text(encoding="utf-8") for name in PAGES}
+    original_backend = get_parser_backend()
+
+    timings = {}
+    outputs = {}
+    try:
+        for label, extract in extractors.items():
+            for name, html in pages.items():
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = extract(html)
+                    samples.append(time.perf_counter() - start)
+                timings[(label, name)] = statistics.median(samples) * 1000
+                outputs[(label, name)] = result
+    finally:
+        set_parser_backend(original_backend)
+
+    reference = "soup+re/html.parser"
+    header = f"{'page':<30} {'links':>6}" + "".join(f" {label + ' ms':>22}" for label in extractors) + "  output"
+    print(header)
+    print("-" * len(header))
+    all_equal = True
+    for name in pages:
+        equal = all(outputs[(label, name)] == outputs[(reference, name)] for label in extractors)
+        all_equal = all_equal and equal
+        row = f"{name:<30} {len(outputs[(reference, name)]):>6}"
+        row += "".join(f" {timings[(label, name)]:>22.2f}" for label in extractors)
+        row += "  identical" if equal else "  DIFFERENT"
+        print(row)
+
+    if not LXML_AVAILABLE:
+        print("\nlxml is not installed: only html.parser was measured")
+    return 0 if all_equal else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="extractions per page and extractor (default: 50)")
+    options = parser.parse_args()
+    sys.exit(run(options.repeat))
+
+
+if __name__ == "__main__":
+    main()
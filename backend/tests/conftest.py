@@ -0,0 +1,15 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+
+from app.core.http_resilience import circuit_breakers
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Start every test with all upstream circuits closed"""
+    circuit_breakers.reset()
+    yield
+    circuit_breakers.reset()
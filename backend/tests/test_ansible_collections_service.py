@@ -6,6 +6,12 @@ import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from app.services.ansible_collections_service import AnsibleCollectionsService
 
+@pytest.fixture(autouse=True)
+def html_schema_source(monkeypatch):
+    """Schemas come from the HTML pages only (no ansible-doc / docs-blob lookups)"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "MODULE_SCHEMA_SOURCES", "")
+
 @pytest.fixture
 def ansible_collections_service():
     """Create a fresh AnsibleCollectionsService instance for each test"""
@@ -266,4 +272,188 @@ class TestAnsibleCollectionsService:
             with pytest.raises(Exception) as exc_info:
                 await ansible_collections_service.get_module_schema("latest", "invalid", "collection", "module")
                 
-        assert "Module documentation not available" in str(exc_info.value)
\ No newline at end of file
+        assert "Module documentation not available" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_get_module_schema_coalesces_concurrent_misses(self, ansible_collections_service, mock_module_detail_html):
+        """Test that concurrent misses for one schema trigger a single download"""
+        import asyncio
+        from app.services.cache_service import EnhancedCache
+
+        async def slow_text():
+            await asyncio.sleep(0.01)
+            return mock_module_detail_html
+
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.text = slow_text
+
+        mock_context = AsyncMock()
+        mock_context.__aenter__.return_value = mock_response
+        mock_context.__aexit__.return_value = None
+
+        mock_session = MagicMock()
+        mock_session.get.return_value = mock_context
+
+        with patch('app.services.ansible_collections_service.cache', EnhancedCache()):
+            with patch.object(ansible_collections_service, 'get_session', return_value=mock_session):
+                results = await asyncio.gather(*[
+                    ansible_collections_service.get_module_schema("latest", "community", "general", "copy")
+                    for _ in range(5)
+                ])
+
+        assert mock_session.get.call_count == 1
+        assert all(r["module"] == "copy" for r in results)
+
+    @pytest.mark.asyncio
+    async def test_failed_lookups_are_negatively_cached(self, ansible_collections_service):
+        """Test that repeated requests for a missing page do not hit upstream again"""
+        from app.services.cache_service import EnhancedCache
+
+        mock_response = MagicMock()
+        mock_response.status = 404
+
+        mock_context = AsyncMock()
+        mock_context.__aenter__.return_value = mock_response
+        mock_context.__aexit__.return_value = None
+
+        mock_session = MagicMock()
+        mock_session.get.return_value = mock_context
+
+        with patch('app.services.ansible_collections_service.cache', EnhancedCache()):
+            with patch.object(ansible_collections_service, 'get_session', return_value=mock_session):
+                for _ in range(3):
+                    with pytest.raises(Exception) as exc_info:
+                        await ansible_collections_service.get_module_schema("latest", "community", "general", "typo")
+                    assert "Module documentation not available" in str(exc_info.value)
+                    assert await ansible_collections_service.get_collection_modules("latest", "community", "typo") == []
+
+        assert mock_session.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_empty_result_is_returned(self, ansible_collections_service):
+        """Test that a cached empty module list is not treated as a miss"""
+        from app.services.cache_service import EnhancedCache
+
+        test_cache = EnhancedCache()
+        test_cache.set("ansible_modules:latest:community:empty", [])
+        mock_session = AsyncMock()
+
+        with patch('app.services.ansible_collections_service.cache', test_cache):
+            with patch.object(ansible_collections_service, 'get_session', return_value=mock_session):
+                assert await ansible_collections_service.get_collection_modules("latest", "community", "empty") == []
+
+        mock_session.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_force_refresh_uses_conditional_request(self, ansible_collections_service):
+        """Test that a forced refresh sends validators and skips parsing on 304"""
+        from app.services.cache_service import EnhancedCache
+
+        ok_response = MagicMock()
+        ok_response.status = 200
+        ok_response.headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Sep 2025 10:00:00 GMT"}
+        ok_response.text = AsyncMock(return_value="<html></html>")
+
+        not_modified_response = MagicMock()
+        not_modified_response.status = 304
+        not_modified_response.headers = {}
+
+        responses = [ok_response, not_modified_response]
+        sent_headers = []
+
+        def session_get(url, headers=None):
+            sent_headers.append(headers)
+            context = AsyncMock()
+            context.__aenter__.return_value = responses.pop(0)
+            context.__aexit__.return_value = None
+            return context
+
+        mock_session = MagicMock()
+        mock_session.get.side_effect = session_get
+
+        with patch('app.services.ansible_collections_service.cache', EnhancedCache()):
+            with patch.object(ansible_collections_service, 'get_session', return_value=mock_session):
+                with patch.object(ansible_collections_service, '_parse_collections_from_html') as mock_parse:
+                    mock_parse.return_value = {"community": ["general"]}
+                    first = await ansible_collections_service.get_collections("13")
+                    second = await ansible_collections_service.get_collections("13", force_refresh=True)
+
+        assert first == second == {"community": ["general"]}
+        mock_parse.assert_called_once()
+        assert sent_headers[0] == {}
+        assert sent_headers[1] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Sep 2025 10:00:00 GMT"
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_module_schemas_resolves_cached_and_fetches_misses(self, ansible_collections_service):
+        """Test that bulk schemas serve cached entries and fetch misses with bounded concurrency"""
+        import asyncio
+        from app.core.http_service import UpstreamHTTPError
+        from app.services.cache_service import EnhancedCache
+
+        test_cache = EnhancedCache()
+        test_cache.set("ansible_schema:13:ansible:builtin:copy", {"module": "copy"})
+        active = 0
+        max_active = 0
+        fetched = []
+
+        async def fetch_schema(version, namespace, collection, module, cache_key):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.001)
+            active -= 1
+            fetched.append(module)
+            if module == "missing":
+                raise UpstreamHTTPError(404, "https://docs.ansible.com/missing", "Module documentation not available (HTTP 404)")
+            return {"module": module}
+
+        fqcns = ["ansible.builtin.copy", "ansible.builtin.file", "ansible.builtin.copy", "not_a_fqcn",
+                 "community.general.missing"] + [f"community.general.mod{i}" for i in range(6)]
+
+        with patch('app.services.ansible_collections_service.cache', test_cache):
+            with patch.object(ansible_collections_service, '_fetch_module_schema', side_effect=fetch_schema):
+                schemas, errors = await ansible_collections_service.get_module_schemas("13", fqcns, concurrency=2)
+
+        assert schemas["ansible.builtin.copy"] == {"module": "copy"}
+        assert schemas["community.general.mod5"] == {"module": "mod5"}
+        assert len(schemas) == 8
+        assert set(errors) == {"not_a_fqcn", "community.general.missing"}
+        assert "copy" not in fetched
+        assert len(fetched) == 8
+        assert max_active <= 2
+
+    @pytest.mark.asyncio
+    async def test_diff_collection_between_versions(self, ansible_collections_service):
+        """Test that a collection diff reports added, removed and changed modules"""
+        from app.services.cache_service import EnhancedCache
+
+        test_cache = EnhancedCache(content_addressed=["ansible_schema", "ansible_modules"])
+        test_cache.set("ansible_modules:12:community:general", [{"name": "ufw"}, {"name": "iptables"}, {"name": "old"}])
+        test_cache.set("ansible_modules:13:community:general", [{"name": "ufw"}, {"name": "iptables"}, {"name": "new"}])
+        ufw = {"module": "ufw", "parameters": [{"name": "rule", "type": "string"}], "source": "docs-blob"}
+        test_cache.set("ansible_schema:12:community:general:ufw", ufw)
+        test_cache.set("ansible_schema:13:community:general:ufw", dict(ufw))
+        test_cache.set("ansible_schema:12:community:general:iptables", {
+            "module": "iptables", "parameters": [{"name": "chain", "type": "string"}, {"name": "jump"}]
+        })
+        test_cache.set("ansible_schema:13:community:general:iptables", {
+            "module": "iptables", "parameters": [{"name": "chain", "type": "raw"}, {"name": "match"}]
+        })
+
+        with patch('app.services.ansible_collections_service.cache', test_cache):
+            diff = await ansible_collections_service.diff_collection("12", "13", "community", "general")
+
+        assert diff["added"] == ["new"]
+        assert diff["removed"] == ["old"]
+        assert diff["unchanged"] == 1
+        assert diff["changed"] == [{
+            "module": "iptables",
+            "parameters_added": ["match"],
+            "parameters_removed": ["jump"],
+            "parameters_changed": ["chain"]
+        }]
+        assert diff["errors"] == {}
@@ -208,6 +208,71 @@ class TestAnsibleEndpoints:
             assert response.status_code == 404
             assert "not available" in response.json()["detail"]
             
+    def test_get_module_schemas_success(self):
+        """Test bulk module schema retrieval"""
+        schemas = {"ansible.builtin.copy": {"module": "copy"}}
+        errors = {"community.general.nope": "Module documentation not available (HTTP 404)"}
+
+        with patch('app.services.ansible_collections_service.ansible_collections_service.get_module_schemas') as mock_get:
+            mock_get.return_value = (schemas, errors)
+
+            response = client.post(
+                "/api/ansible/13/modules/schemas",
+                json={"modules": ["ansible.builtin.copy", "community.general.nope"]}
+            )
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["schemas"] == schemas
+            assert data["errors"] == errors
+            assert data["total_requested"] == 2
+            assert data["total_found"] == 1
+            mock_get.assert_called_once_with("13", ["ansible.builtin.copy", "community.general.nope"])
+
+    def test_get_module_schemas_empty_request(self):
+        """Test that an empty module list is rejected"""
+        response = client.post("/api/ansible/13/modules/schemas", json={"modules": []})
+
+        assert response.status_code == 422
+
+    def test_search_modules(self):
+        """Test module search across collections"""
+        from app.services.module_search_service import ModuleSearchService
+
+        search = ModuleSearchService("/nonexistent")
+        search.index_modules("13", "community", "general", [{"name": "ufw", "description": "Manage firewall with UFW"}])
+
+        with patch('app.services.ansible_collections_service.module_search', search):
+            response = client.get("/api/ansible/13/search?q=firewll")
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == 1
+            assert data["results"][0]["fqcn"] == "community.general.ufw"
+
+            response = client.get("/api/ansible/13/search?q=firewll&fuzzy=false")
+            assert response.json()["results"] == []
+
+    def test_diff_collection(self):
+        """Test collection comparison between two Ansible versions"""
+        mock_diff = {"added": ["new"], "removed": [], "changed": [], "unchanged": 3, "errors": {}}
+
+        with patch('app.services.ansible_collections_service.ansible_collections_service.diff_collection',
+                   new_callable=AsyncMock) as mock_diff_collection:
+            mock_diff_collection.return_value = mock_diff
+
+            response = client.get("/api/ansible/12/namespaces/community/collections/general/diff?against=13")
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["against"] == "13"
+            assert data["added"] == ["new"]
+            assert data["unchanged"] == 3
+            mock_diff_collection.assert_called_once_with("12", "13", "community", "general")
+
+        response = client.get("/api/ansible/12/namespaces/community/collections/general/diff")
+        assert response.status_code == 422
+
     def test_get_collections_stats_success(self):
         """Test successful collections stats retrieval"""
         mock_collections = {
@@ -262,4 +327,13 @@ class TestAnsibleEndpoints:
             assert data["status"] == "unhealthy"
             assert data["service"] == "ansible_documentation"
             assert "Service unavailable" in data["error"]
-            assert data["cache_status"] == "unknown"
\ No newline at end of file
+            assert data["cache_status"] == "unknown"
+
+    def test_cache_metrics_prometheus_format(self):
+        """Test the cache metrics endpoint"""
+        response = client.get("/api/ansible/cache/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE automation_factory_cache_fill_duration_seconds histogram" in response.text
+        assert "automation_factory_cache_entries " in response.text
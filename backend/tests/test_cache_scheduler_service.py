@@ -0,0 +1,110 @@
+"""
+Tests for the cache scheduler catalog crawler
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+
+from app.core.http_service import HostRateLimiter, request_rate_limiter
+from app.services.cache_scheduler_service import CacheSchedulerService
+
+
+class FakeCatalog:
+    """Stand-in for ansible_collections_service tracking concurrent calls"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.schemas = []
+        self.limiters = set()
+
+    async def _call(self):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.limiters.add(request_rate_limiter.get())
+        await asyncio.sleep(0.001)
+        self.active -= 1
+
+    async def get_collections(self, version):
+        await self._call()
+        return {"community": ["general", "crypto"], "ansible": ["posix"]}
+
+    async def get_namespace_collections(self, version, namespace):
+        await self._call()
+        return {"community": ["general", "crypto"], "ansible": ["posix"]}[namespace]
+
+    async def get_collection_modules(self, version, namespace, collection):
+        await self._call()
+        return [{"name": f"{collection}_{i}"} for i in range(3)]
+
+    async def get_module_schema(self, version, namespace, collection, module):
+        await self._call()
+        if module == "crypto_2":
+            raise Exception("Module documentation not available (HTTP 404)")
+        self.schemas.append((version, namespace, collection, module))
+        return {"module": module}
+
+
+class TestCatalogCrawler:
+
+    @pytest.mark.asyncio
+    async def test_crawl_walks_whole_catalog(self):
+        """Test that the crawl visits every level with bounded concurrency"""
+        scheduler = CacheSchedulerService()
+        catalog = FakeCatalog()
+        notifications = []
+        scheduler.register_notification_callback(notifications.append)
+
+        with patch('app.services.cache_scheduler_service.ansible_collections_service', catalog):
+            stats = await scheduler.crawl_catalog(["13"], concurrency=2, rate_per_host=0)
+
+        assert stats["versions"] == 1
+        assert stats["namespaces"] == 2
+        assert stats["collections"] == 3
+        assert stats["modules"] == 9
+        assert stats["schemas"] == 8
+        assert stats["errors"] == 1
+        assert catalog.max_active <= 2
+        assert ("13", "ansible", "posix", "posix_0") in catalog.schemas
+
+        # Crawl requests run with the crawl rate limiter, callers are not affected
+        assert None not in catalog.limiters
+        assert request_rate_limiter.get() is None
+
+        types = [n["type"] for n in notifications]
+        assert types[0] == "cache_crawl_started"
+        assert types[-1] == "cache_crawl_completed"
+
+    @pytest.mark.asyncio
+    async def test_crawl_without_schemas(self):
+        """Test that schemas can be excluded from the crawl"""
+        scheduler = CacheSchedulerService()
+        catalog = FakeCatalog()
+
+        with patch('app.services.cache_scheduler_service.ansible_collections_service', catalog):
+            stats = await scheduler.crawl_catalog(["13", "12"], include_schemas=False, rate_per_host=0)
+
+        assert stats["collections"] == 6
+        assert stats["schemas"] == 0
+        assert catalog.schemas == []
+
+
+class TestHostRateLimiter:
+
+    @pytest.mark.asyncio
+    async def test_requests_are_spaced_per_host(self):
+        """Test that requests to one host are spaced, other hosts are not delayed"""
+        limiter = HostRateLimiter(rate_per_second=50)
+
+        start = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire("https://docs.ansible.com/ansible/latest/index.html")
+        elapsed = time.monotonic() - start
+
+        other_start = time.monotonic()
+        await limiter.acquire("https://galaxy.ansible.com/api/")
+
+        assert elapsed >= 0.055  # 3 intervals of 20ms
+        assert time.monotonic() - other_start < 0.01
@@ -0,0 +1,826 @@
+"""
+Tests for EnhancedCache
+"""
+
+import time
+import pytest
+from app.services.cache_service import EnhancedCache, estimate_size
+
+
+class TestEnhancedCacheEviction:
+
+    def test_unbounded_by_default(self):
+        """Test that a cache without limits never evicts"""
+        cache = EnhancedCache()
+        for i in range(100):
+            cache.set(f"key:{i}", i)
+
+        stats = cache.get_stats()
+        assert stats["total_keys"] == 100
+        assert stats["evictions"] == 0
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test LRU eviction when max_entries is exceeded"""
+        cache = EnhancedCache(max_entries=2, eviction_policy="lru")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" becomes least recently used
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_lfu_evicts_least_frequently_used(self):
+        """Test LFU eviction keeps popular keys"""
+        cache = EnhancedCache(max_entries=2, eviction_policy="lfu")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        for _ in range(3):
+            cache.get("a")
+        cache.get("b")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl_evicts_soonest_expiring(self):
+        """Test TTL-priority eviction drops the entry closest to expiry"""
+        cache = EnhancedCache(max_entries=2, eviction_policy="ttl")
+        cache.set("long", 1, ttl_seconds=3600)
+        cache.set("short", 2, ttl_seconds=60)
+        cache.set("medium", 3, ttl_seconds=600)
+
+        assert cache.get("long") == 1
+        assert cache.get("short") is None
+        assert cache.get("medium") == 3
+
+    def test_max_bytes_budget(self):
+        """Test memory budget eviction and accounting"""
+        value = "x" * 1000
+        entry_size = estimate_size("key:0", value)
+        cache = EnhancedCache(max_bytes=entry_size * 3)
+
+        for i in range(10):
+            cache.set(f"key:{i}", value)
+
+        stats = cache.get_stats()
+        assert stats["total_keys"] == 3
+        assert stats["estimated_memory_bytes"] <= entry_size * 3
+        assert stats["evictions"] == 7
+        assert cache.get("key:9") == value
+
+    def test_oversized_value_is_not_cached(self):
+        """Test that a single value larger than the budget is skipped"""
+        cache = EnhancedCache(max_bytes=512)
+        cache.set("small", "ok")
+        cache.set("huge", "x" * 10000)
+
+        assert cache.get("huge") is None
+        assert cache.get("small") == "ok"
+
+    def test_overwrite_and_delete_update_memory(self):
+        """Test that overwrites and deletes keep size accounting exact"""
+        cache = EnhancedCache()
+        cache.set("key", "a" * 100)
+        cache.set("key", "b" * 10)
+        assert cache.get_stats()["estimated_memory_bytes"] == estimate_size("key", "b" * 10)
+
+        cache.delete("key")
+        assert cache.get_stats()["estimated_memory_bytes"] == 0
+
+    def test_expired_entries_are_released(self):
+        """Test that expired entries free their memory"""
+        cache = EnhancedCache()
+        cache.set("key", "value", ttl_seconds=0)
+        time.sleep(0.01)
+
+        assert cache.get("key") is None
+        stats = cache.get_stats()
+        assert stats["expired"] == 1
+        assert stats["estimated_memory_bytes"] == 0
+
+    def test_unknown_policy_raises(self):
+        """Test that an unknown eviction policy is rejected"""
+        with pytest.raises(ValueError):
+            EnhancedCache(eviction_policy="random")
+
+
+class TestRedisCacheTier:
+    """Two-tier cache tests against an in-process fakeredis server"""
+
+    @pytest.fixture
+    def redis_server(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        return fakeredis.FakeServer()
+
+    def _make_tier(self, redis_server):
+        import fakeredis
+        from app.services.cache_redis_tier import RedisCacheTier
+        return RedisCacheTier(
+            fakeredis.FakeRedis(server=redis_server),
+            fakeredis.aioredis.FakeRedis(server=redis_server)
+        )
+
+    def test_serialization_roundtrip(self):
+        """Test compact serialization with and without compression"""
+        from app.services.cache_redis_tier import serialize, deserialize, FORMAT_JSON, FORMAT_ZLIB
+
+        small = {"name": "ufw", "parameters": []}
+        large = {"modules": [{"name": f"module_{i}", "description": "x" * 50} for i in range(100)]}
+
+        assert serialize(small)[:1] == FORMAT_JSON
+        assert serialize(large)[:1] == FORMAT_ZLIB
+        assert deserialize(serialize(small)) == small
+        assert deserialize(serialize(large)) == large
+
+    def test_replica_reads_from_shared_tier(self, redis_server):
+        """Test that a value set by one replica is served to another from L2"""
+        replica_a = EnhancedCache()
+        replica_b = EnhancedCache()
+        replica_a.attach_l2(self._make_tier(redis_server))
+        replica_b.attach_l2(self._make_tier(redis_server))
+
+        replica_a.set("ansible_collections:latest", {"community": []}, ttl_seconds=60)
+
+        assert replica_b.get("ansible_collections:latest") == {"community": []}
+        stats = replica_b.get_stats()
+        assert stats["l2_hits"] == 1
+        assert stats["total_keys"] == 1  # Promoted to L1
+
+    def test_delete_pattern_propagates_to_l2(self, redis_server):
+        """Test that pattern deletes remove shared entries"""
+        replica_a = EnhancedCache()
+        replica_b = EnhancedCache()
+        replica_a.attach_l2(self._make_tier(redis_server))
+        replica_b.attach_l2(self._make_tier(redis_server))
+
+        replica_a.set("ansible_schema:13:community:general:ufw", {"module": "ufw"})
+        replica_a.set("ansible_schema:12:community:general:ufw", {"module": "ufw"})
+        replica_b.delete_pattern("ansible_schema:13:*")
+
+        assert replica_a.get("ansible_schema:12:community:general:ufw") is not None
+        assert replica_b.get("ansible_schema:13:community:general:ufw") is None
+
+    def test_apply_invalidation_drops_local_copies(self):
+        """Test invalidation messages from other replicas"""
+        cache = EnhancedCache()
+        cache.set("ansible_modules:13:community:general", [])
+        cache.set("ansible_modules:12:community:general", [])
+        cache.set("galaxy_standalone_roles:public", {})
+
+        cache.apply_invalidation({"op": "delete", "keys": ["galaxy_standalone_roles:public"]})
+        cache.apply_invalidation({"op": "pattern", "pattern": "ansible_modules:13:*"})
+
+        assert cache.get_keys() == ["ansible_modules:12:community:general"]
+
+    @pytest.mark.asyncio
+    async def test_pubsub_invalidation_between_replicas(self, redis_server):
+        """Test that a write on one replica invalidates the other replica's L1"""
+        import asyncio
+
+        replica_a = EnhancedCache()
+        replica_b = EnhancedCache()
+        tier_a = self._make_tier(redis_server)
+        tier_b = self._make_tier(redis_server)
+        replica_a.attach_l2(tier_a)
+        replica_b.attach_l2(tier_b)
+        await tier_b.start_listener(replica_b.apply_invalidation)
+
+        try:
+            replica_a.set("ansible_versions:available", ["latest", "13"])
+            await tier_a.flush()  # Writes from the event loop are write-behind
+            assert await replica_b.get_async("ansible_versions:available") == ["latest", "13"]
+            await asyncio.sleep(0.05)  # Let the listener subscribe
+
+            replica_a.set("ansible_versions:available", ["latest", "14"])
+            for _ in range(50):
+                if "ansible_versions:available" not in replica_b.get_keys():
+                    break
+                await asyncio.sleep(0.01)
+
+            assert await replica_b.get_async("ansible_versions:available") == ["latest", "14"]
+        finally:
+            await tier_b.stop_listener()
+
+    @pytest.mark.asyncio
+    async def test_redis_calls_leave_the_event_loop(self, redis_server):
+        """Test that L2 reads and writes made from the event loop run in the tier's worker thread"""
+        import threading
+        import fakeredis
+        from app.services.cache_redis_tier import RedisCacheTier
+
+        threads = []
+
+        class RecordingRedis(fakeredis.FakeRedis):
+            def execute_command(self, *args, **kwargs):
+                threads.append(threading.current_thread().name)
+                return super().execute_command(*args, **kwargs)
+
+        replica_a, replica_b = EnhancedCache(), EnhancedCache()
+        tier_a = RedisCacheTier(RecordingRedis(server=redis_server))
+        replica_a.attach_l2(tier_a)
+        tier_b = RedisCacheTier(RecordingRedis(server=redis_server))
+        replica_b.attach_l2(tier_b)
+
+        replica_a.set("ansible_versions:available", ["latest"])
+        await tier_a.flush()
+        assert await replica_b.get_async("ansible_versions:available") == ["latest"]
+        assert await replica_b.get_async("ansible_versions:missing") is None
+
+        replica_a.set("ansible_schema:13:community:general:ufw", {"module": "ufw"})
+        replica_a.delete("ansible_versions:available")
+        replica_a.delete_pattern("ansible_schema:13:*")
+        await tier_a.flush()
+        assert await tier_b.aget("ansible_versions:available") is None
+        assert await tier_b.aget("ansible_schema:13:community:general:ufw") is None
+        replica_a.clear()
+        await tier_a.flush()
+
+        assert threads and all(name.startswith("redis-cache-tier") for name in threads)
+        with pytest.raises(RuntimeError):
+            replica_b.get("ansible_versions:other")  # would wait for Redis on the event loop
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that N concurrent calls for one key run the function once"""
+        import asyncio
+        from app.services.cache_service import SingleFlight
+
+        flights = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"module": "ufw"}
+
+        results = await asyncio.gather(*[flights.do("ansible_schema:latest:community:general:ufw", fetch) for _ in range(10)])
+
+        assert calls == 1
+        assert all(r == {"module": "ufw"} for r in results)
+        assert flights.coalesced == 9
+        assert flights.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_not_remembered(self):
+        """Test that waiters receive the leader's error and the next call retries"""
+        import asyncio
+        from app.services.cache_service import SingleFlight
+
+        flights = SingleFlight()
+        calls = 0
+
+        async def failing_fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("HTTP 503")
+
+        results = await asyncio.gather(
+            *[flights.do("key", failing_fetch) for _ in range(3)],
+            return_exceptions=True
+        )
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        with pytest.raises(RuntimeError):
+            await flights.do("key", failing_fetch)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_fetch(self):
+        """Test that cancelling one caller keeps the shared fetch running"""
+        import asyncio
+        from app.services.cache_service import SingleFlight
+
+        flights = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+
+    @pytest.mark.asyncio
+    async def test_get_or_fetch_coalesces_and_caches(self):
+        """Test EnhancedCache.get_or_fetch with concurrent misses"""
+        import asyncio
+
+        cache = EnhancedCache()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return ["general", "aws"]
+
+        results = await asyncio.gather(*[cache.get_or_fetch("ansible_ns_collections:latest:community", fetch, 60) for _ in range(5)])
+
+        assert calls == 1
+        assert results == [["general", "aws"]] * 5
+        assert cache.get("ansible_ns_collections:latest:community") == ["general", "aws"]
+
+
+class TestStaleWhileRevalidate:
+
+    def _make_stale(self, cache, key):
+        cache._cache[key]["soft_expires"] = time.time() - 1
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_and_refreshed(self):
+        """Test that a stale entry is returned immediately and refreshed"""
+        import asyncio
+
+        cache = EnhancedCache()
+        key = "ansible_schema:latest:community:general:ufw"
+        refreshed = asyncio.Event()
+
+        async def refresher(k):
+            cache.set(k, {"module": "ufw", "version": 2}, 60)
+            refreshed.set()
+
+        cache.register_refresher("ansible_schema", refresher)
+        cache.set(key, {"module": "ufw", "version": 1}, 60)
+        self._make_stale(cache, key)
+
+        assert cache.get(key) == {"module": "ufw", "version": 1}
+        await asyncio.wait_for(refreshed.wait(), 1)
+        assert cache.get(key) == {"module": "ufw", "version": 2}
+        assert cache.get_stats()["stale_hits"] == 1
+
+    def test_stale_without_refresher_is_a_miss(self):
+        """Test that stale entries are not served when nobody can refresh them"""
+        cache = EnhancedCache()
+        key = "ansible_schema:latest:community:general:ufw"
+        cache.set(key, {"module": "ufw"}, 60)
+        self._make_stale(cache, key)
+
+        assert cache.get(key) is None
+
+    def test_hard_ttl_includes_stale_window(self):
+        """Test that the hard TTL is the soft TTL plus the family window"""
+        from app.core.cache_config import CacheTTL
+
+        cache = EnhancedCache()
+        cache.set("ansible_modules:13:community:general", [], 100)
+        cache.set("galaxy_standalone_roles:public", {}, 100)
+
+        stale_entry = cache._cache["ansible_modules:13:community:general"]
+        plain_entry = cache._cache["galaxy_standalone_roles:public"]
+        assert stale_entry["expires"] - stale_entry["soft_expires"] == pytest.approx(CacheTTL.stale_window("ansible_modules:x"))
+        assert plain_entry["expires"] == plain_entry["soft_expires"]
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_value(self):
+        """Test that a failing refresh keeps serving stale data and backs off"""
+        import asyncio
+
+        cache = EnhancedCache()
+        key = "ansible_collections:latest"
+        calls = 0
+
+        async def refresher(k):
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("docs.ansible.com unavailable")
+
+        cache.register_refresher("ansible_collections", refresher)
+        cache.set(key, {"community": []}, 60)
+        self._make_stale(cache, key)
+
+        assert cache.get(key) == {"community": []}
+        await asyncio.sleep(0.01)
+        assert cache.get(key) == {"community": []}
+        await asyncio.sleep(0.01)
+
+        assert calls == 1  # Backing off after the failure
+        assert cache.get_stats()["refresh_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hot_entry_refreshed_ahead(self):
+        """Test that hot entries are refreshed before their soft TTL"""
+        import asyncio
+        from app.core.cache_config import CacheTTL
+
+        cache = EnhancedCache()
+        key = "ansible_ns_collections:latest:community"
+        refreshed = asyncio.Event()
+
+        async def refresher(k):
+            cache.set(k, ["general", "aws"], 100)
+            refreshed.set()
+
+        cache.register_refresher("ansible_ns_collections", refresher)
+        cache.set(key, ["general"], 100)
+        for _ in range(CacheTTL.REFRESH_AHEAD_MIN_HITS):
+            cache.get(key)
+        # Enter the refresh-ahead window without going stale
+        cache._cache[key]["soft_expires"] = time.time() + 5
+
+        assert cache.get(key) == ["general"]
+        await asyncio.wait_for(refreshed.wait(), 1)
+        assert cache.get(key) == ["general", "aws"]
+        assert cache.get_stats()["stale_hits"] == 0
+
+
+class TestCacheSnapshot:
+
+    @pytest.mark.asyncio
+    async def test_snapshot_roundtrip_preserves_ttls(self, tmp_path):
+        """Test that a snapshot restores selected families with their TTLs"""
+        from app.services.cache_snapshot_service import CacheSnapshotService
+
+        source = EnhancedCache()
+        source.set("ansible_schema:13:community:general:ufw", {"module": "ufw"}, 600)
+        source.set("galaxy_standalone_roles:public", {"count": 1}, 300)
+        source.set("session:abc", "not persisted", 300)
+        original = source._cache["ansible_schema:13:community:general:ufw"]
+
+        path = str(tmp_path / "cache.db")
+        saved = await CacheSnapshotService(source, path, ["ansible_", "galaxy_"]).save()
+        assert saved == 2
+
+        target = EnhancedCache()
+        restored = await CacheSnapshotService(target, path, ["ansible_", "galaxy_"]).restore()
+
+        assert restored == 2
+        assert target.get("ansible_schema:13:community:general:ufw") == {"module": "ufw"}
+        assert target.get("galaxy_standalone_roles:public") == {"count": 1}
+        assert target.get("session:abc") is None
+
+        entry = target._cache["ansible_schema:13:community:general:ufw"]
+        assert entry["expires"] == pytest.approx(original["expires"])
+        assert entry["soft_expires"] == pytest.approx(original["soft_expires"])
+
+    @pytest.mark.asyncio
+    async def test_restore_skips_expired_entries(self, tmp_path):
+        """Test that entries expired since the snapshot are not restored"""
+        from app.services.cache_snapshot_service import CacheSnapshotService
+
+        source = EnhancedCache()
+        source.set("galaxy_collection_roles:public:ns:coll:1.0.0", [], 600)
+        source.set("galaxy_standalone_roles:public", {"count": 1}, 600)
+        path = str(tmp_path / "cache.db")
+        await CacheSnapshotService(source, path).save()
+
+        # Expire one entry inside the snapshot file
+        import sqlite3
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE entries SET expires = ? WHERE key LIKE 'galaxy_standalone%'", (time.time() - 1,))
+        conn.commit()
+        conn.close()
+
+        target = EnhancedCache()
+        assert await CacheSnapshotService(target, path).restore() == 1
+        assert target.get("galaxy_standalone_roles:public") is None
+
+    @pytest.mark.asyncio
+    async def test_restore_without_snapshot(self, tmp_path):
+        """Test that a missing snapshot file is not an error"""
+        from app.services.cache_snapshot_service import CacheSnapshotService
+
+        service = CacheSnapshotService(EnhancedCache(), str(tmp_path / "missing.db"))
+        assert await service.restore() == 0
+
+
+class TestKeyIndex:
+
+    def _make_cache(self):
+        cache = EnhancedCache()
+        for version in ("12", "13"):
+            cache.set(f"ansible_schema:{version}:community:general:ufw", {})
+            cache.set(f"ansible_schema:{version}:community:general:apt_key", {})
+            cache.set(f"ansible_modules:{version}:community:general", [])
+        cache.set("galaxy_standalone_roles:public", {})
+        return cache
+
+    def test_prefix_pattern_matches_subtree(self):
+        """Test that a trailing * matches every key below the prefix"""
+        cache = self._make_cache()
+
+        assert sorted(cache.get_keys("ansible_schema:13:*")) == [
+            "ansible_schema:13:community:general:apt_key",
+            "ansible_schema:13:community:general:ufw",
+        ]
+        assert len(cache.get_keys("ansible_*")) == 6
+        assert len(cache.get_keys()) == 7
+
+    def test_segment_wildcards(self):
+        """Test wildcards inside segments and in the middle of a pattern"""
+        cache = self._make_cache()
+
+        assert sorted(cache.get_keys("ansible_*:13:*")) == [
+            "ansible_modules:13:community:general",
+            "ansible_schema:13:community:general:apt_key",
+            "ansible_schema:13:community:general:ufw",
+        ]
+        assert cache.get_keys("ansible_schema:*:community:general:u?w") == [
+            "ansible_schema:12:community:general:ufw",
+            "ansible_schema:13:community:general:ufw",
+        ]
+        # Without trailing *, the pattern matches whole keys only
+        assert cache.get_keys("ansible_modules:13") == []
+
+    def test_delete_pattern_prunes_index(self):
+        """Test that deleted keys disappear from the index"""
+        cache = self._make_cache()
+
+        assert cache.delete_pattern("ansible_*:13:*") == 3
+        assert cache.get_keys("ansible_*:13:*") == []
+        assert cache.get("ansible_schema:12:community:general:ufw") == {}
+        assert len(cache._index) == len(cache._cache) == 4
+
+        cache.delete("galaxy_standalone_roles:public")
+        assert "galaxy_standalone_roles" not in cache._index._root.children
+
+    def test_match_key(self):
+        """Test the single-key matcher used to filter L2 scans"""
+        from app.services.cache_key_index import match_key
+
+        assert match_key("ansible_schema:13:*", "ansible_schema:13:community:general:ufw")
+        assert match_key("ansible_*:13:*", "ansible_modules:13:community:general")
+        assert not match_key("ansible_*:13:*", "ansible_schema:12:x:13:y")
+        assert not match_key("ansible_modules:13", "ansible_modules:13:community:general")
+
+
+class TestCacheReaper:
+
+    def test_reap_expired_in_bounded_slices(self):
+        """Test that the reaper removes expired keys at most max_keys at a time"""
+        cache = EnhancedCache()
+        for i in range(5):
+            cache.set(f"galaxy_collection_roles:public:ns:coll{i}:1.0.0", [], ttl_seconds=0)
+        cache.set("galaxy_collection_roles:public:ns:live:1.0.0", [], ttl_seconds=300)
+        time.sleep(0.01)
+
+        assert cache.reap_expired(max_keys=3) == 3
+        assert cache.reap_expired(max_keys=3) == 2
+        assert cache.reap_expired() == 0
+        assert cache.get_keys() == ["galaxy_collection_roles:public:ns:live:1.0.0"]
+        assert cache.get_stats()["expired"] == 5
+
+    def test_overwritten_keys_are_not_reaped(self):
+        """Test that a key overwritten with a longer TTL survives its old expiry"""
+        cache = EnhancedCache()
+        cache.set("galaxy_standalone_roles:public", {"v": 1}, ttl_seconds=0)
+        cache.set("galaxy_standalone_roles:public", {"v": 2}, ttl_seconds=300)
+        time.sleep(0.01)
+
+        assert cache.reap_expired() == 0
+        assert cache.get("galaxy_standalone_roles:public") == {"v": 2}
+
+    @pytest.mark.asyncio
+    async def test_background_reaper(self):
+        """Test that the reaper task removes expired keys without reads"""
+        import asyncio
+
+        cache = EnhancedCache()
+        cache.set("galaxy_standalone_roles:public", {}, ttl_seconds=0)
+        cache.start_reaper(interval_seconds=0.01, batch_size=1)
+        try:
+            for _ in range(50):
+                if not cache.get_stats()["total_keys"]:
+                    break
+                await asyncio.sleep(0.01)
+            assert cache.get_stats()["total_keys"] == 0
+            assert cache.get_stats()["reaper_running"] is True
+        finally:
+            await cache.stop_reaper()
+
+    def test_stats_per_family(self):
+        """Test per-prefix key counts and hit rates"""
+        cache = EnhancedCache()
+        cache.set("ansible_schema:13:ns:coll:a", {})
+        cache.set("ansible_schema:13:ns:coll:b", {})
+        cache.set("galaxy_standalone_roles:public", {})
+
+        cache.get("ansible_schema:13:ns:coll:a")
+        cache.get("ansible_schema:13:ns:coll:missing")
+        cache.delete("galaxy_standalone_roles:public")
+
+        families = cache.get_stats()["families"]
+        assert families["ansible_schema"] == {"keys": 2, "hits": 1, "misses": 1, "hit_rate": "50.0%"}
+        assert families["galaxy_standalone_roles"]["keys"] == 0
+
+
+class TestCacheMetrics:
+
+    @pytest.mark.asyncio
+    async def test_fills_are_recorded_per_family(self):
+        """Test that single-flight fetches are recorded as fills of their family"""
+        from app.services.cache_metrics import cache_metrics
+        from app.services.cache_service import single_flight
+
+        cache_metrics.reset()
+
+        async def fetch():
+            return {"module": "ufw"}
+
+        async def failing_fetch():
+            raise RuntimeError("HTTP 503")
+
+        await single_flight.do("ansible_schema:13:community:general:ufw", fetch)
+        with pytest.raises(RuntimeError):
+            await single_flight.do("galaxy_standalone_roles:public", failing_fetch)
+
+        fills = cache_metrics.get_fill_stats()
+        assert fills["ansible_schema"]["fills"] == 1
+        assert fills["ansible_schema"]["errors"] == 0
+        assert fills["galaxy_standalone_roles"]["errors"] == 1
+
+    def test_render_prometheus(self):
+        """Test Prometheus text output with per-family samples"""
+        from app.services.cache_metrics import CacheMetrics
+
+        metrics = CacheMetrics()
+        metrics.observe_fill("ansible_schema", 0.3)
+        metrics.observe_fill("ansible_schema", 12)
+
+        cache = EnhancedCache()
+        cache.set("ansible_schema:13:ns:coll:mod", {})
+        cache.get("ansible_schema:13:ns:coll:mod")
+        cache.get("ansible_collections:13")
+
+        text = metrics.render_prometheus(cache.get_stats())
+
+        assert 'automation_factory_cache_hits_total{family="ansible_schema"} 1' in text
+        assert 'automation_factory_cache_misses_total{family="ansible_collections"} 1' in text
+        assert 'automation_factory_cache_fill_duration_seconds_bucket{family="ansible_schema",le="0.5"} 1' in text
+        assert 'automation_factory_cache_fill_duration_seconds_bucket{family="ansible_schema",le="10"} 1' in text
+        assert 'automation_factory_cache_fill_duration_seconds_bucket{family="ansible_schema",le="+Inf"} 2' in text
+        assert 'automation_factory_cache_fill_duration_seconds_count{family="ansible_schema"} 2' in text
+        assert "automation_factory_cache_entries 1" in text
+
+
+class TestNegativeCache:
+
+    def test_lookup_distinguishes_empty_values_from_misses(self):
+        """Test the NOT_CACHED sentinel"""
+        from app.services.cache_service import NOT_CACHED
+
+        cache = EnhancedCache()
+        cache.set("ansible_modules:13:ns:empty", [])
+
+        assert cache.lookup("ansible_modules:13:ns:empty") == []
+        assert cache.lookup("ansible_modules:13:ns:missing") is NOT_CACHED
+        assert not NOT_CACHED
+
+    def test_negative_entries(self):
+        """Test that negative entries are returned by lookup() only"""
+        from app.services.cache_service import NegativeEntry
+
+        cache = EnhancedCache()
+        cache.set_negative("ansible_schema:13:ns:coll:typo", 404, "Module documentation not available (HTTP 404)")
+
+        negative = cache.lookup("ansible_schema:13:ns:coll:typo")
+        assert isinstance(negative, NegativeEntry)
+        assert negative.status == 404
+        assert cache.get("ansible_schema:13:ns:coll:typo") is None
+        assert cache.export_entries() == []
+
+        entry = cache._cache["ansible_schema:13:ns:coll:typo"]
+        assert entry["expires"] == entry["soft_expires"]  # No stale window
+        assert cache.get_stats()["negative_hits"] == 2
+
+    def test_negative_ttl_depends_on_status(self):
+        """Test that missing pages are remembered longer than upstream errors"""
+        from app.core.cache_config import CacheTTL
+
+        assert CacheTTL.negative_ttl(404) == CacheTTL.NEGATIVE_NOT_FOUND
+        assert CacheTTL.negative_ttl(503) == CacheTTL.NEGATIVE_ERROR
+        assert CacheTTL.NEGATIVE_ERROR < CacheTTL.NEGATIVE_NOT_FOUND
+
+    def test_negative_entries_expire(self):
+        """Test that an expired negative entry is a miss again"""
+        from app.services.cache_service import NOT_CACHED
+
+        cache = EnhancedCache()
+        cache.set_negative("galaxy_standalone_roles:public", 503, ttl_seconds=0)
+        time.sleep(0.01)
+
+        assert cache.lookup("galaxy_standalone_roles:public") is NOT_CACHED
+
+
+class TestConditionalRefresh:
+
+    def test_validators_are_stored_with_entries(self):
+        """Test that HTTP validators are kept alongside the cached value"""
+        cache = EnhancedCache()
+        cache.set("ansible_collections:13", {"community": ["general"]}, validators={"etag": '"abc"'})
+
+        assert cache.get_validators("ansible_collections:13") == {"etag": '"abc"'}
+        assert cache.get_validators("ansible_collections:12") is None
+
+    def test_revalidate_extends_ttl(self):
+        """Test that a 304 extends the TTL without replacing the value"""
+        from app.services.cache_service import NOT_CACHED
+
+        cache = EnhancedCache()
+        cache.set("galaxy_standalone_roles:public", {"count": 1}, ttl_seconds=0, validators={"etag": '"v1"'})
+        time.sleep(0.01)
+
+        assert cache.revalidate("galaxy_standalone_roles:public", 300) == {"count": 1}
+        assert cache.reap_expired() == 0
+        assert cache.get("galaxy_standalone_roles:public") == {"count": 1}
+        assert cache.get_validators("galaxy_standalone_roles:public") == {"etag": '"v1"'}
+        assert cache.revalidate("galaxy_standalone_roles:other", 300) is NOT_CACHED
+        assert cache.get_stats()["revalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_snapshot_keeps_validators(self, tmp_path):
+        """Test that validators survive a snapshot roundtrip"""
+        from app.services.cache_snapshot_service import CacheSnapshotService
+
+        source = EnhancedCache()
+        source.set("ansible_collections:13", {}, validators={"last_modified": "Mon, 01 Sep 2025 10:00:00 GMT"})
+        path = str(tmp_path / "cache.db")
+        await CacheSnapshotService(source, path).save()
+
+        target = EnhancedCache()
+        await CacheSnapshotService(target, path).restore()
+        assert target.get_validators("ansible_collections:13") == {"last_modified": "Mon, 01 Sep 2025 10:00:00 GMT"}
+
+
+class TestContentAddressedCache:
+
+    def make_cache(self, **kwargs):
+        return EnhancedCache(content_addressed=["ansible_schema", "ansible_modules"], **kwargs)
+
+    def test_identical_values_share_one_blob(self):
+        """Test that equal payloads under different versions are stored once"""
+        cache = self.make_cache()
+        schema = {"module": "ufw", "parameters": [{"name": "rule"}]}
+        for version in ("11", "12", "13"):
+            cache.set(f"ansible_schema:{version}:community:general:ufw", dict(schema))
+
+        stats = cache.get_stats()
+        assert stats["content_blobs"] == 1
+        assert stats["deduplicated_sets"] == 2
+        assert cache.get("ansible_schema:11:community:general:ufw") is cache.get("ansible_schema:13:community:general:ufw")
+        assert cache.get_digest("ansible_schema:11:community:general:ufw") == \
+            cache.get_digest("ansible_schema:13:community:general:ufw")
+
+        cache.set("ansible_schema:13:community:general:ufw", {"module": "ufw", "parameters": []})
+        assert cache.get_stats()["content_blobs"] == 2
+        assert cache.get_digest("ansible_schema:11:community:general:ufw") != \
+            cache.get_digest("ansible_schema:13:community:general:ufw")
+
+    def test_blob_memory_is_counted_once(self):
+        """Test that shared blobs are released with their last reference"""
+        cache = self.make_cache()
+        schema = {"module": "ufw", "description": "x" * 1000}
+        cache.set("ansible_schema:12:community:general:ufw", schema)
+        single = cache.get_stats()["estimated_memory_bytes"]
+        cache.set("ansible_schema:13:community:general:ufw", schema)
+        assert cache.get_stats()["estimated_memory_bytes"] < single + 500
+
+        cache.delete("ansible_schema:12:community:general:ufw")
+        assert cache.get("ansible_schema:13:community:general:ufw") == schema
+        cache.delete("ansible_schema:13:community:general:ufw")
+        stats = cache.get_stats()
+        assert stats["estimated_memory_bytes"] == 0
+        assert stats["content_blobs"] == 0
+
+    def test_other_families_are_not_interned(self):
+        """Test that families outside content_addressed keep their own copy"""
+        cache = self.make_cache()
+        cache.set("galaxy_standalone_roles:public", {"count": 1})
+        cache.set_negative("ansible_schema:13:ns:coll:typo", 404)
+
+        assert cache.get_digest("galaxy_standalone_roles:public") is None
+        assert cache.get_digest("ansible_schema:13:ns:coll:typo") is None
+        assert cache.get_stats()["content_blobs"] == 0
+
+    @pytest.mark.asyncio
+    async def test_snapshot_stores_shared_payloads_once(self, tmp_path):
+        """Test that the snapshot writes one blob row per distinct payload"""
+        import sqlite3
+        from app.services.cache_snapshot_service import CacheSnapshotService
+
+        source = self.make_cache()
+        for version in ("12", "13"):
+            source.set(f"ansible_modules:{version}:community:general", [{"name": "ufw"}], 600)
+        path = str(tmp_path / "cache.db")
+        assert await CacheSnapshotService(source, path).save() == 2
+
+        conn = sqlite3.connect(path)
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 1
+        conn.close()
+
+        target = self.make_cache()
+        assert await CacheSnapshotService(target, path).restore() == 2
+        assert target.get("ansible_modules:12:community:general") == [{"name": "ufw"}]
+        assert target.get_stats()["content_blobs"] == 1
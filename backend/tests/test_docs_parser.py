@@ -0,0 +1,158 @@
+"""
+Tests for documentation parser backends and parser pool
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.services.ansible_collections_service import AnsibleCollectionsService, _parse_in_worker
+from app.services.docs_parser import (
+    LXML_AVAILABLE,
+    ParserPool,
+    extract_index_links,
+    get_parser_backend,
+    resolve_parser_backend,
+    set_parser_backend,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "docs_pages"
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+class TestParserBackends:
+
+    def test_resolve_parser_backend(self):
+        """Test backend resolution and validation"""
+        assert resolve_parser_backend("auto") == ("lxml" if LXML_AVAILABLE else "html.parser")
+        assert resolve_parser_backend("HTML.PARSER") == "html.parser"
+        with pytest.raises(ValueError):
+            resolve_parser_backend("html5lib")
+
+    @pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml is not installed")
+    @pytest.mark.parametrize("page,method_name,args", [
+        ("collections_index.html", "_parse_collections_from_html", ()),
+        ("namespace_community.html", "_parse_namespace_collections_from_html", ()),
+        ("collection_amazon_aws.html", "_parse_modules_from_collection_html", ()),
+        ("module_amazon_aws_ec2_instance.html", "_parse_module_schema_from_html", ("ec2_instance",)),
+    ])
+    def test_backends_produce_same_output(self, page, method_name, args):
+        """Test that lxml and html.parser extract the same data from fixture pages"""
+        service = AnsibleCollectionsService()
+        html = read_fixture(page)
+        original = get_parser_backend()
+        try:
+            results = {}
+            for backend in ("lxml", "html.parser"):
+                set_parser_backend(backend)
+                results[backend] = getattr(service, method_name)(html, *args)
+        finally:
+            set_parser_backend(original)
+
+        assert results["lxml"]
+        assert results["lxml"] == results["html.parser"]
+
+    def test_module_page_fixture(self):
+        """Test schema extraction from a large module page"""
+        service = AnsibleCollectionsService()
+        schema = service._parse_module_schema_from_html(read_fixture("module_amazon_aws_ec2_instance.html"), "ec2_instance")
+
+        names = [p["name"] for p in schema["parameters"]]
+        assert "instance_type" in names
+        assert "security_groups" in names
+        assert schema["examples"]
+
+
+class TestIndexLinks:
+
+    @pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml is not installed")
+    @pytest.mark.parametrize("page", ["collections_index.html", "namespace_community.html"])
+    def test_streaming_extractors_agree(self, page):
+        """Test that the lxml target and html.parser extractors return the same names"""
+        html = read_fixture(page)
+        original = get_parser_backend()
+        try:
+            results = {}
+            for backend in ("lxml", "html.parser"):
+                set_parser_backend(backend)
+                results[backend] = extract_index_links(html)
+        finally:
+            set_parser_backend(original)
+
+        assert results["lxml"]
+        assert results["lxml"] == results["html.parser"]
+
+    @pytest.mark.parametrize("backend", ["lxml", "html.parser"])
+    def test_link_filtering(self, backend):
+        """Test which hrefs are accepted as index links"""
+        if backend == "lxml" and not LXML_AVAILABLE:
+            pytest.skip("lxml is not installed")
+        html = """
+            <a href="community/index.html">community</a>
+            <a href="Amazon/index.html">amazon</a>
+            <a href="community/index.html">duplicate</a>
+            <a href="cisco_ios2/index.html">cisco</a>
+            <a href="x/index.html">too short</a>
+            <a href="1password/index.html">digit first</a>
+            <a href="../index.html">parent</a>
+            <a href="genindex/index.html">genindex</a>
+            <a href="ansible/index.html#anchor">anchor</a>
+            <a href="https://example.com/foo/index.html">absolute</a>
+            <a href="caf&eacute;/index.html">non ascii</a>
+            <a name="top">no href</a>
+        """
+        original = get_parser_backend()
+        try:
+            set_parser_backend(backend)
+            names = extract_index_links(html)
+        finally:
+            set_parser_backend(original)
+
+        assert names == ["community", "Amazon", "cisco_ios2"]
+
+    def test_index_page_parsing(self):
+        """Test namespace and collection index parsing on fixture pages"""
+        service = AnsibleCollectionsService()
+
+        namespaces = service._parse_collections_from_html(read_fixture("collections_index.html"))
+        collections = service._parse_namespace_collections_from_html(read_fixture("namespace_community.html"))
+
+        assert "community" in namespaces and namespaces["community"] == []
+        assert "general" in collections
+        assert collections == sorted(collections)
+
+
+class TestParserPool:
+
+    @pytest.mark.asyncio
+    async def test_thread_pool_parses_off_the_event_loop(self):
+        """Test that parse functions run in a worker thread"""
+        pool = ParserPool("thread", max_workers=1)
+        try:
+            thread_name = await pool.run(lambda: threading.current_thread().name)
+        finally:
+            pool.shutdown()
+
+        assert thread_name.startswith("docs-parser")
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self):
+        """Test parsing in a worker process through the picklable entry point"""
+        pool = ParserPool("process", max_workers=1)
+        try:
+            modules = await pool.run(
+                _parse_in_worker, "_parse_modules_from_collection_html", read_fixture("collection_amazon_aws.html")
+            )
+        finally:
+            pool.shutdown()
+
+        assert any(m["name"] == "ec2_instance" for m in modules)
+
+    def test_unknown_mode_raises(self):
+        """Test that an unknown pool mode is rejected"""
+        with pytest.raises(ValueError):
+            ParserPool("greenlet")
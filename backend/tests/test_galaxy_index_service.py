@@ -0,0 +1,255 @@
+"""
+Tests for the local Galaxy role/collection index
+"""
+
+import sqlite3
+
+import pytest
+from unittest.mock import patch
+
+from app.services.galaxy_index_service import GalaxyIndex, fts_query
+
+SOURCE = {"id": "src-1", "name": "Galaxy", "source_type": "public", "url": "https://galaxy.test", "token": None}
+
+
+def role(role_id, namespace, name, description="", downloads=0, modified="2026-01-01T00:00:00Z"):
+    return {
+        "id": role_id, "name": name, "namespace": namespace, "description": description,
+        "download_count": downloads, "created": "2025-01-01T00:00:00Z", "modified": modified
+    }
+
+
+def collection(namespace, name, version, description="", tags=(), created="2026-01-01T00:00:00Z"):
+    """Item of the Galaxy v3 collection-versions search"""
+    return {
+        "collection_version": {
+            "namespace": namespace, "name": name, "version": version, "description": description,
+            "tags": [{"name": tag} for tag in tags], "pulp_created": created
+        },
+        "is_highest": True
+    }
+
+
+class FakeGalaxy:
+    """Galaxy v1 roles / v3 collection versions, paginated newest-modified first"""
+
+    def __init__(self, roles, collections=()):
+        self.roles = list(roles)
+        self.collections = list(collections)
+        self.pages = []
+
+    async def fetch(self, url, headers=None, params=None, read="text"):
+        self.pages.append((url.rsplit("/api/", 1)[1], params))
+        if "/api/v1/roles/" in url:
+            field = params["order_by"].lstrip("-")
+            items = sorted(self.roles, key=lambda r: r[field], reverse=True)
+            start = (params["page"] - 1) * params["page_size"]
+            if params["page"] > 1 and start >= len(items):
+                return 404, None, {}
+            page = items[start:start + params["page_size"]]
+            more = start + params["page_size"] < len(items)
+            return 200, {"count": len(items), "next": "next" if more else None, "results": page}, {}
+        assert params["is_highest"] == "true"
+        items = sorted(self.collections, key=lambda c: c["collection_version"]["pulp_created"], reverse=True)
+        page = items[params["offset"]:params["offset"] + params["limit"]]
+        return 200, {"meta": {"count": len(items)}, "data": page}, {}
+
+
+@pytest.fixture
+def galaxy():
+    return FakeGalaxy(
+        roles=[
+            role(1, "geerlingguy", "docker", "Docker for Linux", 900, "2026-01-03T00:00:00Z"),
+            role(2, "geerlingguy", "nginx", "Nginx installation", 500, "2026-01-02T00:00:00Z"),
+            role(3, "someone", "docker_compose", "Compose files", 100, "2026-01-01T00:00:00Z"),
+        ],
+        collections=[
+            collection("community", "docker", "3.4.0", "Manage Docker containers", ["containers"]),
+            collection("kubernetes", "core", "5.0.0", "Kubernetes modules", ["k8s", "openshift"],
+                       "2026-01-02T00:00:00Z"),
+        ]
+    )
+
+
+@pytest.fixture
+def index(tmp_path, galaxy):
+    index = GalaxyIndex(str(tmp_path / "galaxy.db"), page_size=2, popular_pages=0)
+    with patch("app.services.galaxy_source_service.GalaxySourceService.get_active_sources", return_value=[SOURCE]):
+        with patch.object(index, "fetch", side_effect=galaxy.fetch):
+            yield index
+    index.close()
+
+
+def names(page):
+    return [r["name"] for r in page["results"]]
+
+
+class TestGalaxyIndex:
+
+    def test_fts_query(self):
+        """Test that every word becomes a prefix term"""
+        assert fts_query("Docker  comp") == '"docker"* "comp"*'
+        assert fts_query(" - ") is None
+
+    @pytest.mark.asyncio
+    async def test_not_served_before_first_full_sync(self, index):
+        """Test that an unsynced source falls back to Galaxy"""
+        index.open()
+
+        assert not index.covers("src-1")
+        assert index.search_roles("src-1") is None
+
+    @pytest.mark.asyncio
+    async def test_search_filter_sort_and_pages(self, index):
+        """Test role queries served from the index"""
+        assert await index.sync() == 5
+
+        page = index.search_roles("src-1", page=1, page_size=2)
+        assert page["count"] == 3
+        assert names(page) == ["docker", "nginx"]
+        assert page["next"] and page["previous"] is None
+        assert names(index.search_roles("src-1", page=2, page_size=2)) == ["docker_compose"]
+
+        assert names(index.search_roles("src-1", search="dock")) == ["docker", "docker_compose"]
+        assert names(index.search_roles("src-1", search="linux docker")) == ["docker"]
+        assert names(index.search_roles("src-1", namespace="geerlingguy", order_by="name")) == ["docker", "nginx"]
+        assert index.search_roles("src-1", order_by="-relevance") is None  # unknown order: proxy to Galaxy
+
+        assert index.get_role("src-1", "geerlingguy", "nginx")["fqrn"] == "geerlingguy.nginx"
+        assert [c["name"] for c in index.search_collections("src-1", "core")] == ["core"]
+
+    @pytest.mark.asyncio
+    async def test_collections_found_by_description_and_tags(self, index, galaxy):
+        """Test that collection search matches descriptions and tags, like Galaxy's keyword search"""
+        await index.sync()
+
+        assert index.search_collections("src-1", "containers") == [
+            {"namespace": "community", "name": "docker", "version": "3.4.0"}
+        ]
+        assert [c["name"] for c in index.search_collections("src-1", "openshift")] == ["core"]
+        assert [api for api, _ in galaxy.pages if "collection" in api] == [
+            "v3/plugin/ansible/search/collection-versions/"
+        ]
+
+    def test_name_only_index_not_served(self, tmp_path):
+        """Test that an index synced before descriptions and tags were stored is rebuilt"""
+        path = str(tmp_path / "galaxy.db")
+        old = sqlite3.connect(path)
+        old.executescript(
+            "CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);"
+            "INSERT INTO meta VALUES ('format_version', '2');"
+            "CREATE TABLE sync_state (source_id TEXT, kind TEXT, cursor TEXT, ready INTEGER, items INTEGER, "
+            "last_sync REAL, last_full_sync REAL);"
+            "INSERT INTO sync_state VALUES ('src-1', 'collections', NULL, 1, 2, NULL, NULL);"
+        )
+        old.close()
+
+        index = GalaxyIndex(path)
+        index.open()
+        assert index.search_collections("src-1", "docker") is None  # Galaxy keyword search still runs
+        index.close()
+
+    @pytest.mark.asyncio
+    async def test_queries_only_see_committed_writes(self, index):
+        """Test that queries do not read the open transaction of a sync"""
+        await index.sync()
+
+        index._conn.execute("DELETE FROM roles WHERE name = 'nginx'")  # transaction left open
+        assert index.get_role("src-1", "geerlingguy", "nginx") is not None
+        index._conn.rollback()
+
+    def test_unusable_file_recreated_once(self, tmp_path):
+        """Test that a corrupt index is replaced with its WAL files, and a missing one created"""
+        path = tmp_path / "galaxy.db"
+        path.write_bytes(b"not a database" * 100)
+        (tmp_path / "galaxy.db-wal").write_bytes(b"stale")
+
+        index = GalaxyIndex(str(path))
+        index.open()
+        assert index.get_status()["open"]
+        assert index.search_roles("src-1") is None  # new, empty index
+        index.close()
+
+        with patch.object(GalaxyIndex, "_connect", side_effect=sqlite3.DatabaseError("disk I/O error")) as connect:
+            with pytest.raises(sqlite3.DatabaseError):
+                GalaxyIndex(str(tmp_path / "missing.db")).open()
+        assert connect.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_stops_at_cursor(self, index, galaxy):
+        """Test that a periodic sync only crawls the pages modified since the last one"""
+        await index.sync()
+        galaxy.pages.clear()
+        galaxy.roles.append(role(4, "newcomer", "redis", "Redis", 10, "2026-02-01T00:00:00Z"))
+        galaxy.roles[1]["download_count"] = 2000
+
+        await index.sync()
+
+        role_pages = [params["page"] for api, params in galaxy.pages if api == "v1/roles/"]
+        assert role_pages == [1, 2]  # page 2 (docker_compose, older than the cursor) ends the crawl
+        assert names(index.search_roles("src-1", search="redis")) == ["redis"]
+
+    @pytest.mark.asyncio
+    async def test_full_sync_drops_deleted_items(self, index, galaxy):
+        """Test that items gone upstream are removed by a full crawl"""
+        await index.sync()
+        galaxy.roles = [r for r in galaxy.roles if r["name"] != "nginx"]
+
+        await index.sync(full=False)
+        assert index.get_role("src-1", "geerlingguy", "nginx") is not None
+
+        await index.sync(full=True)
+        assert index.get_role("src-1", "geerlingguy", "nginx") is None
+        assert index.get_status()["sources"]["src-1"]["roles"]["items"] == 2
+
+    @pytest.mark.asyncio
+    async def test_namespace_totals_follow_download_counts(self, index, galaxy):
+        """Test that namespace totals are kept up to date, including unmodified roles"""
+        await index.sync()
+        assert index.popular_namespaces("src-1") == [
+            {"name": "geerlingguy", "role_count": 2, "total_downloads": 1400},
+            {"name": "someone", "role_count": 1, "total_downloads": 100},
+        ]
+
+        # More downloads, same modification date: only the downloads pass sees it
+        galaxy.roles[2]["download_count"] = 5000
+        index.popular_pages = 1
+        await index.sync(full=False)
+
+        assert index.popular_namespaces("src-1", limit=1) == [
+            {"name": "someone", "role_count": 1, "total_downloads": 5000}
+        ]
+
+        galaxy.roles = [r for r in galaxy.roles if r["namespace"] != "someone"]
+        await index.sync(full=True)
+        assert [ns["name"] for ns in index.popular_namespaces("src-1")] == ["geerlingguy"]
+
+    @pytest.mark.asyncio
+    async def test_roles_service_served_from_index(self, index):
+        """Test that the roles service reads role lists from a synced index"""
+        from app.services.galaxy_roles_service import GalaxyRolesService
+
+        await index.sync()
+        service = GalaxyRolesService()
+
+        with patch("app.services.galaxy_roles_service.galaxy_index", index):
+            with patch.object(service, "fetch", side_effect=AssertionError("Galaxy queried")):
+                result = await service.get_standalone_roles(search="nginx")
+                details = await service.get_standalone_role_details("geerlingguy", "docker")
+
+        assert names(result) == ["nginx"]
+        assert details["download_count"] == 900
+
+    @pytest.mark.asyncio
+    async def test_popular_namespaces_from_index(self, index):
+        """Test that popular namespaces cost no Galaxy request once indexed"""
+        from app.services.galaxy_roles_service import GalaxyRolesService
+
+        await index.sync()
+        service = GalaxyRolesService()
+
+        with patch("app.services.galaxy_roles_service.galaxy_index", index):
+            with patch.object(service, "fetch", side_effect=AssertionError("Galaxy queried")):
+                namespaces = await service.get_popular_namespaces(limit=1)
+
+        assert namespaces == [{"name": "geerlingguy", "role_count": 2, "total_downloads": 1400}]
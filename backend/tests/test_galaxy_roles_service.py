@@ -2,9 +2,13 @@
 Unit tests for Galaxy Roles Service
 """
 
+import json
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from app.services.galaxy_roles_service import GalaxyRolesService
+from app.services.module_docs_service import module_docs_service
+from app.services.cache_service import EnhancedCache, NOT_CACHED
 
 
 class TestGalaxyRolesService:
@@ -223,12 +227,12 @@ class TestGalaxyRolesService:
         }
 
         with patch('app.services.galaxy_roles_service.cache') as mock_cache:
-            mock_cache.get.return_value = cached_data
+            mock_cache.get_async = AsyncMock(return_value=cached_data)
 
             result = await service.get_standalone_roles()
 
             assert result == cached_data
-            mock_cache.get.assert_called_once()
+            mock_cache.get_async.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_get_standalone_roles_http_success(self, service):
@@ -249,7 +253,7 @@ class TestGalaxyRolesService:
         }
 
         with patch('app.services.galaxy_roles_service.cache') as mock_cache:
-            mock_cache.get.return_value = None
+            mock_cache.get_async = AsyncMock(return_value=None)
 
             mock_response = AsyncMock()
             mock_response.status = 200
@@ -274,7 +278,8 @@ class TestGalaxyRolesService:
     async def test_get_standalone_roles_http_error(self, service):
         """Test handling of HTTP error"""
         with patch('app.services.galaxy_roles_service.cache') as mock_cache:
-            mock_cache.get.return_value = None
+            mock_cache.get_async = AsyncMock(return_value=None)
+            mock_cache.get_stale.return_value = NOT_CACHED
 
             mock_response = AsyncMock()
             mock_response.status = 500
@@ -294,17 +299,21 @@ class TestGalaxyRolesService:
 
     @pytest.mark.asyncio
     async def test_get_collection_roles_cached(self, service):
-        """Test that cached collection roles are returned"""
-        cached_roles = [
-            {"name": "role1", "fqcn": "ns.col.role1", "type": "collection"}
-        ]
+        """Test that roles are read from the cached docs-blob of the collection version"""
+        cached_docs = {
+            "modules": {},
+            "role_docs": {"contents": [{"content_name": "role1", "content_type": "role", "description": ""}]}
+        }
 
-        with patch('app.services.galaxy_roles_service.cache') as mock_cache:
-            mock_cache.get.return_value = cached_roles
+        with patch('app.services.galaxy_roles_service.cache') as mock_cache, \
+             patch('app.services.module_docs_service.cache') as docs_cache:
+            mock_cache.get_async = AsyncMock(return_value="1.0.0")
+            docs_cache.lookup_async = AsyncMock(return_value=cached_docs)
 
             result = await service.get_collection_roles("ns", "col")
 
-            assert result == cached_roles
+            assert [r["fqcn"] for r in result] == ["ns.col.role1"]
+            docs_cache.lookup_async.assert_awaited_once_with("galaxy_docs_blob:galaxy.ansible.com:ns:col:1.0.0")
 
     @pytest.mark.asyncio
     async def test_get_popular_namespaces(self, service):
@@ -320,7 +329,7 @@ class TestGalaxyRolesService:
 
         with patch.object(service, 'get_standalone_roles', return_value=roles_data):
             with patch('app.services.galaxy_roles_service.cache') as mock_cache:
-                mock_cache.get.return_value = None
+                mock_cache.get_async = AsyncMock(return_value=None)
 
                 namespaces = await service.get_popular_namespaces(limit=10)
 
@@ -329,6 +338,217 @@ class TestGalaxyRolesService:
                 assert namespaces[0]["name"] == "geerlingguy"
                 assert namespaces[0]["total_downloads"] == 1500000
 
+    @pytest.mark.asyncio
+    async def test_search_collection_roles_concurrently(self, service):
+        """Test that collections are looked up concurrently, results kept in search order"""
+        import asyncio
+
+        search = {"data": [
+            {"namespace": "ns", "name": "slow", "version": "2.0.0"},
+            {"namespace": "ns", "name": "fast", "version": "1.0.0"},
+            {"namespace": "ns", "name": "other", "version": "1.0.0"}
+        ]}
+        running, peak, calls = 0, 0, []
+
+        async def collection_roles(namespace, collection, version, source):
+            nonlocal running, peak
+            calls.append((collection, version))
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05 if collection == "slow" else 0.01)
+            running -= 1
+            return [{"name": f"{collection}_role", "fqcn": f"ns.{collection}.{collection}_role"}]
+
+        with patch.object(service, 'fetch', return_value=(200, search, {})):
+            with patch.object(service, 'get_collection_roles', side_effect=collection_roles):
+                batches = [b async for b in service.iter_collection_roles("x", concurrency=2, deadline=5)]
+                assert peak == 2
+                roles = await service.search_collection_roles("x")
+
+        assert [b["collection"] for b in batches][-1] == "slow"  # streamed as completed
+        assert [r["name"] for r in roles] == ["slow_role", "fast_role", "other_role"]
+        assert ("slow", "2.0.0") in calls  # version from the search, no "latest" lookup
+
+    @pytest.mark.asyncio
+    async def test_search_collection_roles_deadline(self, service):
+        """Test that collections pending at the deadline are left out"""
+        import asyncio
+
+        search = {"data": [{"namespace": "ns", "name": "hung"}, {"namespace": "ns", "name": "quick"}]}
+
+        async def collection_roles(namespace, collection, version, source):
+            await asyncio.sleep(10 if collection == "hung" else 0)
+            return [{"name": collection}]
+
+        with patch.object(service, 'fetch', return_value=(200, search, {})):
+            with patch.object(service, 'get_collection_roles', side_effect=collection_roles):
+                batches = [b async for b in service.iter_collection_roles("x", deadline=0.1)]
+
+        assert [(b["rank"], b["collection"]) for b in batches] == [(1, "quick")]
+        assert len(service._background) == 1  # "hung" keeps running to fill the cache
+        for task in service._background:
+            task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_search_collection_roles_queued_lookups_dropped(self, service):
+        """Test that running lookups finish in the background and queued ones never start"""
+        import asyncio
+
+        search = {"data": [{"namespace": "ns", "name": "slow"}, {"namespace": "ns", "name": "queued"}]}
+        calls = []
+
+        async def collection_roles(namespace, collection, version, source):
+            calls.append(collection)
+            await asyncio.sleep(0.2)
+            return [{"name": collection}]
+
+        with patch.object(service, 'fetch', return_value=(200, search, {})):
+            with patch.object(service, 'get_collection_roles', side_effect=collection_roles):
+                batches = [b async for b in service.iter_collection_roles("x", concurrency=1, deadline=0.05)]
+                await asyncio.wait_for(asyncio.gather(*service._background), timeout=1)
+                await asyncio.sleep(0.3)
+
+        assert batches == []
+        assert calls == ["slow"]
+        assert not service._background
+
+    @pytest.mark.asyncio
+    async def test_federated_roles_merged_by_priority(self, service):
+        """Test that all sources are queried at once and duplicates keep the top-priority copy"""
+        import asyncio
+
+        sources = [
+            {"id": "pub", "name": "Public", "source_type": "public", "url": "https://pub", "token": None, "priority": 20},
+            {"id": "hub", "name": "Hub", "source_type": "private", "url": "https://hub", "token": "t", "priority": 10},
+        ]
+        started = []
+
+        async def fetch_roles(cache_key, search, namespace, page, page_size, source, order_by):
+            started.append(source)
+            await asyncio.sleep(0.05)
+            names = {"hub": ["acme.web", "geerlingguy.docker"], "pub": ["geerlingguy.docker", "geerlingguy.nginx"]}
+            results = [{"fqrn": fqrn, "name": fqrn.split(".")[1]} for fqrn in names[source]]
+            return {"count": len(results), "next": None, "previous": None, "results": results}
+
+        with patch.object(service, '_get_active_sources', return_value=sources), \
+                patch('app.services.galaxy_roles_service.cache', EnhancedCache()), \
+                patch.object(service, '_fetch_standalone_roles', side_effect=fetch_roles):
+            loop = asyncio.get_running_loop()
+            began = loop.time()
+            result = await service.get_standalone_roles(source="all")
+            elapsed = loop.time() - began
+
+        assert sorted(started) == ["hub", "pub"]
+        assert elapsed < 0.09  # one round trip, not two
+        assert [(r["fqrn"], r["source"]) for r in result["results"]] == [
+            ("acme.web", "Hub"), ("geerlingguy.docker", "Hub"), ("geerlingguy.nginx", "Public")
+        ]
+        assert result["count"] == 4
+        assert result["sources"] == ["Hub", "Public"]
+
+    @pytest.mark.asyncio
+    async def test_federated_slow_source_left_out(self, service, monkeypatch):
+        """Test that lower-priority sources get a grace period after the top-priority ones"""
+        import asyncio
+        from app.services.galaxy_roles_service import settings
+
+        monkeypatch.setattr(settings, "GALAXY_FEDERATED_GRACE_SECONDS", 0.05)
+        sources = [
+            {"id": "hub", "name": "Hub", "source_type": "private", "url": "https://hub", "token": None, "priority": 10},
+            {"id": "pub", "name": "Public", "source_type": "public", "url": "https://pub", "token": None, "priority": 20},
+        ]
+
+        async def query(source_id):
+            await asyncio.sleep(5 if source_id == "pub" else 0.01)
+            return source_id
+
+        with patch.object(service, '_get_active_sources', return_value=sources):
+            answers = await asyncio.wait_for(service._federated(query), timeout=1)
+
+        assert [(source["name"], result) for source, result in answers] == [("Hub", "hub")]
+
+    @pytest.mark.asyncio
+    async def test_federated_late_source_fills_cache(self, service, monkeypatch):
+        """Test that a source left out of a federated answer still caches its result"""
+        import asyncio
+        from app.services.galaxy_roles_service import settings
+
+        monkeypatch.setattr(settings, "GALAXY_FEDERATED_GRACE_SECONDS", 0.05)
+        sources = [
+            {"id": "hub", "name": "Hub", "source_type": "private", "url": "https://hub", "token": None, "priority": 10},
+            {"id": "pub", "name": "Public", "source_type": "public", "url": "https://pub", "token": None, "priority": 20},
+        ]
+
+        async def fetch(url, headers=None, params=None, read="text"):
+            await asyncio.sleep(0.3 if url.startswith("https://pub") else 0.01)
+            return 200, {"count": 1, "results": [{"id": 1, "name": "docker", "namespace": "geerlingguy"}]}, {}
+
+        test_cache = EnhancedCache()
+        with patch.object(service, '_get_active_sources', return_value=sources), \
+                patch('app.services.galaxy_roles_service.cache', test_cache), \
+                patch.object(service, 'fetch', side_effect=fetch):
+            result = await service.get_standalone_roles(source="all")
+            assert result["sources"] == ["Hub"]
+
+            await asyncio.wait_for(asyncio.gather(*service._background), timeout=1)
+
+        assert not service._background
+        assert test_cache.get("galaxy_standalone_roles:pub:::1:50:-download_count")["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_collection_roles_cached_by_version(self, service):
+        """Test that docs-blobs are fetched once per version and "latest" is revalidated"""
+        requests = []
+        latest = {"version": "1.0.0"}
+
+        async def fetch(url, headers=None, params=None, read="text"):
+            requests.append((url.split("/collections/index/")[1], (headers or {}).get("If-None-Match")))
+            if url.endswith("/docs-blob/"):
+                return 200, json.dumps({"contents": [{"content_type": "role", "content_name": "web"}]}), {}
+            etag = f'"{latest["version"]}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, None, {}
+            return 200, {"highest_version": latest}, {"ETag": etag}
+
+        test_cache = EnhancedCache()
+        with patch('app.services.galaxy_roles_service.cache', test_cache), \
+             patch('app.services.module_docs_service.cache', test_cache), \
+             patch.object(service, 'fetch', side_effect=fetch), \
+             patch.object(module_docs_service, 'fetch', side_effect=fetch):
+            roles = await service.get_collection_roles("ns", "col")
+            await service.get_collection_roles("ns", "col")
+            await service.get_collection_roles("ns", "col", version="1.0.0")
+            assert len(requests) == 2  # pointer + docs-blob
+
+            # Expired pointer: a 304 keeps the version, no docs-blob download
+            test_cache._cache["galaxy_collection_latest:public:ns:col"]["soft_expires"] = 0
+            await service.get_collection_roles("ns", "col")
+            assert requests[2:] == [("ns/col/", '"1.0.0"')]
+
+            # New version published: only its docs-blob is downloaded
+            latest["version"] = "1.1.0"
+            test_cache._cache["galaxy_collection_latest:public:ns:col"]["soft_expires"] = 0
+            await service.get_collection_roles("ns", "col")
+            assert requests[3:] == [("ns/col/", '"1.0.0"'), ("ns/col/versions/1.1.0/docs-blob/", None)]
+
+        assert [r["fqcn"] for r in roles] == ["ns.col.web"]
+        assert test_cache.get("galaxy_docs_blob:galaxy.ansible.com:ns:col:1.0.0")["modules"] == {}
+
+    @pytest.mark.asyncio
+    async def test_collection_without_roles_downloaded_once(self, service):
+        """Test that an empty role list is a cache hit, shared with the module schemas"""
+        blob = json.dumps({"contents": [{"content_type": "module", "content_name": "ping", "doc_strings": {"doc": {}}}]})
+        fetch = AsyncMock(return_value=(200, blob, {}))
+
+        with patch('app.services.module_docs_service.cache', EnhancedCache()), \
+             patch.object(module_docs_service, 'fetch', fetch):
+            for _ in range(3):
+                assert await service.get_collection_roles("ns", "col", version="2.0.0") == []
+            schemas = await module_docs_service.get_docs_blob_schemas("ns", "col", "2.0.0")
+
+        assert fetch.await_count == 1
+        assert list(schemas) == ["ping"]
+
     # ========================================
     # Integration Test (real API call)
     # ========================================
@@ -0,0 +1,115 @@
+"""
+Tests for the shared outbound HTTP connection pool
+"""
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from app.core.http_pool import HTTPPool
+from app.core.http_service import BaseHTTPService
+
+
+@pytest_asyncio.fixture
+async def server():
+    """Local HTTP server answering "ok" on /"""
+    async def handler(request):
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/"
+    await runner.cleanup()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = HTTPPool(limit=10, limit_per_host=2, connect_timeout=2, read_timeout=5)
+    monkeypatch.setattr("app.core.http_service.http_pool", pool)
+    return pool
+
+
+class TestHTTPPool:
+
+    @pytest.mark.asyncio
+    async def test_services_share_keepalive_connections(self, server, pool):
+        """Test that sessions of different services reuse the same connections"""
+        first, second = BaseHTTPService(timeout=30), BaseHTTPService(timeout=60)
+
+        for service in (first, second, first):
+            session = await service.get_session()
+            async with session.get(server) as response:
+                assert await response.text() == "ok"
+
+        assert (await first.get_session()).connector is (await second.get_session()).connector
+        status = pool.get_status()
+        assert status["requests"] == 3
+        assert status["connections_created"] == 1
+        assert status["connections_reused"] == 2
+        assert status["connections_idle"] == 1
+
+        # Closing a service session keeps the shared connector open
+        await first.close_session()
+        assert not pool.connector.closed
+        await second.close_session()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_session_timeouts(self, pool):
+        """Test that the total timeout is per service, connect/read come from the pool"""
+        session = await BaseHTTPService(timeout=45).get_session()
+
+        assert session.timeout.total == 45
+        assert session.timeout.connect == 2
+        assert session.timeout.sock_read == 5
+        await session.close()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_sessions_follow_a_new_pool(self, pool):
+        """Test that service sessions are recreated after the pool is closed"""
+        service = BaseHTTPService()
+        session = await service.get_session()
+        await pool.close()
+
+        assert session.closed
+        new_session = await service.get_session()
+        assert new_session is not session and not new_session.closed
+        await service.close_session()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_session_on_replaced_connector_closed(self, pool):
+        """Test that the session left on a replaced connector is closed, not leaked"""
+        service = BaseHTTPService()
+        session = await service.get_session()
+        old_connector = pool._connector
+        pool._connector_loop = None  # As after a loop change: the old connector stays open
+
+        new_session = await service.get_session()
+
+        assert new_session is not session and session.closed
+        assert new_session.connector is not old_connector
+        await service.close_session()
+        await old_connector.close()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_shared_httpx_client(self, server):
+        """Test the shared httpx client (HTTP/1.1 without the h2 package)"""
+        pool = HTTPPool(http2=True)
+        client = pool.httpx_client
+
+        response = await client.get(server)
+        await client.get(server)
+
+        assert response.text == "ok"
+        assert pool.httpx_client is client
+        assert pool.get_status()["httpx_requests"] == 2
+        await pool.close()
+        assert client.is_closed
@@ -0,0 +1,199 @@
+"""
+Tests for upstream retries, circuit breakers and stale fallbacks
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from unittest.mock import patch
+
+from app.core.http_pool import HTTPPool
+from app.core.http_resilience import CircuitBreaker, CircuitBreakerRegistry, RetryPolicy, circuit_breakers
+from app.core.http_service import BaseHTTPService, CircuitOpenError
+from app.services.cache_service import EnhancedCache, NOT_CACHED
+
+
+@pytest_asyncio.fixture
+async def server():
+    """Local server answering with the statuses queued in server.statuses (then 200)"""
+    statuses = []
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        if request.path == "/slow":
+            await asyncio.sleep(1)
+        status = statuses.pop(0) if statuses else 200
+        return web.Response(status=status, text="ok" if status == 200 else "error")
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    class Server:
+        url = f"http://127.0.0.1:{port}/"
+
+    Server.statuses, Server.calls = statuses, calls
+    yield Server
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def service(monkeypatch):
+    pool = HTTPPool(connect_timeout=2, read_timeout=5)
+    monkeypatch.setattr("app.core.http_service.http_pool", pool)
+    monkeypatch.setattr("app.core.http_service.retry_policy", RetryPolicy(attempts=3, base_delay=0.01, max_delay=0.05))
+    service = BaseHTTPService(timeout=10)
+    yield service
+    await service.close_session()
+    await pool.close()
+
+
+class TestFetch:
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self, server, service):
+        """Test that 503/429 answers are retried until success"""
+        server.statuses.extend([503, 429])
+
+        status, body, _ = await service.fetch(server.url)
+
+        assert (status, body) == (200, "ok")
+        assert len(server.calls) == 3
+        assert circuit_breakers.for_url(server.url).state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_not_retried(self, server, service):
+        """Test that a 404 is returned at once"""
+        server.statuses.append(404)
+
+        status, body, _ = await service.fetch(server.url)
+
+        assert (status, body) == (404, None)
+        assert len(server.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_return_last_status(self, server, service):
+        """Test that the failing status is returned after the last attempt"""
+        server.statuses.extend([502, 502, 502])
+
+        status, _, _ = await service.fetch(server.url)
+
+        assert status == 502
+        assert len(server.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, server, service, monkeypatch):
+        """Test that an open circuit rejects requests without sending them"""
+        registry = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+        monkeypatch.setattr("app.core.http_service.circuit_breakers", registry)
+        server.statuses.extend([500, 500])
+
+        with pytest.raises(CircuitOpenError) as excinfo:
+            await service.fetch(server.url)
+
+        assert excinfo.value.status == 503
+        assert len(server.calls) == 2
+        assert registry.get_status()[server.url.split("/")[2]]["state"] == "open"
+
+        with pytest.raises(CircuitOpenError):
+            await service.fetch(server.url)
+        assert len(server.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_half_open_slot(self, server, service, monkeypatch):
+        """Test that a cancelled half-open probe does not leave the circuit rejecting requests"""
+        registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=0)
+        monkeypatch.setattr("app.core.http_service.circuit_breakers", registry)
+        breaker = registry.for_url(server.url)
+        breaker.record_failure()
+
+        probe = asyncio.create_task(service.fetch(server.url + "slow"))
+        await asyncio.sleep(0.2)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        status, _, _ = await service.fetch(server.url)
+        assert status == 200
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestCircuitBreaker:
+
+    def test_half_open_probe(self):
+        """Test that one probe is let through after the reset timeout"""
+        breaker = CircuitBreaker("galaxy.ansible.com", failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        assert not breaker.allow_request()
+
+        with patch("app.core.http_resilience.time.monotonic", return_value=breaker.opened_at + 31):
+            assert breaker.allow_request()
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert not breaker.allow_request()  # single probe
+
+            breaker.record_failure()
+            assert breaker.state == CircuitBreaker.OPEN
+
+        with patch("app.core.http_resilience.time.monotonic", return_value=breaker.opened_at + 31):
+            assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.times_opened == 2
+
+    def test_backoff_honours_retry_after(self):
+        """Test that Retry-After is used, capped by the maximum delay"""
+        policy = RetryPolicy(base_delay=0.5, max_delay=4)
+
+        assert policy.backoff(1, retry_after=2) == 2
+        assert policy.backoff(1, retry_after=120) == 4
+        assert 0 <= policy.backoff(5) <= 4
+
+
+class TestStaleFallback:
+
+    def test_transient_failure_keeps_stale_value(self):
+        """Test that a 5xx does not replace a value within its hard TTL"""
+        cache = EnhancedCache()
+        cache.set("galaxy_standalone_role:public:geerlingguy:docker", {"name": "docker"}, 60)
+        entry = cache._cache["galaxy_standalone_role:public:geerlingguy:docker"]
+        entry["soft_expires"] = 0  # soft-expired
+
+        assert cache.lookup("galaxy_standalone_role:public:geerlingguy:docker") is NOT_CACHED
+
+        cache.set_negative("galaxy_standalone_role:public:geerlingguy:docker", 503)
+
+        # Served stale until the negative TTL has elapsed
+        assert cache.lookup("galaxy_standalone_role:public:geerlingguy:docker") == {"name": "docker"}
+        assert cache.get_stale("galaxy_standalone_role:public:geerlingguy:docker") == {"name": "docker"}
+
+        cache.set_negative("galaxy_standalone_role:public:geerlingguy:docker", 404)
+        assert cache.get_stale("galaxy_standalone_role:public:geerlingguy:docker") is NOT_CACHED
+
+    @pytest.mark.asyncio
+    async def test_galaxy_role_served_stale(self, monkeypatch):
+        """Test that Galaxy role details fall back to the last cached copy"""
+        from app.services import galaxy_roles_service as module
+
+        cache = EnhancedCache()
+        monkeypatch.setattr(module, "cache", cache)
+        service = module.GalaxyRolesService()
+        monkeypatch.setattr(service, "fetch", _failing_fetch)
+
+        key = "galaxy_standalone_role:public:geerlingguy:docker"
+        cache.set(key, {"name": "docker"}, 60)
+        cache._cache[key]["soft_expires"] = 0
+
+        assert await service.get_standalone_role_details("geerlingguy", "docker") == {"name": "docker"}
+        assert await service.get_standalone_role_details("geerlingguy", "nginx") is None
+
+
+async def _failing_fetch(url, **kwargs):
+    raise CircuitOpenError(url, 30)
@@ -0,0 +1,151 @@
+"""
+Tests for the local ansible-doc catalog index
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.ansible_collections_service import AnsibleCollectionsService
+from app.services.local_catalog_service import LocalCatalog, index_rows_from_ansible_doc
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+ANSIBLE_VERSION = "10.5.0"
+
+
+@pytest.fixture
+def ufw_output():
+    """ansible-doc --json output for community.general.ufw"""
+    return (FIXTURES_DIR / "module_docs" / "community_general_ufw.json").read_bytes()
+
+
+def fake_ansible_doc(ufw_output):
+    """ansible-doc stand-in: --list returns two modules, --json documents ufw only"""
+    calls = []
+
+    async def run(*args, timeout):
+        calls.append(args)
+        if "--list" in args:
+            return json.dumps({
+                "community.general.ufw": "Manage firewall with UFW",
+                "community.general.missing": "Not documented"
+            }).encode()
+        documented = json.loads(ufw_output)
+        return json.dumps({fqcn: documented[fqcn] for fqcn in args if fqcn in documented}).encode()
+
+    return run, calls
+
+
+@pytest.fixture
+def installed_ansible():
+    with patch("app.services.local_catalog_service.installed_ansible_version", return_value=ANSIBLE_VERSION):
+        yield
+
+
+class TestLocalCatalog:
+
+    def test_index_rows(self, ufw_output):
+        """Test that ansible-doc output becomes compressed schema rows"""
+        rows = index_rows_from_ansible_doc(ufw_output, {"community.general.ufw": "Manage firewall with UFW"})
+
+        assert len(rows) == 1
+        fqcn, namespace, collection, module, description, parameters, payload = rows[0]
+        assert (fqcn, namespace, collection, module) == ("community.general.ufw", "community", "general", "ufw")
+        assert description == "Manage firewall with UFW"
+        assert "rule" in parameters.split()
+        assert isinstance(payload, bytes)
+
+    @pytest.mark.asyncio
+    async def test_build_and_lookups(self, tmp_path, ufw_output, installed_ansible):
+        """Test building the index and serving the catalog from it"""
+        catalog = LocalCatalog(str(tmp_path / "catalog.db"), batch_size=1)
+        run, calls = fake_ansible_doc(ufw_output)
+
+        with patch("app.services.local_catalog_service.run_ansible_doc", run):
+            assert await catalog.build() == 1
+
+        # --list, then one --json call per batch of one module
+        assert len(calls) == 3
+        assert catalog.covers("10")
+        assert not catalog.covers("11")
+        assert catalog.get_collections() == {"community": ["general"]}
+        assert catalog.get_namespace_collections("amazon") is None
+        assert catalog.get_collection_modules("community", "general") == [
+            {"name": "ufw", "description": "Manage firewall with UFW", "href": "ufw_module.html"}
+        ]
+        schema = catalog.get_module_schema("community", "general", "ufw")
+        assert schema["source"] == "ansible-doc"
+        assert any(p["name"] == "rule" for p in schema["parameters"])
+        assert catalog.get_module_schema("community", "general", "missing") is None
+        catalog.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_modules_fall_back(self, tmp_path, ufw_output, installed_ansible):
+        """Test that modules of a failed ansible-doc batch are not served from a partial index"""
+        catalog = LocalCatalog(str(tmp_path / "catalog.db"), batch_size=1)
+        run, _ = fake_ansible_doc(ufw_output)
+
+        async def flaky(*args, timeout):
+            if "community.general.ufw" in args and "--list" not in args:
+                return None  # ansible-doc timed out
+            return await run(*args, timeout=timeout)
+
+        with patch("app.services.local_catalog_service.run_ansible_doc", flaky):
+            assert await catalog.build() == 0
+
+        assert catalog.covers("10")
+        assert catalog.get_collections() == {"community": ["general"]}
+        assert catalog.get_collection_modules("community", "general") is None
+        assert catalog.get_module_schema("community", "general", "ufw") is None
+        assert catalog.get_status()["failed_modules"] == 1
+
+        catalog.close()
+
+        # The next start serves the partial index and rebuilds it
+        restarted = LocalCatalog(catalog.path)
+        with patch("app.services.local_catalog_service.run_ansible_doc", run):
+            await restarted.start()
+            await restarted._build_task
+        assert restarted.get_collection_modules("community", "general")[0]["name"] == "ufw"
+        assert restarted.get_status()["failed_modules"] == 0
+        restarted.close()
+
+    @pytest.mark.asyncio
+    async def test_index_of_other_release_is_not_loaded(self, tmp_path, ufw_output, installed_ansible):
+        """Test that an index built for another Ansible release is not loaded"""
+        path = str(tmp_path / "catalog.db")
+        run, _ = fake_ansible_doc(ufw_output)
+        with patch("app.services.local_catalog_service.run_ansible_doc", run):
+            await LocalCatalog(path).build()
+
+        catalog = LocalCatalog(path)
+        assert await catalog.load()
+        catalog.close()
+
+        with patch("app.services.local_catalog_service.installed_ansible_version", return_value="11.0.0"):
+            assert not await catalog.load()
+        assert not catalog.loaded
+
+    @pytest.mark.asyncio
+    async def test_collections_service_uses_local_catalog(self, tmp_path, ufw_output, installed_ansible):
+        """Test that the installed version is served without network requests"""
+        catalog = LocalCatalog(str(tmp_path / "catalog.db"))
+        run, _ = fake_ansible_doc(ufw_output)
+        with patch("app.services.local_catalog_service.run_ansible_doc", run):
+            await catalog.build()
+
+        service = AnsibleCollectionsService()
+        session = AsyncMock()
+        with patch("app.services.ansible_collections_service.local_catalog", catalog), \
+                patch.object(service, "get_session", return_value=session):
+            assert await service.get_collections("10") == {"community": ["general"]}
+            assert await service.get_namespace_collections("10", "community") == ["general"]
+            modules = await service.get_collection_modules("10", "community", "general")
+            schema = await service.get_module_schema("10", "community", "general", "ufw")
+
+        session.get.assert_not_called()
+        assert modules[0]["name"] == "ufw"
+        assert schema["module"] == "ufw"
+        catalog.close()
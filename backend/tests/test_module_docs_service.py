@@ -0,0 +1,174 @@
+"""
+Tests for structured module schema sources (ansible-doc, Galaxy docs-blob)
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.config import settings
+from app.services.ansible_collections_service import AnsibleCollectionsService
+from app.services.cache_service import EnhancedCache
+from app.services.module_docs_service import (
+    ModuleDocsService,
+    schema_from_plugin_docs,
+    schemas_from_docs_blob,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def ufw_docs():
+    """ansible-doc --json output for community.general.ufw"""
+    data = json.loads((FIXTURES_DIR / "module_docs" / "community_general_ufw.json").read_text(encoding="utf-8"))
+    return data["community.general.ufw"]
+
+
+@pytest.fixture
+def docs_blob(ufw_docs):
+    """Galaxy docs-blob with one module and one role"""
+    return json.dumps({
+        "collection_info": {"namespace": "community", "name": "general"},
+        "contents": [
+            {"content_name": "ufw", "content_type": "module", "doc_strings": ufw_docs},
+            {"content_name": "setup_role", "content_type": "role", "doc_strings": {}},
+        ]
+    })
+
+
+def mock_session_returning(status, text):
+    response = MagicMock()
+    response.status = status
+    response.text = AsyncMock(return_value=text)
+
+    context = AsyncMock()
+    context.__aenter__.return_value = response
+    context.__aexit__.return_value = None
+
+    session = MagicMock()
+    session.get.return_value = context
+    return session
+
+
+class TestSchemaFromPluginDocs:
+
+    def test_exact_parameters(self, ufw_docs):
+        """Test that types, defaults, choices and aliases come from the metadata"""
+        schema = schema_from_plugin_docs("ufw", ufw_docs, "ansible-doc")
+        parameters = {p["name"]: p for p in schema["parameters"]}
+
+        assert schema["module"] == "ufw"
+        assert schema["source"] == "ansible-doc"
+        assert parameters["delete"]["type"] == "boolean"
+        assert parameters["delete"]["default"] is False
+        assert parameters["rule"]["choices"] == ["allow", "deny", "limit", "reject"]
+        assert parameters["default"]["aliases"] == ["policy"]
+        assert not any(p["required"] for p in schema["parameters"])
+        assert schema["examples"] and "community.general.ufw" in schema["examples"][0]
+
+    def test_markup_is_stripped(self):
+        """Test that Ansible documentation markup is rendered as plain text"""
+        docs = {"doc": {"options": {"path": {
+            "type": "path",
+            "required": True,
+            "description": ["Set O(state=absent) to remove C(path).", "See L(the guide,https://example.com)."]
+        }}}}
+
+        parameter = schema_from_plugin_docs("demo", docs, "docs-blob")["parameters"][0]
+
+        assert parameter["required"] is True
+        assert parameter["description"] == "Set state=absent to remove path. See the guide."
+
+    def test_docs_blob_modules(self, docs_blob):
+        """Test that only modules are taken from a docs-blob"""
+        schemas = schemas_from_docs_blob(docs_blob)
+
+        assert list(schemas) == ["ufw"]
+        assert schemas["ufw"]["source"] == "docs-blob"
+
+
+class TestModuleDocsService:
+
+    def test_ansible_doc_version_match(self):
+        """Test that ansible-doc is only used for the installed Ansible release"""
+        service = ModuleDocsService()
+        service.ansible_version = "10.5.0"
+
+        with patch("app.services.module_docs_service.shutil.which", return_value="/usr/bin/ansible-doc"):
+            assert service.ansible_doc_available("10")
+            assert not service.ansible_doc_available("1")
+            assert not service.ansible_doc_available("latest")
+
+        service.ansible_version = None
+        assert not service.ansible_doc_available("10")
+
+    @pytest.mark.asyncio
+    async def test_docs_blob_downloaded_once_per_collection_version(self, docs_blob):
+        """Test that the schemas of a docs-blob are cached for all modules"""
+        service = ModuleDocsService()
+        session = mock_session_returning(200, docs_blob)
+
+        with patch("app.services.module_docs_service.cache", EnhancedCache()):
+            with patch.object(service, "get_session", return_value=session):
+                schema = await service.get_docs_blob_schema("community", "general", "9.5.0", "ufw")
+                missing = await service.get_docs_blob_schema("community", "general", "9.5.0", "iptables")
+
+        assert schema["parameters"]
+        assert missing is None
+        assert session.get.call_count == 1
+        assert "/collections/index/community/general/versions/9.5.0/docs-blob/" in session.get.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_missing_docs_blob_is_negatively_cached(self):
+        """Test that an unavailable docs-blob is not requested again"""
+        service = ModuleDocsService()
+        session = mock_session_returning(404, "")
+
+        with patch("app.services.module_docs_service.cache", EnhancedCache()):
+            with patch.object(service, "get_session", return_value=session):
+                for _ in range(2):
+                    assert await service.get_docs_blob_schema("community", "general", "0.0.1", "ufw") is None
+
+        assert session.get.call_count == 1
+
+
+class TestStructuredSchemaSources:
+
+    @pytest.mark.asyncio
+    async def test_schema_from_docs_blob(self, monkeypatch, docs_blob):
+        """Test that the docs-blob of the collection version of the docs page is used"""
+        monkeypatch.setattr(settings, "MODULE_SCHEMA_SOURCES", "docs-blob")
+        service = AnsibleCollectionsService()
+        docs_session = mock_session_returning(200, docs_blob)
+        page_session = mock_session_returning(200, "<p>Collection version 9.5.0</p>")
+        test_cache = EnhancedCache()
+
+        with patch("app.services.ansible_collections_service.cache", test_cache), \
+                patch("app.services.module_docs_service.cache", test_cache), \
+                patch("app.services.module_docs_service.module_docs_service.get_session", return_value=docs_session), \
+                patch.object(service, "get_session", return_value=page_session):
+            schema = await service.get_module_schema("10", "community", "general", "ufw")
+
+        assert schema["source"] == "docs-blob"
+        assert "versions/9.5.0/docs-blob" in docs_session.get.call_args[0][0]
+        assert test_cache.get("ansible_collection_version:10:community:general") == "9.5.0"
+
+    @pytest.mark.asyncio
+    async def test_html_fallback(self, monkeypatch):
+        """Test that the HTML page is parsed when no structured source has the module"""
+        monkeypatch.setattr(settings, "MODULE_SCHEMA_SOURCES", "ansible-doc,docs-blob")
+        service = AnsibleCollectionsService()
+
+        with patch("app.services.ansible_collections_service.cache", EnhancedCache()), \
+                patch("app.services.ansible_collections_service.module_docs_service") as docs_service, \
+                patch.object(service, "get_collection_version", AsyncMock(return_value=None)), \
+                patch.object(service, "get_text_conditional", AsyncMock(return_value=(200, "<html></html>", {}))):
+            docs_service.get_ansible_doc_schema = AsyncMock(return_value=None)
+            schema = await service.get_module_schema("latest", "community", "general", "ufw")
+
+        docs_service.get_ansible_doc_schema.assert_awaited_once()
+        assert schema["source"] == "html"
+        assert schema["module"] == "ufw"
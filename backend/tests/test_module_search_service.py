@@ -0,0 +1,94 @@
+"""
+Tests for the module full-text search index
+"""
+
+import pytest
+
+from app.services.module_search_service import ModuleSearchService, VersionIndex
+
+
+@pytest.fixture
+def index():
+    index = VersionIndex()
+    index.add("amazon", "aws", "ec2_instance", "Create & manage EC2 instances")
+    index.add("amazon", "aws", "s3_bucket", "Manage S3 buckets in AWS")
+    index.add("community", "general", "ufw", "Manage firewall with UFW", ["rule", "port", "proto"])
+    index.add("community", "general", "iptables_state", "Save iptables state into a file or restore it")
+    index.add("ansible", "builtin", "copy", "Copy files to remote locations", ["src", "dest"])
+    return index
+
+
+def names(results):
+    return [r["name"] for r in results]
+
+
+class TestVersionIndex:
+
+    def test_exact_name_ranks_first(self, index):
+        """Test that module name matches outrank description matches"""
+        results = index.search("ufw")
+
+        assert names(results) == ["ufw"]
+        assert results[0]["fqcn"] == "community.general.ufw"
+
+    def test_prefix_query(self, index):
+        """Test that terms match as prefixes"""
+        assert names(index.search("ipt")) == ["iptables_state"]
+        assert set(names(index.search("ec2"))) == {"ec2_instance"}
+
+    def test_fuzzy_query(self, index):
+        """Test that one typo per term is tolerated unless fuzzy matching is off"""
+        assert names(index.search("firewll")) == ["ufw"]
+        assert names(index.search("bukcets")) == ["s3_bucket"]  # adjacent transposition
+        assert names(index.search("bkcts")) == []
+        assert names(index.search("instnces")) == ["ec2_instance"]
+        assert index.search("instnces", fuzzy=False) == []
+
+    def test_all_terms_must_match(self, index):
+        """Test that every query term must match a document"""
+        assert names(index.search("manage aws")) == ["ec2_instance", "s3_bucket"]
+        assert names(index.search("manage firewall")) == ["ufw"]
+        assert index.search("manage nothingmatches") == []
+
+    def test_parameter_names_are_indexed(self, index):
+        """Test that schemas add their parameter names to a module"""
+        assert names(index.search("dest")) == ["copy"]
+
+        index.add("amazon", "aws", "s3_bucket", parameters=["name", "versioning"])
+
+        assert names(index.search("versioning")) == ["s3_bucket"]
+        assert names(index.search("buckets")) == ["s3_bucket"]  # description kept
+
+    def test_updated_description_replaces_tokens(self, index):
+        """Test that re-indexing a module drops its previous description tokens"""
+        index.add("community", "general", "ufw", "Uncomplicated firewall")
+
+        assert index.search("uncomplicated")
+        assert names(index.search("manage firewall")) == []
+
+
+class TestModuleSearchService:
+
+    def test_versions_are_separate(self):
+        """Test that modules are searched within their Ansible version"""
+        service = ModuleSearchService("/nonexistent")
+        service.index_modules("13", "community", "general", [{"name": "ufw", "description": "Manage firewall"}])
+        service.index_schema("13", "community", "general", "ufw", {"parameters": [{"name": "rule"}]})
+
+        assert names(service.search("13", "rule")) == ["ufw"]
+        assert service.search("12", "ufw") == []
+        assert service.indexed_modules("13") == 1
+
+    @pytest.mark.asyncio
+    async def test_save_and_load(self, tmp_path):
+        """Test that the index survives a restart"""
+        path = str(tmp_path / "search.json.gz")
+        service = ModuleSearchService(path)
+        service.index_modules("13", "community", "general", [{"name": "ufw", "description": "Manage firewall"}])
+        service.index_schema("13", "community", "general", "ufw", {"parameters": [{"name": "rule"}]})
+
+        assert await service.save() == 1
+
+        restored = ModuleSearchService(path)
+        assert await restored.load() == 1
+        assert names(restored.search("13", "firewall rule")) == ["ufw"]